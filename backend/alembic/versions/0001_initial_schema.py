@@ -0,0 +1,81 @@
+"""Initial schema
+
+Creates the tables as Base.metadata.create_all built them before
+migrations existed. Tables that are already there are left alone, so a
+database created by create_all can be upgraded without stamping it first.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if "todos" not in existing:
+        op.create_table(
+            "todos",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("title", sa.String(length=255), nullable=False),
+            sa.Column("description", sa.Text(), nullable=True),
+            sa.Column("completed", sa.Boolean(), nullable=False),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("(CURRENT_TIMESTAMP)"), nullable=True),
+            sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index("ix_todos_id", "todos", ["id"])
+        op.create_index("ix_todos_title", "todos", ["title"])
+
+    if "subtasks" not in existing:
+        op.create_table(
+            "subtasks",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("todo_id", sa.Integer(), nullable=False),
+            sa.Column("title", sa.String(length=255), nullable=False),
+            sa.Column("description", sa.Text(), nullable=True),
+            sa.Column("completed", sa.Boolean(), nullable=False),
+            sa.Column("order_index", sa.Integer(), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("(CURRENT_TIMESTAMP)"), nullable=True),
+            sa.ForeignKeyConstraint(["todo_id"], ["todos.id"]),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index("ix_subtasks_id", "subtasks", ["id"])
+
+    if "translations" not in existing:
+        op.create_table(
+            "translations",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("todo_id", sa.Integer(), nullable=False),
+            sa.Column("language", sa.String(length=50), nullable=False),
+            sa.Column("translated_title", sa.String(length=500), nullable=False),
+            sa.Column("translated_description", sa.Text(), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("(CURRENT_TIMESTAMP)"), nullable=True),
+            sa.ForeignKeyConstraint(["todo_id"], ["todos.id"]),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index("ix_translations_id", "translations", ["id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_translations_id", table_name="translations")
+    op.drop_table("translations")
+    op.drop_index("ix_subtasks_id", table_name="subtasks")
+    op.drop_table("subtasks")
+    op.drop_index("ix_todos_title", table_name="todos")
+    op.drop_index("ix_todos_id", table_name="todos")
+    op.drop_table("todos")
@@ -0,0 +1,68 @@
+"""Indexes for the todo query patterns
+
+- subtasks (todo_id, order_index): relation loads and ordered subtask lists
+- translations unique (todo_id, language): relation loads and the
+  per-language existence check in translate_todo
+- todos (created_at, id): keyset pagination
+- todos (completed, created_at): completion filters in creation order
+
+The composite indexes lead with todo_id, so they also serve plain
+todo_id lookups. Duplicate translations are removed (keeping the oldest)
+before the unique constraint is added.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, Sequence[str], None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _has_index(table: str, name: str) -> bool:
+    inspector = sa.inspect(op.get_bind())
+    return name in {index["name"] for index in inspector.get_indexes(table)}
+
+
+def _has_unique_constraint(table: str, name: str) -> bool:
+    inspector = sa.inspect(op.get_bind())
+    return name in {constraint["name"] for constraint in inspector.get_unique_constraints(table)}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Tables built by a newer create_all may already have some of these
+    if not _has_index("subtasks", "ix_subtasks_todo_id_order_index"):
+        op.create_index("ix_subtasks_todo_id_order_index", "subtasks", ["todo_id", "order_index"])
+    if not _has_index("todos", "ix_todos_created_at_id"):
+        op.create_index("ix_todos_created_at_id", "todos", ["created_at", "id"])
+    if not _has_index("todos", "ix_todos_completed_created_at"):
+        op.create_index("ix_todos_completed_created_at", "todos", ["completed", "created_at"])
+
+    if not _has_unique_constraint("translations", "uq_translations_todo_id_language"):
+        op.execute(
+            "DELETE FROM translations WHERE id NOT IN ("
+            "SELECT MIN(id) FROM translations GROUP BY todo_id, language)"
+        )
+        with op.batch_alter_table("translations") as batch_op:
+            batch_op.create_unique_constraint(
+                "uq_translations_todo_id_language", ["todo_id", "language"]
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("translations") as batch_op:
+        batch_op.drop_constraint("uq_translations_todo_id_language", type_="unique")
+    op.drop_index("ix_todos_completed_created_at", table_name="todos")
+    op.drop_index("ix_todos_created_at_id", table_name="todos")
+    op.drop_index("ix_subtasks_todo_id_order_index", table_name="subtasks")
@@ -0,0 +1,115 @@
+"""Full-text search over todos and subtask titles
+
+SQLite gets an FTS5 table kept in sync by triggers and backfilled from
+the existing rows. Postgres gets GIN expression indexes that the search
+query matches.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, Sequence[str], None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SQLITE_UPGRADE = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS todo_search USING fts5(
+        title, description, subtasks, tokenize = 'unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS todos_search_insert AFTER INSERT ON todos BEGIN
+        INSERT INTO todo_search (rowid, title, description, subtasks)
+        VALUES (NEW.id, NEW.title, coalesce(NEW.description, ''), '');
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS todos_search_update AFTER UPDATE OF title, description ON todos BEGIN
+        UPDATE todo_search SET title = NEW.title, description = coalesce(NEW.description, '')
+        WHERE rowid = NEW.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS todos_search_delete AFTER DELETE ON todos BEGIN
+        DELETE FROM todo_search WHERE rowid = OLD.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS subtasks_search_insert AFTER INSERT ON subtasks BEGIN
+        UPDATE todo_search SET subtasks = (
+            SELECT coalesce(group_concat(title, ' '), '') FROM subtasks WHERE todo_id = NEW.todo_id
+        ) WHERE rowid = NEW.todo_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS subtasks_search_update AFTER UPDATE OF title, todo_id ON subtasks BEGIN
+        UPDATE todo_search SET subtasks = (
+            SELECT coalesce(group_concat(title, ' '), '') FROM subtasks WHERE todo_id = OLD.todo_id
+        ) WHERE rowid = OLD.todo_id;
+        UPDATE todo_search SET subtasks = (
+            SELECT coalesce(group_concat(title, ' '), '') FROM subtasks WHERE todo_id = NEW.todo_id
+        ) WHERE rowid = NEW.todo_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS subtasks_search_delete AFTER DELETE ON subtasks BEGIN
+        UPDATE todo_search SET subtasks = (
+            SELECT coalesce(group_concat(title, ' '), '') FROM subtasks WHERE todo_id = OLD.todo_id
+        ) WHERE rowid = OLD.todo_id;
+    END
+    """,
+    # Rebuild the index from the existing rows
+    "DELETE FROM todo_search",
+    """
+    INSERT INTO todo_search (rowid, title, description, subtasks)
+    SELECT todos.id, todos.title, coalesce(todos.description, ''), coalesce((
+        SELECT group_concat(subtasks.title, ' ') FROM subtasks WHERE subtasks.todo_id = todos.id
+    ), '')
+    FROM todos
+    """,
+]
+
+SQLITE_DOWNGRADE = [
+    "DROP TRIGGER IF EXISTS subtasks_search_delete",
+    "DROP TRIGGER IF EXISTS subtasks_search_update",
+    "DROP TRIGGER IF EXISTS subtasks_search_insert",
+    "DROP TRIGGER IF EXISTS todos_search_delete",
+    "DROP TRIGGER IF EXISTS todos_search_update",
+    "DROP TRIGGER IF EXISTS todos_search_insert",
+    "DROP TABLE IF EXISTS todo_search",
+]
+
+POSTGRES_UPGRADE = [
+    "CREATE INDEX IF NOT EXISTS ix_todos_search ON todos "
+    "USING gin (to_tsvector('simple', coalesce(title, '') || ' ' || coalesce(description, '')))",
+    "CREATE INDEX IF NOT EXISTS ix_subtasks_search ON subtasks USING gin (to_tsvector('simple', title))",
+]
+
+POSTGRES_DOWNGRADE = [
+    "DROP INDEX IF EXISTS ix_subtasks_search",
+    "DROP INDEX IF EXISTS ix_todos_search",
+]
+
+
+def _run(statements_by_dialect: dict) -> None:
+    for statement in statements_by_dialect.get(op.get_bind().dialect.name, []):
+        op.execute(statement)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _run({"sqlite": SQLITE_UPGRADE, "postgresql": POSTGRES_UPGRADE})
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _run({"sqlite": SQLITE_DOWNGRADE, "postgresql": POSTGRES_DOWNGRADE})
@@ -0,0 +1,49 @@
+"""Shared translation cache
+
+Translations keyed by the hash of the normalized source text, the target
+language and the model, with LRU bookkeeping (last_used_at, hit_count).
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, Sequence[str], None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # create_all may have built the table already
+    if "translation_cache" in sa.inspect(op.get_bind()).get_table_names():
+        return
+
+    op.create_table(
+        "translation_cache",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("text_hash", sa.String(length=64), nullable=False),
+        sa.Column("language", sa.String(length=50), nullable=False),
+        sa.Column("model", sa.String(length=100), nullable=False),
+        sa.Column("translated_text", sa.Text(), nullable=False),
+        sa.Column("hit_count", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("(CURRENT_TIMESTAMP)"), nullable=True),
+        sa.Column("last_used_at", sa.DateTime(timezone=True), server_default=sa.text("(CURRENT_TIMESTAMP)"), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("text_hash", "language", "model", name="uq_translation_cache_key"),
+    )
+    op.create_index("ix_translation_cache_last_used_at", "translation_cache", ["last_used_at"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_translation_cache_last_used_at", table_name="translation_cache")
+    op.drop_table("translation_cache")
@@ -0,0 +1,47 @@
+"""Subtask suggestions
+
+Generated subtasks kept for reuse by todos with similar text.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0007"
+down_revision: Union[str, Sequence[str], None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # create_all may have built the table already
+    if "subtask_suggestions" in sa.inspect(op.get_bind()).get_table_names():
+        return
+
+    op.create_table(
+        "subtask_suggestions",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("model", sa.String(length=100), nullable=False),
+        sa.Column("title", sa.String(length=255), nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("max_subtasks", sa.Integer(), nullable=False),
+        sa.Column("subtasks", sa.JSON(), nullable=False),
+        sa.Column("hit_count", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("(CURRENT_TIMESTAMP)"), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_subtask_suggestions_created_at", "subtask_suggestions", ["created_at"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_subtask_suggestions_created_at", table_name="subtask_suggestions")
+    op.drop_table("subtask_suggestions")
@@ -0,0 +1,72 @@
+"""Invalidate translations when a todo's text changes
+
+A trigger on todos deletes a todo's translations when its title or
+description changes, so they are translated again from the new text.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0008"
+down_revision: Union[str, Sequence[str], None] = "0007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SQLITE_UPGRADE = [
+    """
+    CREATE TRIGGER IF NOT EXISTS todos_invalidate_translations AFTER UPDATE OF title, description ON todos
+    WHEN OLD.title IS NOT NEW.title OR OLD.description IS NOT NEW.description
+    BEGIN
+        DELETE FROM translations WHERE todo_id = NEW.id;
+    END
+    """,
+]
+
+SQLITE_DOWNGRADE = [
+    "DROP TRIGGER IF EXISTS todos_invalidate_translations",
+]
+
+POSTGRES_UPGRADE = [
+    """
+    CREATE OR REPLACE FUNCTION todos_invalidate_translations() RETURNS trigger AS $$
+    BEGIN
+        DELETE FROM translations WHERE todo_id = NEW.id;
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS todos_invalidate_translations ON todos",
+    """
+    CREATE TRIGGER todos_invalidate_translations AFTER UPDATE OF title, description ON todos
+    FOR EACH ROW
+    WHEN (OLD.title IS DISTINCT FROM NEW.title OR OLD.description IS DISTINCT FROM NEW.description)
+    EXECUTE FUNCTION todos_invalidate_translations()
+    """,
+]
+
+POSTGRES_DOWNGRADE = [
+    "DROP TRIGGER IF EXISTS todos_invalidate_translations ON todos",
+    "DROP FUNCTION IF EXISTS todos_invalidate_translations()",
+]
+
+
+def _run(statements_by_dialect: dict) -> None:
+    for statement in statements_by_dialect.get(op.get_bind().dialect.name, []):
+        op.execute(statement)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _run({"sqlite": SQLITE_UPGRADE, "postgresql": POSTGRES_UPGRADE})
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _run({"sqlite": SQLITE_DOWNGRADE, "postgresql": POSTGRES_DOWNGRADE})
@@ -0,0 +1,95 @@
+"""Table versions
+
+Change counters for todos, subtasks and translations, bumped by triggers
+on every write, for ETags on the read endpoints.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0009"
+down_revision: Union[str, Sequence[str], None] = "0008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ("todos", "subtasks", "translations")
+SEED_VALUES = ", ".join(f"('{table}', 0)" for table in TABLES)
+
+SQLITE_UPGRADE = [
+    f"INSERT OR IGNORE INTO table_versions (name, version) VALUES {SEED_VALUES}",
+    *(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {table}_version_{operation.lower()} AFTER {operation} ON {table} BEGIN
+            UPDATE table_versions SET version = version + 1 WHERE name = '{table}';
+        END
+        """
+        for table in TABLES
+        for operation in ("INSERT", "UPDATE", "DELETE")
+    ),
+]
+
+SQLITE_DOWNGRADE = [
+    f"DROP TRIGGER IF EXISTS {table}_version_{operation}"
+    for table in TABLES
+    for operation in ("insert", "update", "delete")
+]
+
+POSTGRES_UPGRADE = [
+    f"INSERT INTO table_versions (name, version) VALUES {SEED_VALUES} ON CONFLICT (name) DO NOTHING",
+    """
+    CREATE OR REPLACE FUNCTION bump_table_version() RETURNS trigger AS $$
+    BEGIN
+        UPDATE table_versions SET version = version + 1 WHERE name = TG_TABLE_NAME;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    *(
+        statement
+        for table in TABLES
+        for statement in (
+            f"DROP TRIGGER IF EXISTS {table}_version ON {table}",
+            f"""
+            CREATE TRIGGER {table}_version AFTER INSERT OR UPDATE OR DELETE ON {table}
+            FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version()
+            """,
+        )
+    ),
+]
+
+POSTGRES_DOWNGRADE = [
+    *(f"DROP TRIGGER IF EXISTS {table}_version ON {table}" for table in TABLES),
+    "DROP FUNCTION IF EXISTS bump_table_version()",
+]
+
+
+def _run(statements_by_dialect: dict) -> None:
+    for statement in statements_by_dialect.get(op.get_bind().dialect.name, []):
+        op.execute(statement)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # create_all may have built the table already
+    if "table_versions" not in sa.inspect(op.get_bind()).get_table_names():
+        op.create_table(
+            "table_versions",
+            sa.Column("name", sa.String(length=50), nullable=False),
+            sa.Column("version", sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint("name"),
+        )
+    _run({"sqlite": SQLITE_UPGRADE, "postgresql": POSTGRES_UPGRADE})
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _run({"sqlite": SQLITE_DOWNGRADE, "postgresql": POSTGRES_DOWNGRADE})
+    op.drop_table("table_versions")
@@ -0,0 +1,71 @@
+"""Table version shards
+
+On Postgres, bump table versions on a per-connection shard row instead of
+one row per table, so concurrent writers don't queue on its row lock.
+Readers sum a table's rows. SQLite keeps its single row per table.
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0010"
+down_revision: Union[str, Sequence[str], None] = "0009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SHARDS = 16
+
+POSTGRES_UPGRADE = [
+    f"""
+    CREATE OR REPLACE FUNCTION bump_table_version() RETURNS trigger AS $$
+    BEGIN
+        INSERT INTO table_versions (name, version)
+        VALUES (TG_TABLE_NAME || ':' || (pg_backend_pid() % {SHARDS}), 1)
+        ON CONFLICT (name) DO UPDATE SET version = table_versions.version + 1;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+]
+
+POSTGRES_DOWNGRADE = [
+    """
+    CREATE OR REPLACE FUNCTION bump_table_version() RETURNS trigger AS $$
+    BEGIN
+        UPDATE table_versions SET version = version + 1 WHERE name = TG_TABLE_NAME;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    # Fold the shards back into their table's row
+    """
+    UPDATE table_versions SET version = version + coalesce((
+        SELECT sum(shard.version) FROM table_versions AS shard
+        WHERE split_part(shard.name, ':', 1) = table_versions.name AND shard.name LIKE '%:%'
+    ), 0)
+    WHERE name NOT LIKE '%:%'
+    """,
+    "DELETE FROM table_versions WHERE name LIKE '%:%'",
+]
+
+
+def _run(statements_by_dialect: dict) -> None:
+    for statement in statements_by_dialect.get(op.get_bind().dialect.name, []):
+        op.execute(statement)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _run({"postgresql": POSTGRES_UPGRADE})
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _run({"postgresql": POSTGRES_DOWNGRADE})
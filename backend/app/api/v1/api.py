@@ -1,9 +1,10 @@
 from fastapi import APIRouter
-from .endpoints import todos, subtasks, translation
+from .endpoints import todos, subtasks, translation, jobs
 
 api_router = APIRouter()
 
 # Include routers with trailing slash support
 api_router.include_router(todos.router, prefix="/todos", tags=["todos"])
 api_router.include_router(subtasks.router, prefix="", tags=["subtasks"])
-api_router.include_router(translation.router, prefix="/todos", tags=["translation"]) 
\ No newline at end of file
+api_router.include_router(translation.router, prefix="/todos", tags=["translation"])
+api_router.include_router(jobs.router, prefix="", tags=["jobs"]) 
\ No newline at end of file
@@ -0,0 +1,51 @@
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from typing import Union
+from ....core.config import settings
+from ....core.database import get_async_db, get_db
+from ....schemas.job import Job
+from ....schemas.subtask import SubtaskGenerateRequest
+from ....services.job_queue import JobQueueFull, job_queue
+from ....services.todo_service import AsyncTodoService, TodoService
+
+router = APIRouter()
+
+@router.post("/todos/{todo_id}/generate/jobs", response_model=Job, status_code=status.HTTP_202_ACCEPTED)
+@router.post("/todos/{todo_id}/generate/jobs/", response_model=Job, status_code=status.HTTP_202_ACCEPTED)
+async def create_generate_job(
+    todo_id: int,
+    request: SubtaskGenerateRequest,
+    response: Response,
+    db: Union[Session, AsyncSession] = Depends(get_async_db)
+):
+    """Queue AI subtask generation for a todo and return the job to poll"""
+    todo = await AsyncTodoService(db).run(TodoService.get_todo, todo_id, include=[])
+    if not todo:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Todo not found"
+        )
+    
+    try:
+        job = await job_queue.submit(
+            db, "generate_subtasks", todo_id=todo_id, params={"max_subtasks": request.max_subtasks}
+        )
+    except (JobQueueFull, RuntimeError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e)
+        )
+    response.headers["Location"] = f"{settings.API_V1_STR}/jobs/{job.id}"
+    return job
+
+@router.get("/jobs/{job_id}", response_model=Job)
+def get_job(job_id: str, db: Session = Depends(get_db)):
+    """Get the status of a background job, with its result once done"""
+    job = TodoService(db).get_job(job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    return job
@@ -1,28 +1,57 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
-from ....core.database import get_db
-from ....schemas.subtask import Subtask, SubtaskGenerateRequest, SubtaskUpdate
-from ....services.todo_service import TodoService
+from typing import List, Union
+from ....core.database import get_async_db, get_db
+from ....core.disconnect import CLIENT_CLOSED_REQUEST, ClientDisconnected, cancel_on_disconnect
+from ....schemas.subtask import (
+    Subtask, SubtaskBatchGenerateRequest, SubtaskBatchGenerateResult, SubtaskBulkUpdate,
+    SubtaskGenerateRequest, SubtaskUpdate
+)
+from ....services.todo_service import AsyncTodoService, TodoService
+import json
+import logging
+import time
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Marks responses served by the local fallback instead of the model
+DEGRADED_HEADER = "X-Degraded"
+
+def _sse(event: str, data) -> str:
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(jsonable_encoder(data))}\n\n"
+
 @router.post("/todos/{todo_id}/generate", response_model=List[Subtask])
 @router.post("/todos/{todo_id}/generate/", response_model=List[Subtask])
 async def generate_subtasks(
     todo_id: int,
     request: SubtaskGenerateRequest,
-    db: Session = Depends(get_db)
+    http_request: Request,
+    response: Response,
+    db: Union[Session, AsyncSession] = Depends(get_async_db)
 ):
-    """Generate AI subtasks for a todo"""
-    todo_service = TodoService(db)
+    """Generate AI subtasks for a todo (cancelled if the client disconnects)
+    
+    While the LLM is unavailable the subtasks come from a local heuristic
+    and the response carries `X-Degraded: true`.
+    """
+    todo_service = AsyncTodoService(db)
     
     try:
-        subtasks = await todo_service.generate_subtasks(
+        subtasks = await cancel_on_disconnect(http_request, todo_service.generate_subtasks(
             todo_id=todo_id,
             max_subtasks=request.max_subtasks
-        )
+        ))
+        if todo_service.degraded:
+            response.headers[DEGRADED_HEADER] = "true"
         return subtasks
+    except ClientDisconnected:
+        return Response(status_code=CLIENT_CLOSED_REQUEST)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -34,12 +63,93 @@ async def generate_subtasks(
             detail=f"Failed to generate subtasks: {str(e)}"
         )
 
+@router.post("/todos/generate/batch", response_model=List[SubtaskBatchGenerateResult])
+@router.post("/todos/generate/batch/", response_model=List[SubtaskBatchGenerateResult])
+async def generate_subtasks_batch(
+    request: SubtaskBatchGenerateRequest,
+    http_request: Request,
+    response: Response,
+    db: Union[Session, AsyncSession] = Depends(get_async_db)
+):
+    """Generate AI subtasks for many todos with a few packed prompts
+    
+    All subtasks are saved in one transaction; each todo gets its own
+    result (`ok`, `not_found` or `failed`).
+    """
+    todo_service = AsyncTodoService(db)
+    
+    try:
+        results = await cancel_on_disconnect(http_request, todo_service.generate_subtasks_batch(
+            todo_ids=request.todo_ids,
+            max_subtasks=request.max_subtasks
+        ))
+    except ClientDisconnected:
+        return Response(status_code=CLIENT_CLOSED_REQUEST)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to generate subtasks: {str(e)}"
+        )
+    if todo_service.degraded:
+        response.headers[DEGRADED_HEADER] = "true"
+    return results
+
+@router.post("/todos/{todo_id}/generate/stream")
+@router.post("/todos/{todo_id}/generate/stream/")
+async def stream_subtasks(
+    todo_id: int,
+    request: SubtaskGenerateRequest,
+    db: Union[Session, AsyncSession] = Depends(get_async_db)
+):
+    """Generate AI subtasks as Server-Sent Events
+    
+    Each subtask is saved and sent as a `subtask` event as soon as the model
+    produces it; the stream ends with a `done` event (count, timings and
+    whether the local fallback was used) or an `error` event.
+    """
+    todo_service = AsyncTodoService(db)
+    todo = await todo_service.run(TodoService.get_todo, todo_id, include=[])
+    if not todo:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Todo not found"
+        )
+    
+    async def events():
+        started = time.perf_counter()
+        first_subtask_ms = None
+        count = 0
+        try:
+            async for subtask in todo_service.stream_subtasks(todo_id, request.max_subtasks):
+                if first_subtask_ms is None:
+                    first_subtask_ms = round((time.perf_counter() - started) * 1000, 1)
+                count += 1
+                yield _sse("subtask", Subtask.model_validate(subtask))
+        except Exception as e:
+            logger.error(f"Subtask stream failed: {str(e)}")
+            yield _sse("error", {"detail": f"Failed to generate subtasks: {str(e)}", "count": count})
+            return
+        yield _sse("done", {
+            "todo_id": todo_id,
+            "count": count,
+            "first_subtask_ms": first_subtask_ms,
+            "total_ms": round((time.perf_counter() - started) * 1000, 1),
+            "degraded": todo_service.degraded,
+        })
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # Keep proxies from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.get("/todos/{todo_id}/subtasks", response_model=List[Subtask])
 @router.get("/todos/{todo_id}/subtasks/", response_model=List[Subtask])
 def get_todo_subtasks(todo_id: int, db: Session = Depends(get_db)):
     """Get all subtasks for a todo"""
     todo_service = TodoService(db)
-    todo = todo_service.get_todo(todo_id)
+    todo = todo_service.get_todo(todo_id, include=["subtasks"])
     if not todo:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -47,6 +157,31 @@ def get_todo_subtasks(todo_id: int, db: Session = Depends(get_db)):
         )
     return todo.subtasks
 
+@router.patch("/todos/{todo_id}/subtasks", response_model=List[Subtask])
+@router.patch("/todos/{todo_id}/subtasks/", response_model=List[Subtask])
+def bulk_update_subtasks(
+    todo_id: int,
+    request: SubtaskBulkUpdate,
+    db: Session = Depends(get_db)
+):
+    """Reorder, complete or edit many subtasks of a todo in one transaction"""
+    todo_service = TodoService(db)
+    try:
+        subtasks = todo_service.bulk_update_subtasks(
+            todo_id, request.items, complete_all=request.complete_all
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    if subtasks is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Todo not found"
+        )
+    return subtasks
+
 @router.put("/subtasks/{subtask_id}", response_model=Subtask)
 def update_subtask(
     subtask_id: int,
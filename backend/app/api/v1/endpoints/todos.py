@@ -1,33 +1,190 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional, Tuple, Union
 from ....core.database import get_db
-from ....schemas.todo import Todo, TodoCreate, TodoUpdate, TodoWithRelations
-from ....services.todo_service import TodoService
+from ....core.etag import cache_headers, etag_matches, make_etag, not_modified
+from ....schemas.todo import (
+    Todo, TodoCreate, TodoUpdate, TodoWithRelations, TodoPage, TodoFilters,
+    TodoBulkCreate, TodoBulkUpdate, TodoBulkIds, TodoBulkResult, TodoBulkResponse
+)
+from ....schemas.subtask import Subtask
+from ....schemas.translation import Translation
+from ....services.todo_service import TodoService, TODO_FIELDS, TODO_RELATIONS
+from ....services.translation_warmer import translation_warmer
 
 router = APIRouter()
 
-@router.get("/", response_model=List[TodoWithRelations])
-@router.get("", response_model=List[TodoWithRelations])
+RELATION_SCHEMAS = {"subtasks": Subtask, "translations": Translation}
+
+# Changing these makes stored translations stale
+TRANSLATED_FIELDS = {"title", "description"}
+
+def _parse_selection(value: Optional[str], allowed: Tuple[str, ...], name: str) -> Optional[List[str]]:
+    """Parse a comma-separated `include`/`fields` query parameter"""
+    if value is None:
+        return None
+    selected = [item.strip() for item in value.split(",") if item.strip()]
+    unknown = sorted(set(selected) - set(allowed))
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown {name}: {', '.join(unknown)}. Allowed: {', '.join(allowed)}"
+        )
+    return selected
+
+def _check_etag(request: Request, todo_service: TodoService, *resource) -> Tuple[str, bool]:
+    """ETag of a read from the table versions and query string, and whether the client has it
+    
+    The versions are read before the data, so a write that lands in
+    between can only make the ETag older than the body, never newer.
+    """
+    etag = make_etag(*resource, sorted(todo_service.get_table_versions().items()), request.url.query)
+    return etag, etag_matches(request.headers.get("if-none-match"), etag)
+
+def _serialize_todo(todo, include: Optional[List[str]], fields: Optional[List[str]]) -> dict:
+    """Serialize only the selected columns and relations of a todo"""
+    include = TODO_RELATIONS if include is None else include
+    columns = TODO_FIELDS if fields is None else ["id", *fields]
+    data = {name: getattr(todo, name) for name in TODO_FIELDS if name in columns}
+    for relation in include:
+        schema = RELATION_SCHEMAS[relation]
+        data[relation] = [schema.model_validate(item) for item in getattr(todo, relation)]
+    return jsonable_encoder(data)
+
+@router.get("/", response_model=Union[List[TodoWithRelations], TodoPage])
+@router.get("", response_model=Union[List[TodoWithRelations], TodoPage])
 def get_todos(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
+    include: Optional[str] = None,
+    fields: Optional[str] = None,
+    filters: TodoFilters = Depends(),
     db: Session = Depends(get_db)
 ):
-    """Get all todos with subtasks and translations"""
+    """Get all todos with subtasks and translations
+    
+    Passing `cursor` (empty for the first page) switches to keyset pagination
+    and returns a page with `next_cursor`; `skip`/`limit` keep working as before.
+    `include=subtasks,translations` picks the relations to load and `fields=`
+    the todo columns to return; both default to everything.
+    `completed`, `created_after`/`created_before`, `updated_after`/`updated_before`
+    and `q` (words matched as prefixes in titles, descriptions and subtask
+    titles) filter the list; `sort` orders it, e.g. `sort=-updated_at`.
+    Responses carry an ETag; `If-None-Match` with a current one gets 304.
+    """
+    include_list = _parse_selection(include, TODO_RELATIONS, "include")
+    field_list = _parse_selection(fields, TODO_FIELDS, "fields")
+    sparse = include_list is not None or field_list is not None
+    
+    todo_service = TodoService(db)
+    etag, unchanged = _check_etag(request, todo_service, "todos")
+    if unchanged:
+        return not_modified(etag)
+    response.headers.update(cache_headers(etag))
+    if cursor is None:
+        todos = todo_service.get_todos(
+            skip=skip, limit=limit, include=include_list, fields=field_list, filters=filters
+        )
+        if sparse:
+            return JSONResponse(
+                [_serialize_todo(todo, include_list, field_list) for todo in todos],
+                headers=cache_headers(etag)
+            )
+        return todos
+    
+    try:
+        todos, next_cursor = todo_service.get_todos_page(
+            cursor=cursor, limit=limit, include=include_list, fields=field_list, filters=filters
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    if sparse:
+        return JSONResponse({
+            "items": [_serialize_todo(todo, include_list, field_list) for todo in todos],
+            "next_cursor": next_cursor
+        }, headers=cache_headers(etag))
+    return TodoPage(items=todos, next_cursor=next_cursor)
+
+@router.post("/bulk", response_model=TodoBulkResponse)
+def bulk_create_todos(request: TodoBulkCreate, db: Session = Depends(get_db)):
+    """Create many todos in one transaction"""
     todo_service = TodoService(db)
-    return todo_service.get_todos(skip=skip, limit=limit)
+    todos = todo_service.bulk_create_todos(request.items)
+    for todo in todos:
+        translation_warmer.enqueue(todo.id)
+    return TodoBulkResponse(results=[
+        TodoBulkResult(id=todo.id, status="created", todo=todo) for todo in todos
+    ])
+
+@router.patch("/bulk", response_model=TodoBulkResponse)
+def bulk_update_todos(request: TodoBulkUpdate, db: Session = Depends(get_db)):
+    """Update many todos in one transaction"""
+    todo_service = TodoService(db)
+    updated = todo_service.bulk_update_todos(request.items)
+    for item in request.items:
+        if item.id in updated and TRANSLATED_FIELDS & item.model_fields_set:
+            translation_warmer.enqueue(item.id)
+    return _bulk_response([item.id for item in request.items], updated, "updated")
+
+@router.patch("/bulk/toggle", response_model=TodoBulkResponse)
+def bulk_toggle_todos(request: TodoBulkIds, db: Session = Depends(get_db)):
+    """Toggle the completion of many todos in one transaction"""
+    todo_service = TodoService(db)
+    toggled = todo_service.bulk_toggle_todos(request.ids)
+    return _bulk_response(request.ids, toggled, "updated")
+
+@router.post("/bulk/delete", response_model=TodoBulkResponse)
+def bulk_delete_todos(request: TodoBulkIds, db: Session = Depends(get_db)):
+    """Delete many todos in one transaction"""
+    todo_service = TodoService(db)
+    deleted_ids = set(todo_service.bulk_delete_todos(request.ids))
+    return TodoBulkResponse(results=[
+        TodoBulkResult(id=todo_id, status="deleted" if todo_id in deleted_ids else "not_found")
+        for todo_id in request.ids
+    ])
+
+def _bulk_response(ids: List[int], todos: dict, status_name: str) -> TodoBulkResponse:
+    """Per-item results in request order, with not_found for unknown ids"""
+    return TodoBulkResponse(results=[
+        TodoBulkResult(id=todo_id, status=status_name, todo=todos[todo_id])
+        if todo_id in todos else TodoBulkResult(id=todo_id, status="not_found")
+        for todo_id in ids
+    ])
 
 @router.get("/{todo_id}", response_model=TodoWithRelations)
-def get_todo(todo_id: int, db: Session = Depends(get_db)):
+def get_todo(
+    todo_id: int,
+    request: Request,
+    response: Response,
+    include: Optional[str] = None,
+    fields: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
     """Get a specific todo with subtasks and translations"""
+    include_list = _parse_selection(include, TODO_RELATIONS, "include")
+    field_list = _parse_selection(fields, TODO_FIELDS, "fields")
+    
     todo_service = TodoService(db)
-    todo = todo_service.get_todo(todo_id)
+    etag, unchanged = _check_etag(request, todo_service, "todo", todo_id)
+    if unchanged:
+        return not_modified(etag)
+    todo = todo_service.get_todo(todo_id, include=include_list, fields=field_list)
     if not todo:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Todo not found"
         )
+    if include_list is not None or field_list is not None:
+        return JSONResponse(_serialize_todo(todo, include_list, field_list), headers=cache_headers(etag))
+    response.headers.update(cache_headers(etag))
     return todo
 
 @router.post("/", response_model=TodoWithRelations, status_code=status.HTTP_201_CREATED)
@@ -35,22 +192,31 @@ def get_todo(todo_id: int, db: Session = Depends(get_db)):
 def create_todo(todo: TodoCreate, db: Session = Depends(get_db)):
     """Create a new todo"""
     todo_service = TodoService(db)
-    return todo_service.create_todo(todo)
+    db_todo = todo_service.create_todo(todo)
+    translation_warmer.enqueue(db_todo.id)
+    return db_todo
 
 @router.put("/{todo_id}", response_model=TodoWithRelations)
 def update_todo(
     todo_id: int,
     todo_update: TodoUpdate,
+    include: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
     """Update an existing todo"""
+    include_list = _parse_selection(include, TODO_RELATIONS, "include")
+    
     todo_service = TodoService(db)
-    updated_todo = todo_service.update_todo(todo_id, todo_update)
+    updated_todo = todo_service.update_todo(todo_id, todo_update, include=include_list)
     if not updated_todo:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Todo not found"
         )
+    if TRANSLATED_FIELDS & todo_update.model_fields_set:
+        translation_warmer.enqueue(todo_id)
+    if include_list is not None:
+        return JSONResponse(_serialize_todo(updated_todo, include_list, None))
     return updated_todo
 
 @router.delete("/{todo_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -66,13 +232,21 @@ def delete_todo(todo_id: int, db: Session = Depends(get_db)):
 
 @router.patch("/{todo_id}/toggle", response_model=TodoWithRelations)
 @router.patch("/{todo_id}/toggle/", response_model=TodoWithRelations)
-def toggle_todo_completion(todo_id: int, db: Session = Depends(get_db)):
+def toggle_todo_completion(
+    todo_id: int,
+    include: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
     """Toggle todo completion status"""
+    include_list = _parse_selection(include, TODO_RELATIONS, "include")
+    
     todo_service = TodoService(db)
-    updated_todo = todo_service.toggle_todo_completion(todo_id)
+    updated_todo = todo_service.toggle_todo_completion(todo_id, include=include_list)
     if not updated_todo:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Todo not found"
         )
+    if include_list is not None:
+        return JSONResponse(_serialize_todo(updated_todo, include_list, None))
     return updated_todo 
\ No newline at end of file
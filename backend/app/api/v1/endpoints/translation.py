@@ -1,9 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
-from ....core.database import get_db
-from ....schemas.translation import Translation, TranslationRequest, TodoTranslationRequest
-from ....services.todo_service import TodoService
+from typing import List, Union
+from ....core.database import get_async_db, get_db
+from ....core.disconnect import CLIENT_CLOSED_REQUEST, ClientDisconnected, cancel_on_disconnect
+from ....schemas.translation import (
+    Translation, TranslationRequest, TodoTranslationRequest, TodoBatchTranslationRequest
+)
+from ....services.todo_service import AsyncTodoService, TodoService
 
 router = APIRouter()
 
@@ -12,34 +16,67 @@ router = APIRouter()
 async def translate_todo(
     todo_id: int,
     request: TodoTranslationRequest,
-    db: Session = Depends(get_db)
+    http_request: Request,
+    db: Union[Session, AsyncSession] = Depends(get_async_db)
 ):
     """Translate a todo to target language"""
-    todo_service = TodoService(db)
+    todo_service = AsyncTodoService(db)
     
     try:
-        translation = await todo_service.translate_todo(
+        translation = await cancel_on_disconnect(http_request, todo_service.translate_todo(
             todo_id=todo_id,
             target_language=request.target_language
-        )
+        ))
         if not translation:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Todo not found"
             )
         return translation
+    except ClientDisconnected:
+        return Response(status_code=CLIENT_CLOSED_REQUEST)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e)
         )
 
+@router.post("/{todo_id}/translate/batch", response_model=List[Translation])
+@router.post("/{todo_id}/translate/batch/", response_model=List[Translation])
+async def translate_todo_batch(
+    todo_id: int,
+    request: TodoBatchTranslationRequest,
+    http_request: Request,
+    db: Union[Session, AsyncSession] = Depends(get_async_db)
+):
+    """Translate a todo into several languages concurrently"""
+    todo_service = AsyncTodoService(db)
+    
+    try:
+        translations = await cancel_on_disconnect(http_request, todo_service.translate_todo_languages(
+            todo_id=todo_id,
+            target_languages=request.target_languages
+        ))
+    except ClientDisconnected:
+        return Response(status_code=CLIENT_CLOSED_REQUEST)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+    if translations is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Todo not found"
+        )
+    return translations
+
 @router.get("/{todo_id}/translations", response_model=List[Translation])
 @router.get("/{todo_id}/translations/", response_model=List[Translation])
 def get_todo_translations(todo_id: int, db: Session = Depends(get_db)):
     """Get all translations for a todo"""
     todo_service = TodoService(db)
-    todo = todo_service.get_todo(todo_id)
+    todo = todo_service.get_todo(todo_id, include=[])
     if not todo:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -49,20 +86,26 @@ def get_todo_translations(todo_id: int, db: Session = Depends(get_db)):
 
 @router.post("/translate", response_model=dict)
 @router.post("/translate/", response_model=dict)
-async def translate_text(request: TranslationRequest):
+async def translate_text(
+    request: TranslationRequest,
+    http_request: Request,
+    db: Union[Session, AsyncSession] = Depends(get_async_db)
+):
     """Translate any text to target language"""
-    from ....services.translation_service import translation_service
+    todo_service = AsyncTodoService(db)
     
     try:
-        translated_text = await translation_service.translate_text(
+        translated_text = await cancel_on_disconnect(http_request, todo_service.translate_text(
             text=request.text,
             target_language=request.target_language
-        )
+        ))
         return {
             "original_text": request.text,
             "translated_text": translated_text,
             "target_language": request.target_language
         }
+    except ClientDisconnected:
+        return Response(status_code=CLIENT_CLOSED_REQUEST)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
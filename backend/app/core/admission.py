@@ -0,0 +1,194 @@
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+from typing import AsyncIterator, Deque, Dict, List, Optional, Pattern, Tuple
+from .config import settings
+from .metrics import metrics
+import asyncio
+import math
+import re
+
+class Overloaded(Exception):
+    """Raised when a request is shed instead of queued"""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class AdmissionController:
+    """Bounds concurrent work for one group of endpoints
+
+    Up to `concurrency` requests run at once and up to `max_queued` more
+    wait for a slot. Each client may hold at most `per_client` of these
+    (running or waiting), and freed slots go to waiting clients in turn, so
+    one busy client cannot crowd out the others. Requests that find the
+    queue full, exceed their client's share or wait longer than
+    `queue_timeout` seconds are rejected with `Overloaded`.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        concurrency: int = 8,
+        max_queued: int = 32,
+        per_client: int = 4,
+        queue_timeout: float = 10.0
+    ):
+        self.name = name
+        self.concurrency = concurrency
+        self.max_queued = max_queued
+        self.per_client = per_client
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self.queued = 0
+        self._clients: Dict[str, int] = {}
+        self._waiting: "OrderedDict[str, Deque[asyncio.Future]]" = OrderedDict()
+        # Moving average of how long admitted requests take, for Retry-After
+        self._service_time = 1.0
+
+    @asynccontextmanager
+    async def admit(self, client: str) -> AsyncIterator[None]:
+        """Hold a slot for `client` while the block runs"""
+        await self._acquire(client)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        try:
+            yield
+        finally:
+            self._service_time = 0.8 * self._service_time + 0.2 * (loop.time() - started)
+            self._release(client)
+
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely to be free"""
+        backlog = (self.queued + 1) / max(self.concurrency, 1)
+        return max(1, min(60, math.ceil(self._service_time * backlog)))
+
+    async def _acquire(self, client: str) -> None:
+        if self._clients.get(client, 0) >= self.per_client:
+            self._reject("client_share", f"Too many concurrent {self.name} requests from this client")
+        if self.active < self.concurrency and not self.queued:
+            self.active += 1
+            self._clients[client] = self._clients.get(client, 0) + 1
+            return
+        if self.queued >= self.max_queued:
+            self._reject("queue_full", f"Too many {self.name} requests in progress")
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiting.setdefault(client, deque()).append(future)
+        self.queued += 1
+        self._clients[client] = self._clients.get(client, 0) + 1
+        metrics.increment(f"admission_{self.name}_queued")
+        try:
+            await asyncio.wait_for(future, self.queue_timeout)
+        except BaseException as e:
+            if future.cancelled():
+                # Still waiting: leave the queue
+                self._dequeue(client, future)
+                self._forget(client)
+            else:
+                # Handed a slot just as we gave up
+                self._release(client)
+            if isinstance(e, asyncio.TimeoutError):
+                self._reject("timeout", f"Timed out waiting for a {self.name} slot")
+            raise
+
+    def _release(self, client: str) -> None:
+        self.active -= 1
+        self._forget(client)
+        # Hand freed slots to waiting clients in turn
+        while self.active < self.concurrency and self._waiting:
+            waiting_client, futures = self._waiting.popitem(last=False)
+            future = futures.popleft()
+            if futures:
+                self._waiting[waiting_client] = futures
+            self.queued -= 1
+            if future.done():
+                # Timed out or cancelled but not resumed yet; the waiter
+                # only has to give back its client share
+                continue
+            self.active += 1
+            future.set_result(None)
+
+    def _dequeue(self, client: str, future: asyncio.Future) -> None:
+        futures = self._waiting.get(client)
+        if futures is not None and future in futures:
+            futures.remove(future)
+            self.queued -= 1
+            if not futures:
+                del self._waiting[client]
+
+    def _forget(self, client: str) -> None:
+        self._clients[client] -= 1
+        if not self._clients[client]:
+            del self._clients[client]
+
+    def _reject(self, reason: str, message: str) -> None:
+        metrics.increment(f"admission_{self.name}_rejected_{reason}")
+        raise Overloaded(message, self.retry_after())
+
+def client_id(scope: Scope) -> str:
+    """The caller a request counts against: first forwarded address, else the peer"""
+    for name, value in scope["headers"]:
+        if name == b"x-forwarded-for":
+            return value.decode("latin-1").split(",")[0].strip()
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+class AdmissionMiddleware:
+    """Admits POST requests to the AI endpoints through their controllers
+
+    Requests are held for their whole response, streams included; shed
+    ones get 503 with Retry-After without reaching the endpoint. Other
+    routes (the CRUD endpoints) are never queued.
+    """
+
+    def __init__(self, app: ASGIApp, routes: Optional[List[Tuple[Pattern, AdmissionController]]] = None):
+        self.app = app
+        self.routes = ADMISSION_ROUTES if routes is None else routes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        controller = None
+        if scope["type"] == "http" and scope["method"] == "POST":
+            controller = next((c for route, c in self.routes if route.match(scope["path"])), None)
+        if controller is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            async with controller.admit(client_id(scope)):
+                await self.app(scope, receive, send)
+        except Overloaded as e:
+            response = JSONResponse(
+                {"detail": str(e)},
+                status_code=503,
+                headers={"Retry-After": str(e.retry_after)}
+            )
+            await response(scope, receive, send)
+
+# One controller per group of AI endpoints
+admission_controllers: Dict[str, AdmissionController] = {
+    name: AdmissionController(
+        name,
+        concurrency=concurrency,
+        max_queued=settings.ADMISSION_QUEUE_SIZE,
+        per_client=settings.ADMISSION_PER_CLIENT,
+        queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT_SECONDS
+    )
+    for name, concurrency in (
+        ("generate", settings.ADMISSION_GENERATE_CONCURRENCY),
+        ("translate", settings.ADMISSION_TRANSLATE_CONCURRENCY),
+    )
+}
+
+ADMISSION_ROUTES: List[Tuple[Pattern, AdmissionController]] = [
+    (re.compile(rf"^{re.escape(settings.API_V1_STR)}{route}/?$"), admission_controllers[name])
+    for route, name in (
+        (r"/todos/\d+/generate", "generate"),
+        (r"/todos/\d+/generate/stream", "generate"),
+        (r"/todos/generate/batch", "generate"),
+        (r"/todos/\d+/translate", "translate"),
+        (r"/todos/\d+/translate/batch", "translate"),
+        (r"/todos/translate", "translate"),
+    )
+]
@@ -10,10 +10,111 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str = "sqlite:///./todo_app.db"
+    # Use an AsyncSession (aiosqlite / asyncpg) for the async AI endpoints
+    DATABASE_ASYNC: bool = False
+    # Defaults to DATABASE_URL with its async driver
+    ASYNC_DATABASE_URL: str = ""
+    # Create missing tables at startup; turn off once `alembic upgrade head`
+    # manages the schema
+    DATABASE_CREATE_ALL: bool = True
+    
+    # Connection pool (ignored for in-memory SQLite)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_RECYCLE: int = 1800
+    
+    # SQLite pragmas applied to every connection
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_MMAP_SIZE: int = 268435456
+    # Negative values are KiB, positive values are pages
+    SQLITE_CACHE_SIZE: int = -64000
+    
+    # Group commit: route writes through one writer that commits in batches
+    WRITE_QUEUE_ENABLED: bool = False
+    WRITE_QUEUE_MAX_BATCH_SIZE: int = 64
+    WRITE_QUEUE_MAX_DELAY_MS: float = 2.0
+    
+    # Shared translation cache, keyed by normalized text, language and model
+    TRANSLATION_CACHE_TTL_SECONDS: int = 30 * 24 * 3600
+    TRANSLATION_CACHE_MAX_ENTRIES: int = 10000
+    # Translation calls in flight at once for one multi-language request
+    TRANSLATION_MAX_CONCURRENCY: int = 4
+    # Concurrent single translations into one language are sent together:
+    # collected for up to this long (0 disables batching) or until this many wait
+    TRANSLATION_BATCH_WINDOW_MS: float = 10.0
+    TRANSLATION_BATCH_MAX_ITEMS: int = 16
+    
+    # Background translation of new and edited todos into these languages
+    # (JSON list, e.g. ["es", "fr"]; empty disables it). The warmer waits
+    # while an AI endpoint group uses more than MAX_AI_LOAD of its slots or
+    # has requests queued, or more than that share of the LLM quota is spent
+    TRANSLATION_WARMER_LANGUAGES: List[str] = []
+    TRANSLATION_WARMER_MAX_QUEUED: int = 1000
+    TRANSLATION_WARMER_MAX_AI_LOAD: float = 0.5
+    TRANSLATION_WARMER_BACKOFF_SECONDS: float = 1.0
+    
+    # Reuse of generated subtasks for todos with similar text (MinHash over
+    # character shingles); similarity is estimated between 0 and 1
+    SUBTASK_CACHE_ENABLED: bool = True
+    SUBTASK_CACHE_THRESHOLD: float = 0.8
+    SUBTASK_CACHE_MAX_ENTRIES: int = 5000
+    
+    # Idempotency-Key support on create, generate and translate endpoints
+    IDEMPOTENCY_TTL_SECONDS: int = 24 * 3600
+    # How long a retry waits for the original request before 409
+    IDEMPOTENCY_WAIT_SECONDS: float = 60.0
+    # How long an in-progress key stays claimed without being renewed (a
+    # running request renews it); a key left by a crashed process is free
+    # again after this. Defaults to the wait plus the LLM timeout
+    IDEMPOTENCY_LEASE_SECONDS: float = 90.0
+    # Larger responses are not stored (the key is released instead)
+    IDEMPOTENCY_MAX_BODY_BYTES: int = 1_000_000
+    
+    # Admission control for the AI endpoints: requests running at once per
+    # endpoint group, requests waiting beyond those, and each client's share
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_GENERATE_CONCURRENCY: int = 8
+    ADMISSION_TRANSLATE_CONCURRENCY: int = 8
+    ADMISSION_QUEUE_SIZE: int = 32
+    ADMISSION_PER_CLIENT: int = 4
+    ADMISSION_QUEUE_TIMEOUT_SECONDS: float = 10.0
+    
+    # Background jobs (AI subtask generation)
+    JOB_WORKERS: int = 2
+    JOB_QUEUE_MAX_SIZE: int = 1000
+    
+    # AI backend: "groq", or "fake" for deterministic offline answers
+    LLM_PROVIDER: str = "groq"
+    FAKE_LLM_DELAY_MS: float = 0
+    # Let AI work finish when its client disconnects, so the result is
+    # still saved (and replayed for an Idempotency-Key), instead of cancelling it
+    AI_KEEP_ORPHANED_RESULTS: bool = False
     
     # Groq Configuration
     GROQ_API_KEY: str = ""
     GROQ_MODEL_NAME: str = "llama3-8b-8192"
+    # Context window of the model; batched prompts are packed to fit it
+    LLM_CONTEXT_TOKENS: int = 8192
+    
+    # LLM client: OpenAI-compatible endpoint, connection pool, provider
+    # quotas and retry policy
+    LLM_BASE_URL: str = "https://api.groq.com/openai/v1"
+    LLM_MAX_CONNECTIONS: int = 20
+    LLM_REQUESTS_PER_MINUTE: int = 30
+    LLM_TOKENS_PER_MINUTE: int = 30000
+    LLM_TIMEOUT_SECONDS: float = 30.0
+    LLM_MAX_RETRIES: int = 4
+    LLM_BACKOFF_BASE_MS: float = 500
+    LLM_BACKOFF_MAX_MS: float = 20000
+    # Circuit breaker: open after this share of the last calls failed, then
+    # probe again after the open period (subtasks come from a local fallback meanwhile)
+    LLM_BREAKER_ENABLED: bool = True
+    LLM_BREAKER_FAILURE_RATE: float = 0.5
+    LLM_BREAKER_MIN_CALLS: int = 5
+    LLM_BREAKER_WINDOW: int = 20
+    LLM_BREAKER_OPEN_SECONDS: float = 30.0
     
     # CORS - Not needed for Hugging Face Spaces deployment
     # BACKEND_CORS_ORIGINS: List[str] = []
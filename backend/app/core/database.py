@@ -1,19 +1,107 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from .config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+def is_sqlite(url: str) -> bool:
+    """Whether a database URL points at SQLite"""
+    return url.startswith("sqlite")
+
+def is_memory_database(url: str) -> bool:
+    """Whether a SQLite URL is an in-memory database"""
+    return make_url(url).database in (None, "", ":memory:")
+
+def get_pool_options(url: str) -> dict:
+    """Connection pool arguments for a database URL"""
+    # In-memory SQLite uses a single-connection pool that takes no sizing
+    if is_sqlite(url) and is_memory_database(url):
+        return {}
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": True,
+    }
+
+def get_sqlite_pragmas() -> dict:
+    """SQLite pragmas applied to every new connection"""
+    return {
+        # busy_timeout goes first so the journal mode switch can wait for locks
+        "busy_timeout": settings.SQLITE_BUSY_TIMEOUT_MS,
+        "journal_mode": settings.SQLITE_JOURNAL_MODE,
+        "synchronous": settings.SQLITE_SYNCHRONOUS,
+        "mmap_size": settings.SQLITE_MMAP_SIZE,
+        "cache_size": settings.SQLITE_CACHE_SIZE,
+    }
+
+def apply_sqlite_pragmas(engine: Engine) -> None:
+    """Run the configured pragmas on every connection the engine opens"""
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in get_sqlite_pragmas().items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+        # Let SQLAlchemy issue BEGIN itself; the driver's implicit transaction
+        # handling would otherwise turn a leading SAVEPOINT into the outer
+        # transaction and commit it on release
+        dbapi_connection.isolation_level = None
+    
+    @event.listens_for(engine, "begin")
+    def begin_sqlite_transaction(connection):
+        connection.exec_driver_sql("BEGIN")
 
 # Create engine
-if settings.DATABASE_URL.startswith("sqlite"):
+if is_sqlite(settings.DATABASE_URL):
     engine = create_engine(
-        settings.DATABASE_URL, 
-        connect_args={"check_same_thread": False}
+        settings.DATABASE_URL,
+        connect_args={"check_same_thread": False},
+        **get_pool_options(settings.DATABASE_URL)
     )
+    apply_sqlite_pragmas(engine)
 else:
-    engine = create_engine(settings.DATABASE_URL)
+    engine = create_engine(settings.DATABASE_URL, **get_pool_options(settings.DATABASE_URL))
 
 # Create session
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Objects stay loaded after commit so write paths can return them without
+# another round trip
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+
+# Async engine and session, only created when enabled
+def get_async_database_url(url: str) -> str:
+    """Map a sync database URL onto the matching async driver"""
+    if url.startswith("sqlite:"):
+        return url.replace("sqlite:", "sqlite+aiosqlite:", 1)
+    if url.startswith(("postgresql:", "postgres:")):
+        return "postgresql+asyncpg:" + url.split(":", 1)[1]
+    return url
+
+async_engine = None
+AsyncSessionLocal = None
+if settings.DATABASE_ASYNC:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    async_database_url = settings.ASYNC_DATABASE_URL or get_async_database_url(settings.DATABASE_URL)
+    async_engine = create_async_engine(async_database_url, **get_pool_options(async_database_url))
+    if is_sqlite(async_database_url):
+        apply_sqlite_pragmas(async_engine.sync_engine)
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+def log_database_settings() -> None:
+    """Log the pool and pragma settings that actually took effect"""
+    effective = {"dialect": engine.dialect.name, "pool": type(engine.pool).__name__}
+    effective.update(get_pool_options(settings.DATABASE_URL))
+    if engine.dialect.name == "sqlite":
+        with engine.connect() as connection:
+            for name in get_sqlite_pragmas():
+                effective[name] = connection.exec_driver_sql(f"PRAGMA {name}").scalar()
+    logger.info("Database settings: %s", ", ".join(f"{key}={value}" for key, value in effective.items()))
 
 # Base class for models
 Base = declarative_base()
@@ -24,4 +112,18 @@ def get_db():
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
+
+# Dependency for async endpoints: an AsyncSession when DATABASE_ASYNC is
+# enabled, otherwise a regular session that AsyncTodoService runs in a thread
+async def get_async_db():
+    if AsyncSessionLocal is None:
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+        return
+
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,96 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from starlette.requests import Request
+from typing import Awaitable, Iterator, Optional, TypeVar
+from .config import settings
+from .metrics import metrics
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Status logged for requests whose client went away (nginx's convention)
+CLIENT_CLOSED_REQUEST = 499
+
+class ClientDisconnected(Exception):
+    """The client went away before the work for its request finished"""
+
+class _WorkState:
+    """Shared by a request's work and the tasks it starts"""
+
+    def __init__(self):
+        self.writes_in_progress = 0
+
+_work_state: ContextVar[Optional[_WorkState]] = ContextVar("disconnect_work_state", default=None)
+
+@contextmanager
+def persisting() -> Iterator[None]:
+    """Mark a database write in progress for the current request's work
+
+    A disconnect that lands meanwhile no longer cancels the work: the
+    write may already be on its way to the database (in a thread or the
+    write queue) where cancelling cannot stop it.
+    """
+    state = _work_state.get()
+    if state is None:
+        yield
+        return
+    state.writes_in_progress += 1
+    try:
+        yield
+    finally:
+        state.writes_in_progress -= 1
+
+async def _disconnected(request: Request) -> None:
+    """Return once the client disconnects (the request body must already be read)"""
+    while True:
+        message = await request.receive()
+        if message["type"] == "http.disconnect":
+            return
+
+async def cancel_on_disconnect(request: Request, work: Awaitable[T], keep_result: Optional[bool] = None) -> T:
+    """Await `work`, cancelling it if the client disconnects first
+
+    Cancelling stops the LLM call (closing its connection) and any database
+    writes that had not started. If a write has started (see `persisting`)
+    the result is stored instead of cancelled: the work is left to finish
+    and its result returned, so the response is saved for the
+    Idempotency-Key and a retry replays it rather than writing again. With
+    `keep_result` (by default `AI_KEEP_ORPHANED_RESULTS`) the work is
+    always left to finish.
+    """
+    keep_result = settings.AI_KEEP_ORPHANED_RESULTS if keep_result is None else keep_result
+    state = _WorkState()
+    token = _work_state.set(state)
+    try:
+        # The task (and tasks it starts) see the state through their context
+        task = asyncio.ensure_future(work)
+    finally:
+        _work_state.reset(token)
+    watcher = asyncio.ensure_future(_disconnected(request))
+    try:
+        await asyncio.wait({task, watcher}, return_when=asyncio.FIRST_COMPLETED)
+    except asyncio.CancelledError:
+        task.cancel()
+        raise
+    finally:
+        watcher.cancel()
+
+    if task.done():
+        return task.result()
+
+    metrics.increment("ai_requests_disconnected")
+    if keep_result:
+        logger.info("Client disconnected, finishing %s for later retries", request.url.path)
+        return await task
+    if state.writes_in_progress:
+        metrics.increment("ai_requests_disconnected_while_persisting")
+        logger.info("Client disconnected while %s was saving, storing its result", request.url.path)
+        return await task
+
+    logger.info("Client disconnected, cancelling %s", request.url.path)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    raise ClientDisconnected()
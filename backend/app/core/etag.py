@@ -0,0 +1,22 @@
+from starlette.responses import Response
+from typing import Dict, Optional
+import hashlib
+
+def make_etag(*parts) -> str:
+    """Strong ETag for a representation fully determined by `parts`"""
+    return '"' + hashlib.sha256(repr(parts).encode("utf-8")).hexdigest()[:32] + '"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header lists `etag` (weak comparison, as for GET)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+def cache_headers(etag: str) -> Dict[str, str]:
+    """Let clients keep the response but revalidate it on every use"""
+    return {"ETag": etag, "Cache-Control": "no-cache"}
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers=cache_headers(etag))
@@ -0,0 +1,339 @@
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import delete, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from typing import Callable, Dict, List, Optional, Pattern, Tuple
+from ..models.idempotency import IDEMPOTENCY_COMPLETED, IDEMPOTENCY_IN_PROGRESS, IdempotencyKey
+from .config import settings
+from .database import SessionLocal
+from .disconnect import CLIENT_CLOSED_REQUEST
+from .metrics import metrics
+import asyncio
+import hashlib
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_HEADER = "idempotency-key"
+REPLAYED_HEADER = "idempotent-replayed"
+MAX_KEY_LENGTH = 255
+
+# How often a retry re-checks a request running in another process
+POLL_INTERVAL = 0.25
+
+# POST endpoints that honour the header: creating todos, AI generation and translation
+IDEMPOTENT_ROUTES: List[Pattern] = [
+    re.compile(rf"^{re.escape(settings.API_V1_STR)}{route}/?$")
+    for route in (
+        r"/todos",
+        r"/todos/bulk",
+        r"/todos/\d+/generate",
+        r"/todos/\d+/generate/jobs",
+        r"/todos/generate/batch",
+        r"/todos/\d+/translate",
+        r"/todos/\d+/translate/batch",
+        r"/todos/translate",
+    )
+]
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+def _expired(record: IdempotencyKey, now: datetime) -> bool:
+    expires_at = record.expires_at
+    if expires_at.tzinfo is None:
+        # SQLite hands timestamps back without their zone; they are stored in UTC
+        expires_at = expires_at.replace(tzinfo=timezone.utc)
+    return expires_at <= now
+
+class IdempotencyStore:
+    """Persists the state and response of each idempotency key
+
+    A key is claimed by inserting an in-progress row; the unique constraint
+    makes sure only one request runs. The row is then completed with the
+    response, or deleted if the request failed so a retry can run it again.
+    An in-progress claim only lasts `lease_seconds` unless renewed, so a key
+    left behind by a crashed process is taken over by the next retry; a
+    completed one is kept for `ttl_seconds`.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        ttl_seconds: int = 24 * 3600,
+        lease_seconds: float = 90.0
+    ):
+        self.session_factory = session_factory
+        self.ttl = timedelta(seconds=ttl_seconds)
+        self.lease = timedelta(seconds=lease_seconds)
+
+    def claim(self, key: str, method: str, path: str, request_hash: str) -> Tuple[bool, IdempotencyKey]:
+        """Claim a key; returns whether it was claimed and the key's row"""
+        now = _utcnow()
+        with self.session_factory() as db:
+            while True:
+                record = IdempotencyKey(
+                    key=key,
+                    method=method,
+                    path=path,
+                    request_hash=request_hash,
+                    status=IDEMPOTENCY_IN_PROGRESS,
+                    expires_at=now + self.lease
+                )
+                db.add(record)
+                try:
+                    db.commit()
+                    return True, record
+                except IntegrityError:
+                    db.rollback()
+
+                existing = db.query(IdempotencyKey).filter(
+                    IdempotencyKey.key == key,
+                    IdempotencyKey.method == method,
+                    IdempotencyKey.path == path
+                ).first()
+                if existing is None:
+                    # Released between our insert and the lookup
+                    continue
+                if not _expired(existing, now):
+                    return False, existing
+                db.delete(existing)
+                db.commit()
+
+    def get(self, record_id: int) -> Optional[IdempotencyKey]:
+        with self.session_factory() as db:
+            return db.get(IdempotencyKey, record_id)
+
+    def renew(self, record_id: int) -> None:
+        """Extend the lease of a key whose request is still running"""
+        with self.session_factory() as db:
+            db.execute(
+                update(IdempotencyKey)
+                .where(IdempotencyKey.id == record_id, IdempotencyKey.status == IDEMPOTENCY_IN_PROGRESS)
+                .values(expires_at=_utcnow() + self.lease)
+            )
+            db.commit()
+
+    def complete(self, record_id: int, status_code: int, headers: List[List[str]], body: bytes) -> None:
+        """Store the response a claimed key produced for the replay window"""
+        with self.session_factory() as db:
+            record = db.get(IdempotencyKey, record_id)
+            if record is None:
+                return
+            record.status = IDEMPOTENCY_COMPLETED
+            record.status_code = status_code
+            record.headers = headers
+            record.body = body
+            record.expires_at = _utcnow() + self.ttl
+            db.commit()
+
+    def release(self, record_id: int) -> None:
+        """Forget a claimed key so the request can be retried"""
+        with self.session_factory() as db:
+            db.execute(delete(IdempotencyKey).where(IdempotencyKey.id == record_id))
+            db.commit()
+
+    def purge_expired(self) -> int:
+        """Delete keys past their replay window or lease; returns how many went"""
+        with self.session_factory() as db:
+            result = db.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at <= _utcnow()))
+            db.commit()
+            return result.rowcount
+
+class IdempotencyMiddleware:
+    """Replays the stored response for a repeated Idempotency-Key
+
+    Applies to POST requests on `IDEMPOTENT_ROUTES` that send the header.
+    The first request with a key runs and its response (any status below
+    500, bar a disconnected client's 499) is stored for the replay window. Later requests with the same key
+    get that response back with an `Idempotent-Replayed: true` header;
+    ones arriving while the first is still running wait for it (waking as
+    soon as it finishes in this process, polling the table otherwise) and
+    get 409 if it outlasts `wait_seconds`. Reusing a key with a different
+    body is rejected with 422. Streamed responses are never stored.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        store: Optional[IdempotencyStore] = None,
+        routes: Optional[List[Pattern]] = None,
+        wait_seconds: Optional[float] = None,
+        max_body_bytes: Optional[int] = None
+    ):
+        self.app = app
+        self._store = store
+        self.routes = IDEMPOTENT_ROUTES if routes is None else routes
+        self.wait_seconds = settings.IDEMPOTENCY_WAIT_SECONDS if wait_seconds is None else wait_seconds
+        self.max_body_bytes = settings.IDEMPOTENCY_MAX_BODY_BYTES if max_body_bytes is None else max_body_bytes
+        # Requests running in this process, by key row id
+        self._running: Dict[int, asyncio.Event] = {}
+
+    @property
+    def store(self) -> IdempotencyStore:
+        return self._store or idempotency_store
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "POST"
+            or not any(route.match(scope["path"]) for route in self.routes)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        key = _header(scope, IDEMPOTENCY_HEADER)
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+        if not key or len(key) > MAX_KEY_LENGTH:
+            await _error(scope, receive, send, 400, f"Idempotency-Key must be 1 to {MAX_KEY_LENGTH} characters")
+            return
+
+        body = await _read_body(receive)
+        request_hash = hashlib.sha256(body).hexdigest()
+        deadline = asyncio.get_running_loop().time() + self.wait_seconds
+        while True:
+            claimed, record = await asyncio.to_thread(
+                self.store.claim, key, scope["method"], scope["path"], request_hash
+            )
+            if claimed:
+                break
+            if record.request_hash != request_hash:
+                await _error(scope, receive, send, 422, "Idempotency-Key was already used with a different request")
+                return
+            if record.status == IDEMPOTENCY_COMPLETED:
+                metrics.increment("idempotency_replays")
+                await self._replay(record, send)
+                return
+
+            remaining = deadline - asyncio.get_running_loop().time()
+            if remaining <= 0:
+                await _error(
+                    scope, receive, send, 409,
+                    "A request with this Idempotency-Key is still in progress",
+                    headers={"Retry-After": "1"}
+                )
+                return
+            metrics.increment("idempotency_waits")
+            await self._wait(record.id, remaining)
+
+        await self._run(record.id, scope, body, receive, send)
+
+    async def _wait(self, record_id: int, timeout: float) -> None:
+        """Wait for a running request to finish, or for the next poll"""
+        event = self._running.get(record_id)
+        if event is None:
+            await asyncio.sleep(min(timeout, POLL_INTERVAL))
+            return
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _run(self, record_id: int, scope: Scope, body: bytes, receive: Receive, send: Send) -> None:
+        """Run the request for a claimed key and store its response"""
+        event = self._running[record_id] = asyncio.Event()
+        start: Optional[Message] = None
+        chunks: List[bytes] = []
+        size = 0
+        body_sent = False
+
+        async def replay_receive() -> Message:
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        async def capture_send(message: Message) -> None:
+            nonlocal start, size
+            if message["type"] == "http.response.start":
+                start = message
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+                if size <= self.max_body_bytes:
+                    chunks.append(message.get("body", b""))
+            await send(message)
+
+        stored = False
+        renewing = asyncio.ensure_future(self._renew(record_id))
+        try:
+            await self.app(scope, replay_receive, capture_send)
+            if start is not None and self._storable(start, size):
+                headers = [[name.decode("latin-1"), value.decode("latin-1")] for name, value in start["headers"]]
+                await asyncio.to_thread(self.store.complete, record_id, start["status"], headers, b"".join(chunks))
+                stored = True
+        finally:
+            renewing.cancel()
+            try:
+                if not stored:
+                    await asyncio.to_thread(self.store.release, record_id)
+            finally:
+                del self._running[record_id]
+                event.set()
+
+    async def _renew(self, record_id: int) -> None:
+        """Keep the key claimed while its request runs"""
+        interval = self.store.lease.total_seconds() / 3
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await asyncio.to_thread(self.store.renew, record_id)
+            except Exception as e:
+                logger.warning(f"Renewing idempotency key {record_id} failed: {str(e)}")
+
+    def _storable(self, start: Message, size: int) -> bool:
+        """Server errors and abandoned requests are retried, streams and oversized bodies are not replayable"""
+        content_type = dict(start["headers"]).get(b"content-type", b"")
+        return (
+            start["status"] < 500
+            and start["status"] != CLIENT_CLOSED_REQUEST
+            and size <= self.max_body_bytes
+            and not content_type.startswith(b"text/event-stream")
+        )
+
+    async def _replay(self, record: IdempotencyKey, send: Send) -> None:
+        headers = [(name.encode("latin-1"), value.encode("latin-1")) for name, value in record.headers or []]
+        headers.append((REPLAYED_HEADER.encode("latin-1"), b"true"))
+        await send({"type": "http.response.start", "status": record.status_code, "headers": headers})
+        await send({"type": "http.response.body", "body": record.body or b""})
+
+def _header(scope: Scope, name: str) -> Optional[str]:
+    encoded = name.encode("latin-1")
+    for key, value in scope["headers"]:
+        if key.lower() == encoded:
+            return value.decode("latin-1").strip()
+    return None
+
+async def _read_body(receive: Receive) -> bytes:
+    chunks = []
+    while True:
+        message = await receive()
+        if message["type"] != "http.request":
+            break
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            break
+    return b"".join(chunks)
+
+async def _error(
+    scope: Scope,
+    receive: Receive,
+    send: Send,
+    status_code: int,
+    detail: str,
+    headers: Optional[Dict[str, str]] = None
+) -> None:
+    response = JSONResponse({"detail": detail}, status_code=status_code, headers=headers)
+    await response(scope, receive, send)
+
+# Shared store used by the middleware
+idempotency_store = IdempotencyStore(
+    SessionLocal,
+    ttl_seconds=settings.IDEMPOTENCY_TTL_SECONDS,
+    lease_seconds=settings.IDEMPOTENCY_LEASE_SECONDS
+)
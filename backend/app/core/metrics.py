@@ -0,0 +1,32 @@
+from collections import defaultdict
+from typing import Dict
+import threading
+
+class Metrics:
+    """Process-wide counters, readable at GET /metrics"""
+
+    def __init__(self):
+        self._counters: Dict[str, float] = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def increment(self, name: str, amount: float = 1) -> None:
+        """Add `amount` to a counter, creating it at zero"""
+        with self._lock:
+            self._counters[name] += amount
+
+    def get(self, name: str) -> float:
+        """Current value of a counter"""
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def snapshot(self) -> Dict[str, float]:
+        """Copy of every counter"""
+        with self._lock:
+            return dict(self._counters)
+
+    def reset(self) -> None:
+        """Drop every counter"""
+        with self._lock:
+            self._counters.clear()
+
+metrics = Metrics()
@@ -0,0 +1,45 @@
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+from .metrics import metrics
+import asyncio
+
+T = TypeVar("T")
+
+class SingleFlight:
+    """Coalesces concurrent calls that share a key into one execution
+    
+    The first caller for a key runs the work; callers that arrive while it
+    is in flight wait for the same result (or error). Followers are
+    shielded, so one of them going away does not affect the others. If the
+    caller running the work is cancelled, a waiting follower takes over
+    and runs it again.
+    """
+    
+    def __init__(self):
+        self._calls: Dict[Hashable, "asyncio.Task"] = {}
+    
+    def in_flight(self, key: Hashable) -> bool:
+        """Whether a call for `key` is running"""
+        return key in self._calls
+    
+    async def do(self, key: Hashable, work: Callable[[], Awaitable[T]]) -> T:
+        """Run `work()` unless a call with the same key is already running"""
+        while True:
+            task = self._calls.get(key)
+            if task is None:
+                task = asyncio.ensure_future(work())
+                self._calls[key] = task
+                task.add_done_callback(lambda done: self._forget(key, done))
+                return await task
+            
+            metrics.increment("singleflight_coalesced")
+            try:
+                return await asyncio.shield(task)
+            except asyncio.CancelledError:
+                # Retry only when the shared call was cancelled, not us
+                if task.cancelled() and not asyncio.current_task().cancelling():
+                    continue
+                raise
+    
+    def _forget(self, key: Hashable, task: "asyncio.Task") -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
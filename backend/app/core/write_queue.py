@@ -0,0 +1,168 @@
+from concurrent.futures import Future
+from typing import Callable, List, Optional, Tuple, TypeVar
+from sqlalchemy.orm import Session
+from .config import settings
+from .database import SessionLocal
+import logging
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_STOP = object()
+
+class WriteQueue:
+    """Single writer that commits mutations from concurrent requests in batches
+
+    Queued operations run on the writer's session and the whole batch is
+    committed once. If one of them fails, the batch is replayed with a
+    SAVEPOINT per operation so the error only reaches its own caller. A
+    batch closes when it reaches `max_batch_size` operations or, once other
+    writers are waiting, `max_delay_ms` after its first one.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], max_batch_size: int = 64, max_delay_ms: float = 2.0):
+        self.session_factory = session_factory
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay_ms / 1000
+        self.batches = 0
+        self.writes = 0
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        """Whether the writer thread is accepting operations"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def in_writer(self) -> bool:
+        """Whether the caller is running inside a batch on the writer thread"""
+        return threading.current_thread() is self._thread
+
+    def start(self) -> None:
+        """Start the writer thread"""
+        if self.running:
+            return
+        self._thread = threading.Thread(target=self._run, name="write-queue", daemon=True)
+        self._thread.start()
+        logger.info(
+            "Write queue started (max_batch_size=%s, max_delay_ms=%s)",
+            self.max_batch_size, self.max_delay * 1000
+        )
+
+    def stop(self) -> None:
+        """Commit what is queued, stop the writer and fail anything left over"""
+        if not self.running:
+            return
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._thread = None
+
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                item[1].set_exception(RuntimeError("Write queue stopped"))
+
+    def submit(self, operation: Callable[[Session], T]) -> "Future[T]":
+        """Queue an operation for the next batch; it must not commit itself"""
+        if not self.running:
+            raise RuntimeError("Write queue is not running")
+        future: "Future[T]" = Future()
+        self._queue.put((operation, future))
+        return future
+
+    def run(self, operation: Callable[[Session], T]) -> T:
+        """Queue an operation and wait for its result or error"""
+        return self.submit(operation).result()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+
+            batch, stopping = self._collect_batch(item)
+            self._commit_batch(batch)
+            if stopping:
+                return
+
+    def _collect_batch(self, first: tuple) -> Tuple[list, bool]:
+        """Gather the operations that make up the next batch"""
+        batch = [first]
+        deadline = time.monotonic() + self.max_delay
+        while len(batch) < self.max_batch_size:
+            try:
+                # Take whatever queued up during the previous commit first; a
+                # lone writer is never delayed waiting for company
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                remaining = deadline - time.monotonic()
+                if len(batch) == 1 or remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _commit_batch(self, batch: List[Tuple[Callable[[Session], T], "Future[T]"]]) -> None:
+        """Run every operation of a batch in one transaction and resolve the futures"""
+        batch = [(operation, future) for operation, future in batch if future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+
+        # Optimistically run the batch without savepoints; if any operation
+        # fails, roll back and replay it with one savepoint per operation
+        session = self.session_factory()
+        try:
+            results = [operation(session) for operation, _ in batch]
+            session.commit()
+            outcomes = [(future, result, None) for (_, future), result in zip(batch, results)]
+        except Exception:
+            session.rollback()
+            outcomes = self._commit_isolated(session, batch)
+        finally:
+            session.close()
+
+        self.batches += 1
+        self.writes += len(outcomes)
+        for future, result, error in outcomes:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    def _commit_isolated(self, session: Session, batch: list) -> list:
+        """Replay a failed batch with a savepoint around each operation"""
+        outcomes = []
+        try:
+            for operation, future in batch:
+                try:
+                    with session.begin_nested():
+                        result = operation(session)
+                except Exception as e:
+                    outcomes.append((future, None, e))
+                else:
+                    outcomes.append((future, result, None))
+            session.commit()
+        except Exception as e:
+            logger.error(f"Write batch failed: {str(e)}")
+            session.rollback()
+            return [(future, None, e) for _, future in batch]
+        return outcomes
+
+# Shared writer, started at application startup when WRITE_QUEUE_ENABLED is set
+write_queue = WriteQueue(
+    SessionLocal,
+    max_batch_size=settings.WRITE_QUEUE_MAX_BATCH_SIZE,
+    max_delay_ms=settings.WRITE_QUEUE_MAX_DELAY_MS
+)
@@ -1,18 +1,57 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from .core.admission import AdmissionMiddleware
 from .core.config import settings
-from .core.database import engine, Base
+from .core.database import engine, async_engine, Base, log_database_settings
+from .core.idempotency import IdempotencyMiddleware, idempotency_store
+from .core.metrics import metrics
+from .core.write_queue import write_queue
+from .services.job_queue import job_queue
+from .services.llm_client import close_llm_client
+from .services.translation_warmer import translation_warmer
 from .api.v1.api import api_router
+import asyncio
+import logging
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+logging.basicConfig(level=logging.INFO)
+
+# Create database tables (use `alembic upgrade head` when disabled)
+if settings.DATABASE_CREATE_ALL:
+    Base.metadata.create_all(bind=engine)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    log_database_settings()
+    if settings.WRITE_QUEUE_ENABLED:
+        write_queue.start()
+    await job_queue.start()
+    await translation_warmer.start()
+    await asyncio.to_thread(idempotency_store.purge_expired)
+    yield
+    await translation_warmer.stop()
+    await job_queue.stop()
+    await close_llm_client()
+    write_queue.stop()
+    if async_engine is not None:
+        await async_engine.dispose()
+    engine.dispose()
 
 # Create FastAPI app
 app = FastAPI(
     title=settings.PROJECT_NAME,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
-    debug=settings.DEBUG
+    debug=settings.DEBUG,
+    lifespan=lifespan
 )
 
+# Bound concurrent AI requests so they cannot starve the CRUD endpoints
+if settings.ADMISSION_ENABLED:
+    app.add_middleware(AdmissionMiddleware)
+
+# Replay responses for repeated Idempotency-Key headers (outermost, so
+# replays and waiting retries do not take admission slots)
+app.add_middleware(IdempotencyMiddleware)
+
 # Include API router
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
@@ -24,6 +63,10 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+@app.get("/metrics")
+async def get_metrics():
+    return metrics.snapshot()
+
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True) 
\ No newline at end of file
+    uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
@@ -0,0 +1,28 @@
+from sqlalchemy import Column, Integer, String, DateTime, Index, JSON, LargeBinary, UniqueConstraint
+from sqlalchemy.sql import func
+from ..core.database import Base
+
+# A key is claimed (in_progress) before the request runs and completed
+# with the response it produced
+IDEMPOTENCY_IN_PROGRESS = "in_progress"
+IDEMPOTENCY_COMPLETED = "completed"
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        # A key is scoped to the endpoint it was sent to
+        UniqueConstraint("key", "method", "path", name="uq_idempotency_keys_key_method_path"),
+        Index("ix_idempotency_keys_expires_at", "expires_at"),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    key = Column(String(255), nullable=False)
+    method = Column(String(10), nullable=False)
+    path = Column(String(500), nullable=False)
+    request_hash = Column(String(64), nullable=False)
+    status = Column(String(20), nullable=False, default=IDEMPOTENCY_IN_PROGRESS)
+    status_code = Column(Integer, nullable=True)
+    headers = Column(JSON, nullable=True)
+    body = Column(LargeBinary, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    expires_at = Column(DateTime(timezone=True), nullable=False)
@@ -0,0 +1,28 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index, JSON
+from sqlalchemy.sql import func
+from ..core.database import Base
+
+# Job lifecycle: queued -> running -> done | failed
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+class Job(Base):
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # Unfinished jobs are picked up again in creation order at startup
+        Index("ix_jobs_status_created_at", "status", "created_at"),
+    )
+    
+    id = Column(String(32), primary_key=True)
+    kind = Column(String(50), nullable=False)
+    # No foreign key: a job outlives the todo it was started for
+    todo_id = Column(Integer, nullable=True)
+    status = Column(String(20), nullable=False, default=JOB_QUEUED)
+    params = Column(JSON, nullable=False, default=dict)
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
@@ -0,0 +1,89 @@
+from sqlalchemy import DDL, event
+from ..core.database import Base
+
+# Full-text search over todo titles, descriptions and subtask titles.
+#
+# SQLite keeps an FTS5 table (rowid = todo id) in sync through triggers, so
+# every write path, including set-based bulk statements, updates it.
+# Postgres uses GIN expression indexes that the search query matches.
+
+SEARCH_TABLE = "todo_search"
+
+SQLITE_SEARCH_DDL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5(
+        title, description, subtasks, tokenize = 'unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS todos_search_insert AFTER INSERT ON todos BEGIN
+        INSERT INTO {SEARCH_TABLE} (rowid, title, description, subtasks)
+        VALUES (NEW.id, NEW.title, coalesce(NEW.description, ''), '');
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS todos_search_update AFTER UPDATE OF title, description ON todos BEGIN
+        UPDATE {SEARCH_TABLE} SET title = NEW.title, description = coalesce(NEW.description, '')
+        WHERE rowid = NEW.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS todos_search_delete AFTER DELETE ON todos BEGIN
+        DELETE FROM {SEARCH_TABLE} WHERE rowid = OLD.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS subtasks_search_insert AFTER INSERT ON subtasks BEGIN
+        UPDATE {SEARCH_TABLE} SET subtasks = (
+            SELECT coalesce(group_concat(title, ' '), '') FROM subtasks WHERE todo_id = NEW.todo_id
+        ) WHERE rowid = NEW.todo_id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS subtasks_search_update AFTER UPDATE OF title, todo_id ON subtasks BEGIN
+        UPDATE {SEARCH_TABLE} SET subtasks = (
+            SELECT coalesce(group_concat(title, ' '), '') FROM subtasks WHERE todo_id = OLD.todo_id
+        ) WHERE rowid = OLD.todo_id;
+        UPDATE {SEARCH_TABLE} SET subtasks = (
+            SELECT coalesce(group_concat(title, ' '), '') FROM subtasks WHERE todo_id = NEW.todo_id
+        ) WHERE rowid = NEW.todo_id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS subtasks_search_delete AFTER DELETE ON subtasks BEGIN
+        UPDATE {SEARCH_TABLE} SET subtasks = (
+            SELECT coalesce(group_concat(title, ' '), '') FROM subtasks WHERE todo_id = OLD.todo_id
+        ) WHERE rowid = OLD.todo_id;
+    END
+    """,
+    # Index todos written before the table existed (create_all on an
+    # existing database); the triggers only update rows already indexed
+    f"""
+    INSERT INTO {SEARCH_TABLE} (rowid, title, description, subtasks)
+    SELECT todos.id, todos.title, coalesce(todos.description, ''), coalesce((
+        SELECT group_concat(subtasks.title, ' ') FROM subtasks WHERE subtasks.todo_id = todos.id
+    ), '')
+    FROM todos
+    WHERE todos.id NOT IN (SELECT rowid FROM {SEARCH_TABLE})
+    """,
+]
+
+# The search query in TodoService must use these exact expressions for
+# Postgres to pick the indexes
+POSTGRES_TODO_SEARCH_EXPRESSION = "to_tsvector('simple', coalesce(title, '') || ' ' || coalesce(description, ''))"
+POSTGRES_SUBTASK_SEARCH_EXPRESSION = "to_tsvector('simple', title)"
+
+POSTGRES_SEARCH_DDL = [
+    f"CREATE INDEX IF NOT EXISTS ix_todos_search ON todos USING gin ({POSTGRES_TODO_SEARCH_EXPRESSION})",
+    f"CREATE INDEX IF NOT EXISTS ix_subtasks_search ON subtasks USING gin ({POSTGRES_SUBTASK_SEARCH_EXPRESSION})",
+]
+
+def is_search_object(name: str) -> bool:
+    """Whether a table or index belongs to the search setup, not the models"""
+    return name is not None and (name.startswith(SEARCH_TABLE) or name in ("ix_todos_search", "ix_subtasks_search"))
+
+# Build the search objects whenever create_all builds the tables
+for statement in SQLITE_SEARCH_DDL:
+    event.listen(Base.metadata, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+for statement in POSTGRES_SEARCH_DDL:
+    event.listen(Base.metadata, "after_create", DDL(statement).execute_if(dialect="postgresql"))
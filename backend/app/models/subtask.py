@@ -1,10 +1,14 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey
+from sqlalchemy import DDL, Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Index, UniqueConstraint, event
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from ..core.database import Base
 
 class Subtask(Base):
     __tablename__ = "subtasks"
+    __table_args__ = (
+        # Relation loads by todo_id, listed in order_index order
+        Index("ix_subtasks_todo_id_order_index", "todo_id", "order_index"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     todo_id = Column(Integer, ForeignKey("todos.id"), nullable=False)
@@ -19,6 +23,10 @@ class Subtask(Base):
 
 class Translation(Base):
     __tablename__ = "translations"
+    __table_args__ = (
+        # One translation per language; also serves todo_id lookups
+        UniqueConstraint("todo_id", "language", name="uq_translations_todo_id_language"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     todo_id = Column(Integer, ForeignKey("todos.id"), nullable=False)
@@ -28,4 +36,40 @@ class Translation(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationships
-    todo = relationship("Todo", back_populates="translations") 
\ No newline at end of file
+    todo = relationship("Todo", back_populates="translations") 
+
+# Translations of a todo go stale when its title or description changes.
+# A trigger deletes them in the same statement on every write path (bulk
+# updates included); they are translated again on demand or by the warmer.
+SQLITE_STALE_TRANSLATIONS_DDL = [
+    """
+    CREATE TRIGGER IF NOT EXISTS todos_invalidate_translations AFTER UPDATE OF title, description ON todos
+    WHEN OLD.title IS NOT NEW.title OR OLD.description IS NOT NEW.description
+    BEGIN
+        DELETE FROM translations WHERE todo_id = NEW.id;
+    END
+    """,
+]
+
+POSTGRES_STALE_TRANSLATIONS_DDL = [
+    """
+    CREATE OR REPLACE FUNCTION todos_invalidate_translations() RETURNS trigger AS $$
+    BEGIN
+        DELETE FROM translations WHERE todo_id = NEW.id;
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS todos_invalidate_translations ON todos",
+    """
+    CREATE TRIGGER todos_invalidate_translations AFTER UPDATE OF title, description ON todos
+    FOR EACH ROW
+    WHEN (OLD.title IS DISTINCT FROM NEW.title OR OLD.description IS DISTINCT FROM NEW.description)
+    EXECUTE FUNCTION todos_invalidate_translations()
+    """,
+]
+
+for statement in SQLITE_STALE_TRANSLATIONS_DDL:
+    event.listen(Base.metadata, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+for statement in POSTGRES_STALE_TRANSLATIONS_DDL:
+    event.listen(Base.metadata, "after_create", DDL(statement).execute_if(dialect="postgresql"))
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index, JSON
+from sqlalchemy.sql import func
+from ..core.database import Base
+
+class SubtaskSuggestion(Base):
+    """Subtasks a model generated for a todo's text, reused for similar todos"""
+    __tablename__ = "subtask_suggestions"
+    __table_args__ = (
+        # Oldest suggestions are evicted first
+        Index("ix_subtask_suggestions_created_at", "created_at"),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    model = Column(String(100), nullable=False)
+    title = Column(String(255), nullable=False)
+    description = Column(Text, nullable=True)
+    max_subtasks = Column(Integer, nullable=False)
+    subtasks = Column(JSON, nullable=False)
+    hit_count = Column(Integer, default=0, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,74 @@
+from sqlalchemy import DDL, Column, Integer, String, event
+from ..core.database import Base
+
+# Change counters for the todo tables, used for ETags on the read
+# endpoints. Triggers bump a table's counter in the same transaction as
+# every write to it, bulk statements included, so a reader that sees the
+# counter unchanged has seen no change to the table.
+#
+# A table's version is the sum of its rows: `name` is the table, or
+# "table:shard". SQLite has a single writer, so its per-row triggers bump
+# the one unsharded row (about 1 us per written row). On Postgres one row
+# would serialize every concurrent writer on its row lock until commit, so
+# each connection bumps the shard picked by its backend pid instead.
+VERSIONED_TABLES = ("todos", "subtasks", "translations")
+POSTGRES_VERSION_SHARDS = 16
+
+def table_of(name: str) -> str:
+    """The table a counter row belongs to"""
+    return name.split(":", 1)[0]
+
+class TableVersion(Base):
+    __tablename__ = "table_versions"
+    
+    name = Column(String(50), primary_key=True)
+    version = Column(Integer, default=0, nullable=False)
+
+_SEED_VALUES = ", ".join(f"('{table}', 0)" for table in VERSIONED_TABLES)
+
+SQLITE_TABLE_VERSION_DDL = [
+    f"INSERT OR IGNORE INTO table_versions (name, version) VALUES {_SEED_VALUES}",
+    *(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {table}_version_{operation.lower()} AFTER {operation} ON {table} BEGIN
+            UPDATE table_versions SET version = version + 1 WHERE name = '{table}';
+        END
+        """
+        for table in VERSIONED_TABLES
+        for operation in ("INSERT", "UPDATE", "DELETE")
+    ),
+]
+
+# Postgres bumps once per statement rather than once per row, on the
+# connection's shard
+POSTGRES_BUMP_TABLE_VERSION = f"""
+    CREATE OR REPLACE FUNCTION bump_table_version() RETURNS trigger AS $$
+    BEGIN
+        INSERT INTO table_versions (name, version)
+        VALUES (TG_TABLE_NAME || ':' || (pg_backend_pid() % {POSTGRES_VERSION_SHARDS}), 1)
+        ON CONFLICT (name) DO UPDATE SET version = table_versions.version + 1;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+"""
+
+POSTGRES_TABLE_VERSION_DDL = [
+    f"INSERT INTO table_versions (name, version) VALUES {_SEED_VALUES} ON CONFLICT (name) DO NOTHING",
+    POSTGRES_BUMP_TABLE_VERSION,
+    *(
+        statement
+        for table in VERSIONED_TABLES
+        for statement in (
+            f"DROP TRIGGER IF EXISTS {table}_version ON {table}",
+            f"""
+            CREATE TRIGGER {table}_version AFTER INSERT OR UPDATE OR DELETE ON {table}
+            FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version()
+            """,
+        )
+    ),
+]
+
+for statement in SQLITE_TABLE_VERSION_DDL:
+    event.listen(Base.metadata, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+for statement in POSTGRES_TABLE_VERSION_DDL:
+    event.listen(Base.metadata, "after_create", DDL(statement).execute_if(dialect="postgresql"))
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index, UniqueConstraint
+from sqlalchemy.sql import func
+from ..core.database import Base
+
+class TranslationCacheEntry(Base):
+    __tablename__ = "translation_cache"
+    __table_args__ = (
+        # Lookup key: normalized source text, target language and model
+        UniqueConstraint("text_hash", "language", "model", name="uq_translation_cache_key"),
+        # Least recently used entries are evicted first
+        Index("ix_translation_cache_last_used_at", "last_used_at"),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    text_hash = Column(String(64), nullable=False)
+    language = Column(String(50), nullable=False)
+    model = Column(String(100), nullable=False)
+    translated_text = Column(Text, nullable=False)
+    hit_count = Column(Integer, default=0, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_used_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,17 @@
+from pydantic import BaseModel
+from typing import Any, Optional
+from datetime import datetime
+
+class Job(BaseModel):
+    id: str
+    kind: str
+    todo_id: Optional[int] = None
+    status: str
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
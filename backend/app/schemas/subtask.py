@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Literal, Optional
 from datetime import datetime
 
 class SubtaskBase(BaseModel):
@@ -16,6 +16,13 @@ class SubtaskUpdate(BaseModel):
     completed: Optional[bool] = None
     order_index: Optional[int] = None
 
+class SubtaskBulkUpdateItem(SubtaskUpdate):
+    id: int
+
+class SubtaskBulkUpdate(BaseModel):
+    items: List[SubtaskBulkUpdateItem] = Field(default_factory=list, max_length=1000)
+    complete_all: bool = False
+
 class Subtask(SubtaskBase):
     id: int
     todo_id: int
@@ -28,4 +35,15 @@ class Subtask(SubtaskBase):
 
 class SubtaskGenerateRequest(BaseModel):
     todo_id: int
-    max_subtasks: Optional[int] = Field(default=5, ge=1, le=10) 
\ No newline at end of file
+    max_subtasks: Optional[int] = Field(default=5, ge=1, le=10)
+
+class SubtaskBatchGenerateRequest(BaseModel):
+    todo_ids: List[int] = Field(..., min_length=1, max_length=100)
+    max_subtasks: Optional[int] = Field(default=5, ge=1, le=10)
+
+class SubtaskBatchGenerateResult(BaseModel):
+    todo_id: int
+    status: Literal["ok", "not_found", "failed"]
+    subtasks: List[Subtask] = Field(default_factory=list)
+    degraded: bool = False
+    error: Optional[str] = None
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List, TYPE_CHECKING
+from typing import Optional, List, Literal, TYPE_CHECKING
 from datetime import datetime
 
 if TYPE_CHECKING:
@@ -36,9 +36,48 @@ class TodoWithRelations(Todo):
     subtasks: List["Subtask"] = []
     translations: List["Translation"] = []
 
+# Query parameters for filtering, searching and sorting the todo list
+TodoSort = Literal["created_at", "-created_at", "updated_at", "-updated_at", "title", "-title"]
+
+class TodoFilters(BaseModel):
+    completed: Optional[bool] = None
+    created_after: Optional[datetime] = None
+    created_before: Optional[datetime] = None
+    updated_after: Optional[datetime] = None
+    updated_before: Optional[datetime] = None
+    q: Optional[str] = Field(None, max_length=200)
+    sort: Optional[TodoSort] = None
+
+# Schemas for bulk operations
+class TodoBulkCreate(BaseModel):
+    items: List[TodoCreate] = Field(..., min_length=1, max_length=5000)
+
+class TodoBulkUpdateItem(TodoUpdate):
+    id: int
+
+class TodoBulkUpdate(BaseModel):
+    items: List[TodoBulkUpdateItem] = Field(..., min_length=1, max_length=5000)
+
+class TodoBulkIds(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=5000)
+
+class TodoBulkResult(BaseModel):
+    id: Optional[int] = None
+    status: str
+    todo: Optional[Todo] = None
+
+class TodoBulkResponse(BaseModel):
+    results: List[TodoBulkResult] = []
+
+# Schema for a keyset-paginated page of todos
+class TodoPage(BaseModel):
+    items: List[TodoWithRelations] = []
+    next_cursor: Optional[str] = None
+
 # Import the actual classes to resolve forward references
 from .subtask import Subtask
 from .translation import Translation
 
 # Rebuild the model to resolve forward references
-TodoWithRelations.model_rebuild() 
\ No newline at end of file
+TodoWithRelations.model_rebuild()
+TodoPage.model_rebuild() 
\ No newline at end of file
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Annotated, List, Optional
 from datetime import datetime
 
 class TranslationBase(BaseModel):
@@ -20,4 +20,7 @@ class TranslationRequest(BaseModel):
     target_language: str = Field(..., min_length=2, max_length=50)
 
 class TodoTranslationRequest(BaseModel):
-    target_language: str = Field(..., min_length=2, max_length=50) 
\ No newline at end of file
+    target_language: str = Field(..., min_length=2, max_length=50) 
+
+class TodoBatchTranslationRequest(BaseModel):
+    target_languages: List[Annotated[str, Field(min_length=2, max_length=50)]] = Field(..., min_length=1, max_length=20)
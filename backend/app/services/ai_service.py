@@ -0,0 +1,169 @@
+from typing import Dict, List, Optional
+from ..core.config import settings
+from .llm_client import LLMClient, estimate_tokens, get_llm_client
+import asyncio
+import json
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+SUBTASK_SYSTEM_PROMPT = (
+    "You break a todo into short, concrete, actionable subtasks. Reply with only a "
+    "JSON array of objects with \"title\" (at most 80 characters) and \"description\" "
+    "(one sentence) keys."
+)
+
+BATCH_SUBTASK_SYSTEM_PROMPT = (
+    "You break todos into short, concrete, actionable subtasks. The user sends a JSON "
+    "array of todos with \"id\", \"title\" and \"details\". Reply with only a JSON object "
+    "mapping each todo's id to an array of at most {max_subtasks} objects with \"title\" "
+    "(at most 80 characters) and \"description\" (one sentence) keys."
+)
+
+# Output tokens budgeted per subtask
+TOKENS_PER_SUBTASK = 80
+
+def _subtasks_from_items(items) -> List[Dict[str, str]]:
+    subtasks = []
+    for item in items if isinstance(items, list) else []:
+        if isinstance(item, dict) and item.get("title"):
+            subtasks.append({"title": str(item["title"]), "description": str(item.get("description") or "")})
+        elif isinstance(item, str) and item.strip():
+            subtasks.append({"title": item, "description": ""})
+    return subtasks
+
+def _clean(subtasks: List[Dict[str, str]], max_subtasks: int) -> List[Dict[str, str]]:
+    return [
+        {"title": subtask["title"].strip()[:255], "description": subtask["description"].strip()}
+        for subtask in subtasks[:max_subtasks]
+    ]
+
+def parse_subtasks(text: str, max_subtasks: int) -> List[Dict[str, str]]:
+    """Read subtasks from a model answer: a JSON array, or one subtask per line"""
+    subtasks = []
+    match = re.search(r"\[.*\]", text, re.DOTALL)
+    if match:
+        try:
+            items = json.loads(match.group(0))
+        except ValueError:
+            items = []
+        subtasks = _subtasks_from_items(items)
+
+    if not subtasks:
+        # Plain list: strip bullets and numbering
+        for line in text.splitlines():
+            title = re.sub(r"^\s*(?:[-*•]|\d+[.)])\s*", "", line).strip()
+            if title:
+                subtasks.append({"title": title, "description": ""})
+
+    if not subtasks:
+        raise ValueError("The model returned no subtasks")
+    return _clean(subtasks, max_subtasks)
+
+def parse_subtask_batch(text: str, todo_ids: List[int], max_subtasks: int) -> Dict[int, List[Dict[str, str]]]:
+    """Read a batched answer: a JSON object of todo id to subtasks
+    
+    Todos the answer has no subtasks for are left out.
+    """
+    match = re.search(r"\{.*\}", text, re.DOTALL)
+    try:
+        answer = json.loads(match.group(0)) if match else {}
+    except ValueError:
+        answer = {}
+    if not isinstance(answer, dict):
+        return {}
+    result = {}
+    for todo_id in todo_ids:
+        subtasks = _subtasks_from_items(answer.get(str(todo_id)))
+        if subtasks:
+            result[todo_id] = _clean(subtasks, max_subtasks)
+    return result
+
+def _todo_prompt(todo: Dict) -> Dict:
+    return {"id": todo["id"], "title": todo["title"], "details": todo.get("description") or ""}
+
+def pack_todos(todos: List[Dict], max_subtasks: int, context_tokens: int) -> List[List[Dict]]:
+    """Split todos into prompts whose input plus expected output fit the context"""
+    budget = context_tokens - estimate_tokens(BATCH_SUBTASK_SYSTEM_PROMPT)
+    chunks: List[List[Dict]] = []
+    used = budget
+    for todo in todos:
+        # The todo as sent plus the answer it needs
+        cost = estimate_tokens(json.dumps(_todo_prompt(todo))) + TOKENS_PER_SUBTASK * max_subtasks + 8
+        if used + cost > budget:
+            chunks.append([])
+            used = 0
+        chunks[-1].append(todo)
+        used += cost
+    return chunks
+
+class AIService:
+    """Generates subtasks for todos through the shared LLM client"""
+    
+    def __init__(self, client: Optional[LLMClient] = None):
+        self._client = client
+    
+    @property
+    def client(self) -> LLMClient:
+        return self._client or get_llm_client()
+    
+    @property
+    def model(self) -> str:
+        return self.client.model
+    
+    async def generate_subtasks(
+        self,
+        todo_title: str,
+        todo_description: str = "",
+        max_subtasks: int = 5
+    ) -> List[Dict[str, str]]:
+        """Ask the model for up to `max_subtasks` subtasks of a todo"""
+        prompt = f"Todo: {todo_title}"
+        if todo_description:
+            prompt += f"\nDetails: {todo_description}"
+        prompt += f"\nList at most {max_subtasks} subtasks."
+        
+        completion = await self.client.complete(
+            [
+                {"role": "system", "content": SUBTASK_SYSTEM_PROMPT},
+                {"role": "user", "content": prompt},
+            ],
+            max_tokens=TOKENS_PER_SUBTASK * max_subtasks
+        )
+        return parse_subtasks(completion.text, max_subtasks)
+    
+    async def generate_subtasks_batch(
+        self,
+        todos: List[Dict],
+        max_subtasks: int = 5
+    ) -> Dict[int, List[Dict[str, str]]]:
+        """Generate subtasks for many todos with as few prompts as fit the context
+        
+        `todos` are dicts with id, title and description. The prompts run
+        concurrently; todos missing from the answers (or whose prompt
+        failed) are left out of the result for the caller to retry alone.
+        """
+        async def run(chunk: List[Dict]) -> Dict[int, List[Dict[str, str]]]:
+            completion = await self.client.complete(
+                [
+                    {"role": "system", "content": BATCH_SUBTASK_SYSTEM_PROMPT.format(max_subtasks=max_subtasks)},
+                    {"role": "user", "content": json.dumps([_todo_prompt(todo) for todo in chunk], ensure_ascii=False)},
+                ],
+                max_tokens=TOKENS_PER_SUBTASK * max_subtasks * len(chunk)
+            )
+            return parse_subtask_batch(completion.text, [todo["id"] for todo in chunk], max_subtasks)
+        
+        chunks = pack_todos(todos, max_subtasks, settings.LLM_CONTEXT_TOKENS)
+        answers = await asyncio.gather(*(run(chunk) for chunk in chunks), return_exceptions=True)
+        result: Dict[int, List[Dict[str, str]]] = {}
+        for chunk, answer in zip(chunks, answers):
+            if isinstance(answer, BaseException):
+                if not isinstance(answer, Exception):
+                    raise answer
+                logger.warning(f"Batched subtask prompt for {len(chunk)} todos failed: {str(answer)}")
+                continue
+            result.update(answer)
+        return result
+
+ai_service = AIService()
@@ -0,0 +1,72 @@
+from typing import Dict, List
+from .ai_service import BATCH_SUBTASK_SYSTEM_PROMPT, SUBTASK_SYSTEM_PROMPT
+from .llm_client import Messages
+from .translation_service import (
+    TRANSLATE_BATCH_SYSTEM_PROMPT, TRANSLATE_MULTI_SYSTEM_PROMPT, TRANSLATE_SYSTEM_PROMPT
+)
+import json
+import re
+
+# Offline answers to the app's prompts, for FakeProvider with
+# LLM_PROVIDER=fake. Answers are deterministic and derived from the input:
+# subtasks are generic steps named after the todo, and a translation is
+# the text tagged with its target language.
+
+STEPS = (
+    "Define the goal", "Gather what is needed", "Break the work down",
+    "Do the first part", "Do the remaining parts", "Check the result",
+    "Fix what is missing", "Tidy up", "Share the outcome", "Review next steps",
+)
+
+def _pattern(template: str) -> "re.Pattern":
+    """Match a prompt built from `template`, capturing its fields"""
+    return re.compile(re.sub(r"\\\{(\w+)\\\}", r"(?P<\1>.+?)", re.escape(template)) + "$", re.DOTALL)
+
+_BATCH_SUBTASKS = _pattern(BATCH_SUBTASK_SYSTEM_PROMPT)
+_TRANSLATE = _pattern(TRANSLATE_SYSTEM_PROMPT)
+_TRANSLATE_BATCH = _pattern(TRANSLATE_BATCH_SYSTEM_PROMPT)
+_TRANSLATE_MULTI = _pattern(TRANSLATE_MULTI_SYSTEM_PROMPT)
+
+def fake_subtasks(todo_title: str, max_subtasks: int) -> List[Dict[str, str]]:
+    """The steps the fake suggests for a todo"""
+    return [
+        {"title": f"{step}: {todo_title}"[:255], "description": f"Step {i + 1} towards \"{todo_title}\""}
+        for i, step in enumerate(STEPS[:max_subtasks])
+    ]
+
+def fake_translation(text: str, language: str) -> str:
+    """The fake's translation of a text"""
+    return f"[{language}] {text}"
+
+def fake_answer(messages: Messages) -> str:
+    """Answer a subtask or translation prompt the way the model is asked to"""
+    system, user = messages[0]["content"], messages[-1]["content"]
+
+    if system == SUBTASK_SYSTEM_PROMPT:
+        title = re.search(r"^Todo: (.*)$", user, re.MULTILINE).group(1)
+        max_subtasks = int(re.search(r"List at most (\d+) subtasks", user).group(1))
+        return json.dumps(fake_subtasks(title, max_subtasks))
+
+    match = _BATCH_SUBTASKS.match(system)
+    if match:
+        max_subtasks = int(match.group("max_subtasks"))
+        return json.dumps({
+            str(todo["id"]): fake_subtasks(todo["title"], max_subtasks) for todo in json.loads(user)
+        })
+
+    match = _TRANSLATE_BATCH.match(system)
+    if match:
+        return json.dumps([fake_translation(text, match.group("language")) for text in json.loads(user)])
+
+    match = _TRANSLATE_MULTI.match(system)
+    if match:
+        return json.dumps({
+            language: fake_translation(user, language) for language in match.group("languages").split(", ")
+        })
+
+    match = _TRANSLATE.match(system)
+    if match:
+        return fake_translation(user, match.group("language"))
+
+    # Anything else is echoed back
+    return user
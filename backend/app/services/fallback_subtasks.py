@@ -0,0 +1,38 @@
+from typing import Dict, List
+import re
+
+# Generic steps used when the todo's text gives too little to work with
+GENERIC_STEPS = (
+    "Clarify what \"{title}\" needs",
+    "Gather what is needed for \"{title}\"",
+    "Do the main work for \"{title}\"",
+    "Check that \"{title}\" is done",
+    "Follow up on \"{title}\"",
+)
+
+_BULLET = re.compile(r"^\s*(?:[-*•]|\d+[.)]|\[[ xX]?\])\s*")
+_SENTENCE_END = re.compile(r"(?<=[.!?;])\s+")
+
+def heuristic_subtasks(todo_title: str, todo_description: str = "", max_subtasks: int = 5) -> List[Dict[str, str]]:
+    """Subtasks derived from the todo's own text, without a model
+
+    Used while the LLM is unavailable. Each list item, line or sentence of
+    the description becomes a subtask; when that yields fewer than two,
+    generic plan/do/check steps for the title are returned instead.
+    """
+    subtasks = []
+    seen = set()
+    for line in (todo_description or "").splitlines():
+        for part in _SENTENCE_END.split(_BULLET.sub("", line)):
+            title = part.strip().rstrip(".;").strip()
+            if len(title) < 3 or title.casefold() in seen:
+                continue
+            seen.add(title.casefold())
+            subtasks.append({"title": title[:255], "description": ""})
+
+    if len(subtasks) < 2:
+        subtasks = [
+            {"title": step.format(title=todo_title.strip())[:255], "description": ""}
+            for step in GENERIC_STEPS
+        ]
+    return subtasks[:max_subtasks]
@@ -0,0 +1,144 @@
+from contextlib import asynccontextmanager
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
+from ..core.config import settings
+from ..core.database import AsyncSessionLocal, SessionLocal
+from ..core.metrics import metrics
+from ..models.job import Job
+from ..schemas.subtask import Subtask as SubtaskSchema
+from .todo_service import AsyncTodoService, TodoService
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[AsyncTodoService, Job], Awaitable[Any]]
+
+class JobQueueFull(Exception):
+    """Raised when no more jobs can be queued"""
+
+class JobQueue:
+    """Runs persisted background jobs on a bounded pool of asyncio workers
+    
+    Jobs are stored in the `jobs` table before they are queued, so the ids
+    of unfinished ones (including those interrupted mid-run) are queued
+    again when the queue starts. Each worker uses its own session.
+    """
+    
+    def __init__(
+        self,
+        session_factory: Callable[[], Union[Session, AsyncSession]],
+        workers: int = 2,
+        max_queued: int = 1000
+    ):
+        self.session_factory = session_factory
+        self.workers = workers
+        self.max_queued = max_queued
+        self.handlers: Dict[str, JobHandler] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+    
+    @property
+    def running(self) -> bool:
+        """Whether workers are taking jobs"""
+        return bool(self._tasks)
+    
+    def register(self, kind: str, handler: JobHandler) -> None:
+        """Set the coroutine that runs jobs of a kind and returns their result"""
+        self.handlers[kind] = handler
+    
+    async def start(self) -> None:
+        """Queue unfinished jobs again and start the workers"""
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        async with self._session() as db:
+            job_ids = await AsyncTodoService(db).run(TodoService.requeue_unfinished_jobs)
+        for job_id in job_ids:
+            self._queue.put_nowait(job_id)
+        self._tasks = [asyncio.create_task(self._work(), name=f"job-worker-{i}") for i in range(self.workers)]
+        logger.info("Job queue started (workers=%s, requeued=%s)", self.workers, len(job_ids))
+    
+    async def stop(self) -> None:
+        """Stop the workers; jobs they were running stay unfinished and resume at the next start"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+    
+    async def submit(
+        self,
+        db: Union[Session, AsyncSession],
+        kind: str,
+        todo_id: Optional[int] = None,
+        params: Optional[dict] = None
+    ) -> Job:
+        """Persist a job and queue it for the workers"""
+        if not self.running:
+            raise RuntimeError("Job queue is not running")
+        if self._queue.qsize() >= self.max_queued:
+            raise JobQueueFull("Too many queued jobs")
+        job = await AsyncTodoService(db).run(TodoService.create_job, kind, todo_id, params or {})
+        self._queue.put_nowait(job.id)
+        return job
+    
+    async def join(self) -> None:
+        """Wait until every queued job has been processed"""
+        await self._queue.join()
+    
+    @asynccontextmanager
+    async def _session(self):
+        db = self.session_factory()
+        try:
+            yield db
+        finally:
+            if isinstance(db, AsyncSession):
+                await db.close()
+            else:
+                db.close()
+    
+    async def _work(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run_job(job_id)
+            except Exception as e:
+                logger.error(f"Job {job_id} bookkeeping failed: {str(e)}")
+            finally:
+                self._queue.task_done()
+    
+    async def _run_job(self, job_id: str) -> None:
+        async with self._session() as db:
+            service = AsyncTodoService(db)
+            job = await service.run(TodoService.start_job, job_id)
+            if job is None:
+                return
+            
+            try:
+                handler = self.handlers.get(job.kind)
+                if handler is None:
+                    raise ValueError(f"Unknown job kind: {job.kind}")
+                result = await handler(service, job)
+            except Exception as e:
+                logger.error(f"Job {job_id} failed: {str(e)}")
+                await service.run(TodoService.fail_job, job_id, str(e))
+                metrics.increment("jobs_failed")
+            else:
+                await service.run(TodoService.finish_job, job_id, result)
+                metrics.increment("jobs_done")
+
+async def generate_subtasks_job(service: AsyncTodoService, job: Job) -> list:
+    """Generate subtasks for the job's todo and return them as JSON"""
+    subtasks = await service.generate_subtasks(job.todo_id, job.params.get("max_subtasks", 5))
+    return jsonable_encoder([SubtaskSchema.model_validate(subtask) for subtask in subtasks])
+
+# Shared queue, started and stopped with the application
+job_queue = JobQueue(
+    AsyncSessionLocal or SessionLocal,
+    workers=settings.JOB_WORKERS,
+    max_queued=settings.JOB_QUEUE_MAX_SIZE
+)
+job_queue.register("generate_subtasks", generate_subtasks_job)
@@ -0,0 +1,448 @@
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Protocol
+from ..core.config import settings
+from ..core.metrics import metrics
+import asyncio
+import httpx
+import logging
+import math
+import random
+import time
+
+logger = logging.getLogger(__name__)
+
+Messages = List[Dict[str, str]]
+
+# Statuses worth retrying: rate limits and transient server errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+@dataclass
+class Completion:
+    text: str
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+
+class LLMError(Exception):
+    """A provider call failed; `status_code` is None for network errors"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+    @property
+    def retryable(self) -> bool:
+        return self.status_code is None or self.status_code in RETRY_STATUSES
+
+class CircuitOpenError(LLMError):
+    """The circuit breaker is failing calls fast while the provider is unhealthy"""
+
+    @property
+    def retryable(self) -> bool:
+        return False
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token)"""
+    return len(text) // 4 + 1
+
+def estimate_prompt_tokens(messages: Messages) -> int:
+    return sum(estimate_tokens(message["content"]) for message in messages)
+
+class TokenBucket:
+    """Refills `rate_per_minute` tokens a minute up to `capacity`
+
+    Waiters are served in arrival order. A rate of zero or less disables
+    the limit.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate_per_minute / 60
+        self.capacity = capacity or rate_per_minute
+        self.clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = self.clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, amount: float = 1) -> float:
+        """Take `amount` tokens, waiting for them if needed; returns seconds waited"""
+        if self.rate <= 0:
+            return 0.0
+        amount = min(amount, self.capacity)
+        waited = 0.0
+        async with self._lock:
+            self._refill()
+            while self._tokens < amount:
+                delay = (amount - self._tokens) / self.rate
+                await asyncio.sleep(delay)
+                waited += delay
+                self._refill()
+            self._tokens -= amount
+        return waited
+
+    def available(self) -> float:
+        """Tokens that could be taken now without waiting (infinite when disabled)"""
+        if self.rate <= 0:
+            return math.inf
+        self._refill()
+        return self._tokens
+
+    def refund(self, amount: float) -> None:
+        """Give back tokens that were reserved but not used"""
+        if self.rate > 0 and amount > 0:
+            self._refill()
+            self._tokens = min(self.capacity, self._tokens + amount)
+
+class CircuitBreaker:
+    """Stops calling a provider whose recent calls mostly failed
+
+    Closed, it records the outcome of the last `window` calls and opens
+    once at least `min_calls` of them are recorded and `failure_rate` of
+    those failed. Open, every call fails fast with `CircuitOpenError`.
+    After `open_seconds` it lets a single probe through (half-open): a
+    success closes it again, a failure reopens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_rate: float = 0.5,
+        min_calls: int = 5,
+        window: int = 20,
+        open_seconds: float = 30.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.clock = clock
+        self.state = self.CLOSED
+        self._outcomes: "deque[bool]" = deque(maxlen=window)
+        self._opened_at = 0.0
+        self._probing = False
+
+    def before_call(self) -> None:
+        """Raise `CircuitOpenError` unless a call may go to the provider now"""
+        if self.state == self.OPEN:
+            remaining = self._opened_at + self.open_seconds - self.clock()
+            if remaining > 0:
+                metrics.increment("llm_breaker_rejected")
+                raise CircuitOpenError("LLM provider unavailable (circuit open)", retry_after=remaining)
+            self.state = self.HALF_OPEN
+        if self.state == self.HALF_OPEN:
+            if self._probing:
+                metrics.increment("llm_breaker_rejected")
+                raise CircuitOpenError("LLM provider unavailable (circuit half-open)")
+            self._probing = True
+
+    def record(self, success: bool) -> None:
+        """Record the outcome of a call let through by `before_call`"""
+        if self.state == self.HALF_OPEN:
+            self._probing = False
+            if success:
+                logger.info("LLM circuit closed")
+                self.state = self.CLOSED
+                self._outcomes.clear()
+            else:
+                self._open()
+            return
+        self._outcomes.append(success)
+        failures = self._outcomes.count(False)
+        if len(self._outcomes) >= self.min_calls and failures >= self.failure_rate * len(self._outcomes):
+            self._open()
+
+    def abandon(self) -> None:
+        """A call let through ended without an outcome (e.g. it was cancelled)"""
+        self._probing = False
+
+    def _open(self) -> None:
+        logger.warning("LLM circuit opened for %ss", self.open_seconds)
+        metrics.increment("llm_breaker_opened")
+        self.state = self.OPEN
+        self._opened_at = self.clock()
+        self._outcomes.clear()
+
+class LLMProvider(Protocol):
+    model: str
+
+    async def complete(self, messages: Messages, max_tokens: int, temperature: float, timeout: float) -> Completion:
+        ...
+
+    async def aclose(self) -> None:
+        ...
+
+class OpenAICompatibleProvider:
+    """Chat completions over one pooled HTTP client (Groq's API is OpenAI compatible)"""
+
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str,
+        model: str,
+        max_connections: int = 20,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        self.model = model
+        self._http = httpx.AsyncClient(
+            base_url=base_url,
+            headers={"Authorization": f"Bearer {api_key}"},
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            transport=transport
+        )
+
+    async def complete(self, messages: Messages, max_tokens: int, temperature: float, timeout: float) -> Completion:
+        try:
+            response = await self._http.post(
+                "/chat/completions",
+                json={
+                    "model": self.model,
+                    "messages": messages,
+                    "max_tokens": max_tokens,
+                    "temperature": temperature,
+                },
+                timeout=httpx.Timeout(timeout, connect=min(timeout, 5.0))
+            )
+        except httpx.TimeoutException as e:
+            raise LLMError(f"LLM request timed out: {type(e).__name__}") from e
+        except httpx.TransportError as e:
+            raise LLMError(f"LLM request failed: {str(e)}") from e
+
+        if response.status_code >= 400:
+            raise LLMError(
+                f"LLM request failed with status {response.status_code}: {response.text[:200]}",
+                status_code=response.status_code,
+                retry_after=_retry_after(response)
+            )
+
+        try:
+            body = response.json()
+            usage = body.get("usage") or {}
+            return Completion(
+                text=body["choices"][0]["message"]["content"] or "",
+                prompt_tokens=usage.get("prompt_tokens", 0),
+                completion_tokens=usage.get("completion_tokens", 0)
+            )
+        except (ValueError, KeyError, IndexError, TypeError, AttributeError) as e:
+            # A garbled answer is treated like a network error: retried, and
+            # counted against the provider
+            raise LLMError(f"LLM response could not be read: {type(e).__name__}: {str(e)[:200]}") from e
+
+    async def aclose(self) -> None:
+        await self._http.aclose()
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    value = response.headers.get("retry-after")
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+class FakeProvider:
+    """Deterministic local provider for tests and benchmarks
+
+    Replies with `responder(messages)` (by default the last message echoed)
+    after `latency_ms`. Each status in `failures` is raised once, in order,
+    before any call succeeds.
+    """
+
+    model = "fake"
+
+    def __init__(
+        self,
+        responder: Optional[Callable[[Messages], str]] = None,
+        latency_ms: float = 0,
+        failures: List[int] = ()
+    ):
+        self.responder = responder or (lambda messages: messages[-1]["content"])
+        self.latency = latency_ms / 1000
+        self.failures = list(failures)
+        self.calls = 0
+
+    async def complete(self, messages: Messages, max_tokens: int, temperature: float, timeout: float) -> Completion:
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.failures:
+            status_code = self.failures.pop(0)
+            raise LLMError(f"Fake failure with status {status_code}", status_code=status_code, retry_after=0)
+        text = self.responder(messages)
+        return Completion(text, estimate_prompt_tokens(messages), estimate_tokens(text))
+
+    async def aclose(self) -> None:
+        pass
+
+class LLMClient:
+    """Rate-limited, retrying front end to an LLM provider
+
+    Every call first takes one request from the requests-per-minute bucket
+    and its estimated tokens (prompt plus `max_tokens`) from the
+    tokens-per-minute bucket; unused tokens are refunded once the real
+    usage is known. 429 and 5xx responses, timeouts and network errors are
+    retried with jittered exponential backoff, honouring Retry-After.
+    Cancelling a call closes its connection; the tokens that were not spent
+    are counted in `llm_cancelled_tokens_saved`. With a `breaker`, calls
+    fail fast with `CircuitOpenError` while the provider is unhealthy.
+    """
+
+    def __init__(
+        self,
+        provider: LLMProvider,
+        requests_per_minute: float = 30,
+        tokens_per_minute: float = 30000,
+        max_retries: int = 4,
+        backoff_base_ms: float = 500,
+        backoff_max_ms: float = 20000,
+        timeout: float = 30.0,
+        breaker: Optional[CircuitBreaker] = None
+    ):
+        self.provider = provider
+        self.breaker = breaker
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base_ms / 1000
+        self.backoff_max = backoff_max_ms / 1000
+        self.timeout = timeout
+
+    @property
+    def model(self) -> str:
+        return self.provider.model
+
+    async def complete(
+        self,
+        messages: Messages,
+        max_tokens: int = 512,
+        temperature: float = 0.3,
+        timeout: Optional[float] = None
+    ) -> Completion:
+        """Run one chat completion, waiting for quota and retrying transient failures"""
+        reserved = estimate_prompt_tokens(messages) + max_tokens
+        attempt = 0
+        while True:
+            if self.breaker is not None:
+                self.breaker.before_call()
+            try:
+                completion = await self._attempt(messages, reserved, max_tokens, temperature, timeout)
+            except LLMError as e:
+                if self.breaker is not None:
+                    # Client errors mean the provider is up
+                    self.breaker.record(success=not e.retryable)
+                if not e.retryable or attempt >= self.max_retries:
+                    metrics.increment("llm_errors")
+                    raise
+                delay = self._backoff(attempt, e.retry_after)
+                logger.warning(f"LLM call failed ({str(e)}), retrying in {delay:.2f}s")
+                metrics.increment("llm_retries")
+                attempt += 1
+                try:
+                    await asyncio.sleep(delay)
+                except asyncio.CancelledError:
+                    self._cancelled(reserved)
+                    raise
+                continue
+            except BaseException:
+                if self.breaker is not None:
+                    self.breaker.abandon()
+                raise
+
+            if self.breaker is not None:
+                self.breaker.record(success=True)
+            used = completion.prompt_tokens + completion.completion_tokens
+            if used:
+                self.tokens.refund(reserved - used)
+            metrics.increment("llm_prompt_tokens", completion.prompt_tokens)
+            metrics.increment("llm_completion_tokens", completion.completion_tokens)
+            return completion
+
+    async def _attempt(
+        self,
+        messages: Messages,
+        reserved: int,
+        max_tokens: int,
+        temperature: float,
+        timeout: Optional[float]
+    ) -> Completion:
+        """Take quota for one provider call and make it"""
+        try:
+            waited = await self.requests.acquire(1) + await self.tokens.acquire(reserved)
+        except asyncio.CancelledError:
+            # Never sent: the whole estimate is saved
+            self._cancelled(reserved)
+            raise
+        if waited:
+            metrics.increment("llm_rate_limit_wait_seconds", waited)
+        metrics.increment("llm_requests")
+        try:
+            return await self.provider.complete(messages, max_tokens, temperature, timeout or self.timeout)
+        except asyncio.CancelledError:
+            # The prompt was sent, but the completion is not generated
+            # once the connection closes
+            self._cancelled(max_tokens)
+            raise
+
+    def _cancelled(self, tokens_saved: int) -> None:
+        """Count a call abandoned by its caller (e.g. a disconnected client)"""
+        metrics.increment("llm_cancelled")
+        metrics.increment("llm_cancelled_tokens_saved", tokens_saved)
+
+    def _backoff(self, attempt: int, retry_after: Optional[float]) -> float:
+        """Full-jitter exponential backoff, never shorter than Retry-After"""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.backoff_max))
+        return delay
+
+    async def aclose(self) -> None:
+        await self.provider.aclose()
+
+def create_llm_client() -> LLMClient:
+    """Build the client for the configured provider"""
+    if settings.LLM_PROVIDER == "fake":
+        from .fake_answers import fake_answer
+        provider = FakeProvider(fake_answer, latency_ms=settings.FAKE_LLM_DELAY_MS)
+    else:
+        provider = OpenAICompatibleProvider(
+            settings.LLM_BASE_URL,
+            settings.GROQ_API_KEY,
+            settings.GROQ_MODEL_NAME,
+            max_connections=settings.LLM_MAX_CONNECTIONS
+        )
+    return LLMClient(
+        provider,
+        requests_per_minute=settings.LLM_REQUESTS_PER_MINUTE,
+        tokens_per_minute=settings.LLM_TOKENS_PER_MINUTE,
+        max_retries=settings.LLM_MAX_RETRIES,
+        backoff_base_ms=settings.LLM_BACKOFF_BASE_MS,
+        backoff_max_ms=settings.LLM_BACKOFF_MAX_MS,
+        timeout=settings.LLM_TIMEOUT_SECONDS,
+        breaker=CircuitBreaker(
+            failure_rate=settings.LLM_BREAKER_FAILURE_RATE,
+            min_calls=settings.LLM_BREAKER_MIN_CALLS,
+            window=settings.LLM_BREAKER_WINDOW,
+            open_seconds=settings.LLM_BREAKER_OPEN_SECONDS
+        ) if settings.LLM_BREAKER_ENABLED else None
+    )
+
+_client: Optional[LLMClient] = None
+
+def get_llm_client() -> LLMClient:
+    """The shared client; its connection pool and quotas span all requests"""
+    global _client
+    if _client is None:
+        _client = create_llm_client()
+    return _client
+
+async def close_llm_client() -> None:
+    """Close the shared client's connections (at application shutdown)"""
+    global _client
+    if _client is not None:
+        client, _client = _client, None
+        await client.aclose()
@@ -0,0 +1,20 @@
+from ..core.config import settings
+
+# The LLM-backed services are imported on first use. Both go through the
+# shared LLM client, which LLM_PROVIDER=fake points at the offline FakeProvider
+
+def get_ai_service():
+    """Subtask generator on the shared LLM client"""
+    from .ai_service import ai_service
+    return ai_service
+
+def get_translation_service():
+    """Translator on the shared LLM client"""
+    from .translation_service import translation_service
+    return translation_service
+
+def get_translation_model() -> str:
+    """Model name that keys cached translations"""
+    if settings.LLM_PROVIDER == "fake":
+        return "fake"
+    return settings.GROQ_MODEL_NAME
@@ -0,0 +1,145 @@
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set
+from ..core.config import settings
+import numpy as np
+import re
+import unicodedata
+import zlib
+
+# Words that do not change what a todo is about
+STOPWORDS = frozenset({
+    "a", "an", "and", "at", "by", "for", "in", "my", "of", "on", "or", "our", "the", "to", "with",
+})
+
+SHINGLE_SIZE = 3
+
+# Modulus of the hash permutations (largest prime below 2**32)
+_PRIME = np.uint64(4294967291)
+
+def normalize_todo_text(title: str, description: str = "") -> str:
+    """Canonical form of a todo's text for similarity
+
+    Case, accents, punctuation, hyphenation ("off-site") and stopwords are
+    ignored, so "Plan team offsite" and "Plan the team off-site" match.
+    """
+    text = unicodedata.normalize("NFKD", f"{title} {description or ''}").casefold()
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    text = re.sub(r"[-'’]", "", text)
+    return " ".join(word for word in re.findall(r"\w+", text) if word not in STOPWORDS)
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> Set[str]:
+    """Overlapping character `size`-grams of a text"""
+    if len(text) <= size:
+        return {text} if text else set()
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+class MinHasher:
+    """MinHash signatures whose agreement estimates the Jaccard similarity of shingle sets"""
+
+    def __init__(self, num_perm: int = 128, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(1, int(_PRIME), size=num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, int(_PRIME), size=num_perm, dtype=np.uint64)
+
+    def signature(self, items: Iterable[str]) -> Optional[np.ndarray]:
+        """Signature of a set of strings, or None for an empty set"""
+        hashes = np.fromiter((zlib.crc32(item.encode("utf-8")) for item in items), dtype=np.uint64)
+        if not hashes.size:
+            return None
+        # a * h fits in 64 bits since both are below 2**32
+        permuted = (self.a[:, None] * hashes[None, :] + self.b[:, None]) % _PRIME
+        return permuted.min(axis=1).astype(np.uint32)
+
+@dataclass
+class SimilarMatch:
+    entry_id: int
+    similarity: float
+    subtasks: List[Dict[str, str]]
+
+class SimilarityIndex:
+    """In-memory MinHash index over the texts of todos with generated subtasks
+
+    Each entry holds the subtasks a model produced for a todo's title and
+    description. `lookup` returns the most similar entry from the same
+    model whose estimated similarity reaches `threshold` and that has
+    enough subtasks. Past `max_entries` the oldest entries are dropped.
+    """
+
+    def __init__(self, threshold: float = 0.8, max_entries: int = 5000, num_perm: int = 128):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.hasher = MinHasher(num_perm)
+        self.loaded = False
+        self.clear()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def clear(self) -> None:
+        """Drop every entry (the index is reloaded on next use)"""
+        self.loaded = False
+        self._ids: List[int] = []
+        self._models: List[str] = []
+        self._max_subtasks: List[int] = []
+        self._subtasks: List[List[Dict[str, str]]] = []
+        self._signatures: List[np.ndarray] = []
+        self._matrix: Optional[np.ndarray] = None
+
+    def load(self, entries: Iterable) -> None:
+        """Replace the index with stored suggestions, oldest first"""
+        self.clear()
+        for entry in entries:
+            self.add(entry.id, entry.model, entry.title, entry.description or "", entry.max_subtasks, entry.subtasks)
+        self.loaded = True
+
+    def signature(self, title: str, description: str = "") -> Optional[np.ndarray]:
+        return self.hasher.signature(shingles(normalize_todo_text(title, description)))
+
+    def add(
+        self,
+        entry_id: int,
+        model: str,
+        title: str,
+        description: str,
+        max_subtasks: int,
+        subtasks: List[Dict[str, str]]
+    ) -> None:
+        """Index the subtasks generated for a todo's text"""
+        signature = self.signature(title, description)
+        if signature is None or not subtasks:
+            return
+        self._ids.append(entry_id)
+        self._models.append(model)
+        self._max_subtasks.append(max_subtasks)
+        self._subtasks.append(subtasks)
+        self._signatures.append(signature)
+        if len(self._ids) > self.max_entries:
+            for column in (self._ids, self._models, self._max_subtasks, self._subtasks, self._signatures):
+                del column[0]
+        self._matrix = None
+
+    def lookup(self, model: str, title: str, description: str, max_subtasks: int) -> Optional[SimilarMatch]:
+        """Best usable entry at or above the threshold, or None"""
+        signature = self.signature(title, description)
+        if signature is None or not self._ids:
+            return None
+        if self._matrix is None:
+            self._matrix = np.vstack(self._signatures)
+        similarity = (self._matrix == signature).mean(axis=1)
+        # Only entries from the same model with at least the subtasks asked for
+        # (or that the model was asked for as many and returned fewer)
+        usable = np.array([
+            entry_model == model and (len(subtasks) >= max_subtasks or requested >= max_subtasks)
+            for entry_model, subtasks, requested in zip(self._models, self._subtasks, self._max_subtasks)
+        ])
+        similarity = np.where(usable, similarity, -1.0)
+        best = int(similarity.argmax())
+        if similarity[best] < self.threshold:
+            return None
+        return SimilarMatch(self._ids[best], float(similarity[best]), self._subtasks[best][:max_subtasks])
+
+# Shared index, loaded from the subtask_suggestions table on first use
+subtask_index = SimilarityIndex(
+    threshold=settings.SUBTASK_CACHE_THRESHOLD,
+    max_entries=settings.SUBTASK_CACHE_MAX_ENTRIES
+)
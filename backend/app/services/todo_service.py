@@ -1,97 +1,438 @@
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from sqlalchemy import and_, column, delete, insert, or_, select, text, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, load_only, selectinload
+from sqlalchemy.sql import func, literal, literal_column
+from typing import AsyncIterator, Callable, Dict, Iterable, List, Optional, Tuple, TypeVar, Union
+from datetime import datetime, timezone
 from ..models.todo import Todo
 from ..models.subtask import Subtask, Translation
-from ..schemas.todo import TodoCreate, TodoUpdate
-from ..schemas.subtask import SubtaskCreate, SubtaskUpdate
-from .ai_service import ai_service
-from .translation_service import translation_service
+from ..models.job import Job, JOB_DONE, JOB_FAILED, JOB_QUEUED, JOB_RUNNING
+from ..models.subtask_suggestion import SubtaskSuggestion
+from ..models.table_version import TableVersion, table_of
+from ..models.search import (
+    SEARCH_TABLE, POSTGRES_TODO_SEARCH_EXPRESSION, POSTGRES_SUBTASK_SEARCH_EXPRESSION
+)
+from ..schemas.todo import TodoBulkUpdateItem, TodoCreate, TodoFilters, TodoUpdate
+from ..schemas.subtask import SubtaskBulkUpdateItem, SubtaskCreate, SubtaskUpdate
+from ..core.config import settings
+from ..core.disconnect import persisting
+from ..core.metrics import metrics
+from ..core.singleflight import SingleFlight
+from ..core.write_queue import write_queue
+from .fallback_subtasks import heuristic_subtasks
+from .llm_client import LLMError
+from .providers import get_ai_service, get_translation_service
+from .subtask_cache import subtask_index
+from .translation_cache import TranslationCache, text_hash
+import asyncio
+import base64
+import binascii
+import functools
+import json
 import logging
+import re
+import uuid
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+# SQLite stores func.now() as "YYYY-MM-DD HH:MM:SS" while SQLAlchemy binds
+# datetimes with microseconds, so compare cursors in the stored format.
+_SQLITE_SECONDS_DATETIME = sqlite.DATETIME(
+    storage_format="%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d"
+)
+
+# INSERT constructs that can skip rows conflicting with a unique constraint
+_INSERT_IGNORING_CONFLICTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+# Relations and columns that callers can select on todo reads
+TODO_RELATIONS = ("subtasks", "translations")
+TODO_FIELDS = ("id", "title", "description", "completed", "created_at", "updated_at")
+
+# Attempts at translating a todo whose text keeps changing meanwhile
+TRANSLATION_ATTEMPTS = 3
+
+class TodoTextChanged(Exception):
+    """The todo's title or description changed while it was being translated"""
+
+def encode_cursor(todo: Todo) -> str:
+    """Encode the keyset position of a todo as an opaque cursor"""
+    payload = json.dumps([todo.created_at.isoformat(), todo.id])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decode an opaque cursor into its (created_at, id) position"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, todo_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), int(todo_id)
+    except (binascii.Error, ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+def write_operation(method: Callable[..., T]) -> Callable[..., T]:
+    """Run a TodoService mutation as one unit of work
+    
+    The decorated method only flushes. The commit happens here, or in the
+    write queue's batch when group commit is enabled.
+    """
+    @functools.wraps(method)
+    def wrapper(self: "TodoService", *args, **kwargs) -> T:
+        if write_queue.in_writer():
+            return method(self, *args, **kwargs)
+        if write_queue.running:
+            return write_queue.run(lambda session: method(TodoService(session), *args, **kwargs))
+        
+        try:
+            result = method(self, *args, **kwargs)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        return result
+    
+    wrapper.is_write = True
+    return wrapper
+
 class TodoService:
     def __init__(self, db: Session):
         self.db = db
     
-    def get_todos(self, skip: int = 0, limit: int = 100) -> List[Todo]:
+    def get_todos(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        include: Optional[Iterable[str]] = None,
+        fields: Optional[Iterable[str]] = None,
+        filters: Optional[TodoFilters] = None
+    ) -> List[Todo]:
         """Get all todos with pagination and relations"""
-        from sqlalchemy.orm import joinedload
-        return self.db.query(Todo).options(
-            joinedload(Todo.subtasks),
-            joinedload(Todo.translations)
-        ).offset(skip).limit(limit).all()
+        query = self._apply_filters(
+            self.db.query(Todo).options(*self._load_options(include, fields)),
+            filters
+        )
+        
+        sort = filters.sort if filters else None
+        if sort:
+            sort_column = getattr(Todo, sort.lstrip("-"))
+            if sort.startswith("-"):
+                query = query.order_by(sort_column.desc(), Todo.id.desc())
+            else:
+                query = query.order_by(sort_column, Todo.id)
+        else:
+            query = query.order_by(Todo.id)
+        return query.offset(skip).limit(limit).all()
+    
+    def get_todos_page(
+        self,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        include: Optional[Iterable[str]] = None,
+        fields: Optional[Iterable[str]] = None,
+        filters: Optional[TodoFilters] = None
+    ) -> Tuple[List[Todo], Optional[str]]:
+        """Get a page of todos ordered by (created_at, id) after the given cursor"""
+        if limit < 1:
+            raise ValueError("limit must be positive")
+        sort = (filters.sort if filters else None) or "created_at"
+        if sort not in ("created_at", "-created_at"):
+            raise ValueError("Cursor pagination only supports sort=created_at or sort=-created_at")
+        descending = sort.startswith("-")
+        
+        query = self._apply_filters(
+            self.db.query(Todo).options(*self._load_options(include, fields)),
+            filters
+        )
+        
+        if cursor:
+            created_at, todo_id = decode_cursor(cursor)
+            created_at = self._timestamp_param(created_at, Todo.created_at)
+            if descending:
+                query = query.filter(or_(
+                    Todo.created_at < created_at,
+                    and_(Todo.created_at == created_at, Todo.id < todo_id)
+                ))
+            else:
+                query = query.filter(or_(
+                    Todo.created_at > created_at,
+                    and_(Todo.created_at == created_at, Todo.id > todo_id)
+                ))
+        
+        if descending:
+            query = query.order_by(Todo.created_at.desc(), Todo.id.desc())
+        else:
+            query = query.order_by(Todo.created_at, Todo.id)
+        
+        # Fetch one extra row to know whether another page exists
+        todos = query.limit(limit + 1).all()
+        next_cursor = None
+        if len(todos) > limit:
+            todos = todos[:limit]
+            next_cursor = encode_cursor(todos[-1])
+        return todos, next_cursor
+    
+    def _timestamp_param(self, value: datetime, column):
+        """Bind a timestamp so it compares correctly with stored values"""
+        if self.db.get_bind().dialect.name != "sqlite":
+            return literal(value, type_=column.type)
+        # SQLite stores naive UTC text without fractional seconds
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        if not value.microsecond:
+            return literal(value, type_=_SQLITE_SECONDS_DATETIME)
+        return literal(value, type_=column.type)
     
-    def get_todo(self, todo_id: int) -> Optional[Todo]:
+    def _apply_filters(self, query, filters: Optional[TodoFilters]):
+        """Restrict a todo query by completion, date ranges and search text"""
+        if filters is None:
+            return query
+        
+        if filters.completed is not None:
+            query = query.filter(Todo.completed == filters.completed)
+        for timestamp, after, before in (
+            (Todo.created_at, filters.created_after, filters.created_before),
+            (Todo.updated_at, filters.updated_after, filters.updated_before),
+        ):
+            if after is not None:
+                query = query.filter(timestamp >= self._timestamp_param(after, timestamp))
+            if before is not None:
+                query = query.filter(timestamp < self._timestamp_param(before, timestamp))
+        if filters.q:
+            query = self._apply_search(query, filters.q)
+        return query
+    
+    def _apply_search(self, query, q: str):
+        """Match every word of `q` (as a prefix) in titles, descriptions or subtask titles"""
+        terms = re.findall(r"\w+", q)
+        if not terms:
+            return query
+        
+        dialect = self.db.get_bind().dialect.name
+        if dialect == "sqlite":
+            match = " ".join(f'"{term}"*' for term in terms)
+            matching_ids = text(
+                f"SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH :search_query"
+            ).bindparams(search_query=match).columns(column("rowid"))
+            return query.filter(Todo.id.in_(matching_ids))
+        
+        if dialect == "postgresql":
+            tsquery = text("to_tsquery('simple', :search_query)").bindparams(
+                search_query=" & ".join(f"{term}:*" for term in terms)
+            )
+            subtask_matches = select(Subtask.todo_id).where(
+                literal_column(POSTGRES_SUBTASK_SEARCH_EXPRESSION).op("@@")(tsquery)
+            )
+            return query.filter(or_(
+                literal_column(POSTGRES_TODO_SEARCH_EXPRESSION).op("@@")(tsquery),
+                Todo.id.in_(subtask_matches)
+            ))
+        
+        # Other databases: substring match per word
+        for term in terms:
+            pattern = f"%{term}%"
+            query = query.filter(or_(
+                Todo.title.ilike(pattern),
+                Todo.description.ilike(pattern),
+                Todo.id.in_(select(Subtask.todo_id).where(Subtask.title.ilike(pattern)))
+            ))
+        return query
+    
+    def _load_options(
+        self,
+        include: Optional[Iterable[str]] = None,
+        fields: Optional[Iterable[str]] = None
+    ) -> list:
+        """Build loader options for the selected relations and columns
+        
+        Relations are loaded with a separate IN query each rather than one
+        joined query, so a todo's subtasks and translations never multiply.
+        `None` keeps the historical behaviour of loading everything.
+        """
+        include = TODO_RELATIONS if include is None else tuple(include)
+        options = [
+            selectinload(getattr(Todo, relation))
+            for relation in TODO_RELATIONS if relation in include
+        ]
+        if fields is not None:
+            # id and created_at are always needed for identity and cursors
+            columns = {"id", "created_at", *fields}
+            options.append(load_only(*(getattr(Todo, name) for name in TODO_FIELDS if name in columns)))
+        return options
+    
+    def get_todo(
+        self,
+        todo_id: int,
+        include: Optional[Iterable[str]] = None,
+        fields: Optional[Iterable[str]] = None
+    ) -> Optional[Todo]:
         """Get a specific todo by ID with relations"""
-        from sqlalchemy.orm import joinedload
         return self.db.query(Todo).options(
-            joinedload(Todo.subtasks),
-            joinedload(Todo.translations)
+            *self._load_options(include, fields)
         ).filter(Todo.id == todo_id).first()
     
+    def get_table_versions(self) -> Dict[str, int]:
+        """Change counters of the todo tables (kept by triggers), shards summed"""
+        versions: Dict[str, int] = {}
+        for name, version in self.db.execute(select(TableVersion.name, TableVersion.version)):
+            versions[table_of(name)] = versions.get(table_of(name), 0) + version
+        return versions
+    
+    def get_todos_by_ids(self, todo_ids: Iterable[int]) -> List[Todo]:
+        """Get the todos that exist among `todo_ids`, without relations"""
+        return list(self.db.scalars(
+            select(Todo).options(*self._load_options([], None)).where(Todo.id.in_(set(todo_ids)))
+        ))
+    
+    @write_operation
     def create_todo(self, todo: TodoCreate) -> Todo:
         """Create a new todo"""
-        db_todo = Todo(**todo.model_dump())
+        # A new todo has no relations, so start with empty collections
+        # instead of loading them back after the insert
+        db_todo = Todo(**todo.model_dump(), subtasks=[], translations=[])
         self.db.add(db_todo)
-        self.db.commit()
-        self.db.refresh(db_todo)
-        
-        # Return the todo with relations
-        return self.get_todo(db_todo.id)
+        self.db.flush()
+        return db_todo
     
-    def update_todo(self, todo_id: int, todo_update: TodoUpdate) -> Optional[Todo]:
+    @write_operation
+    def update_todo(
+        self,
+        todo_id: int,
+        todo_update: TodoUpdate,
+        include: Optional[Iterable[str]] = None
+    ) -> Optional[Todo]:
         """Update an existing todo"""
-        db_todo = self.get_todo(todo_id)
-        if not db_todo:
-            return None
-        
         update_data = todo_update.model_dump(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(db_todo, field, value)
-        
-        self.db.commit()
+        if not update_data:
+            return self.get_todo(todo_id, include=include)
         
-        # Return the updated todo with relations
-        return self.get_todo(todo_id)
+        return self._update_todo_returning(todo_id, update_data, include)
     
+    @write_operation
     def delete_todo(self, todo_id: int) -> bool:
         """Delete a todo"""
-        db_todo = self.get_todo(todo_id)
-        if not db_todo:
-            return False
-        
-        self.db.delete(db_todo)
-        self.db.commit()
-        return True
+        # Delete children set-based instead of loading them for the ORM cascade
+        self.db.execute(
+            delete(Subtask).where(Subtask.todo_id == todo_id),
+            execution_options={"synchronize_session": False}
+        )
+        self.db.execute(
+            delete(Translation).where(Translation.todo_id == todo_id),
+            execution_options={"synchronize_session": False}
+        )
+        result = self.db.execute(
+            delete(Todo).where(Todo.id == todo_id),
+            execution_options={"synchronize_session": False}
+        )
+        return result.rowcount > 0
     
-    def toggle_todo_completion(self, todo_id: int) -> Optional[Todo]:
+    @write_operation
+    def toggle_todo_completion(
+        self,
+        todo_id: int,
+        include: Optional[Iterable[str]] = None
+    ) -> Optional[Todo]:
         """Toggle todo completion status"""
-        db_todo = self.get_todo(todo_id)
-        if not db_todo:
-            return None
+        return self._update_todo_returning(todo_id, {"completed": ~Todo.completed}, include)
+    
+    def _update_todo_returning(self, todo_id: int, values: dict, include: Optional[Iterable[str]]) -> Optional[Todo]:
+        """Apply an UPDATE to one todo and return the new row in the same statement"""
+        stmt = update(Todo).where(Todo.id == todo_id).values(**values)
         
-        db_todo.completed = not db_todo.completed
-        self.db.commit()
+        if not self.db.get_bind().dialect.update_returning:
+            result = self.db.execute(stmt, execution_options={"synchronize_session": False})
+            if result.rowcount == 0:
+                return None
+            return self.get_todo(todo_id, include=include)
         
-        # Get the updated todo with relations
-        updated_todo = self.get_todo(todo_id)
-        return updated_todo
+        db_todo = self.db.scalars(
+            stmt.returning(Todo).options(*self._load_options(include)),
+            execution_options={"synchronize_session": False, "populate_existing": True}
+        ).first()
+        return db_todo
     
-    async def generate_subtasks(self, todo_id: int, max_subtasks: int = 5) -> List[Subtask]:
-        """Generate AI subtasks for a todo"""
-        db_todo = self.get_todo(todo_id)
-        if not db_todo:
-            raise ValueError("Todo not found")
+    @write_operation
+    def bulk_create_todos(self, todos: List[TodoCreate]) -> List[Todo]:
+        """Create many todos with one multi-row INSERT"""
+        if not self.db.get_bind().dialect.insert_returning:
+            db_todos = [Todo(**todo.model_dump(), subtasks=[], translations=[]) for todo in todos]
+            self.db.add_all(db_todos)
+            self.db.flush()
+            return db_todos
         
-        # Generate subtasks using AI
-        ai_subtasks = await ai_service.generate_subtasks(
-            todo_title=db_todo.title,
-            todo_description=db_todo.description or "",
-            max_subtasks=max_subtasks
-        )
+        # SQLite hands RETURNING rows back in VALUES order, so one multi-row
+        # INSERT keeps the request order; elsewhere SQLAlchemy orders them
+        # (with a sentinel where the dialect needs one)
+        ordered = self.db.get_bind().dialect.name != "sqlite"
+        return self.db.scalars(
+            insert(Todo).returning(Todo, sort_by_parameter_order=ordered),
+            [todo.model_dump() for todo in todos]
+        ).all()
+    
+    @write_operation
+    def bulk_update_todos(self, items: List[TodoBulkUpdateItem]) -> Dict[int, Todo]:
+        """Update many todos by id; ids that do not exist are left out of the result"""
+        ids = {item.id for item in items}
+        existing_ids = set(self.db.scalars(select(Todo.id).where(Todo.id.in_(ids))))
         
-        # Save subtasks to database
+        # Rows with the same set of changed columns run as one executemany
+        rows = [
+            {"id": item.id, **item.model_dump(exclude_unset=True, exclude={"id"})}
+            for item in items if item.id in existing_ids
+        ]
+        rows = [row for row in rows if len(row) > 1]
+        if rows:
+            self.db.execute(update(Todo), rows)
+        
+        updated = self.db.scalars(
+            select(Todo).where(Todo.id.in_(existing_ids)),
+            execution_options={"populate_existing": True}
+        ).all()
+        return {todo.id: todo for todo in updated}
+    
+    @write_operation
+    def bulk_toggle_todos(self, ids: List[int]) -> Dict[int, Todo]:
+        """Toggle the completion of many todos in one UPDATE"""
+        stmt = update(Todo).where(Todo.id.in_(ids)).values(completed=~Todo.completed)
+        if not self.db.get_bind().dialect.update_returning:
+            self.db.execute(stmt, execution_options={"synchronize_session": False})
+            toggled = self.db.scalars(
+                select(Todo).where(Todo.id.in_(ids)),
+                execution_options={"populate_existing": True}
+            ).all()
+        else:
+            toggled = self.db.scalars(
+                stmt.returning(Todo),
+                execution_options={"synchronize_session": False, "populate_existing": True}
+            ).all()
+        return {todo.id: todo for todo in toggled}
+    
+    @write_operation
+    def bulk_delete_todos(self, ids: List[int]) -> List[int]:
+        """Delete many todos and their relations; returns the ids that existed"""
+        deleted_ids = list(self.db.scalars(select(Todo.id).where(Todo.id.in_(ids))))
+        if not deleted_ids:
+            return []
+        
+        for model, column in ((Subtask, Subtask.todo_id), (Translation, Translation.todo_id), (Todo, Todo.id)):
+            self.db.execute(
+                delete(model).where(column.in_(deleted_ids)),
+                execution_options={"synchronize_session": False}
+            )
+        return deleted_ids
+    
+    async def generate_subtasks(self, todo_id: int, max_subtasks: int = 5) -> List[Subtask]:
+        """Generate AI subtasks for a todo"""
+        return await AsyncTodoService(self.db).generate_subtasks(todo_id, max_subtasks)
+    
+    async def translate_todo(self, todo_id: int, target_language: str) -> Optional[Translation]:
+        """Translate a todo to target language"""
+        return await AsyncTodoService(self.db).translate_todo(todo_id, target_language)
+    
+    @write_operation
+    def add_generated_subtasks(self, todo_id: int, ai_subtasks: List[dict]) -> List[Subtask]:
+        """Save AI generated subtasks for a todo"""
         created_subtasks = []
         for i, subtask_data in enumerate(ai_subtasks):
             subtask = Subtask(
@@ -103,75 +444,663 @@ class TodoService:
             self.db.add(subtask)
             created_subtasks.append(subtask)
         
-        self.db.commit()
-        
-        # Refresh all subtasks
-        for subtask in created_subtasks:
-            self.db.refresh(subtask)
+        self.db.flush()
         
         return created_subtasks
     
-    async def translate_todo(self, todo_id: int, target_language: str) -> Optional[Translation]:
-        """Translate a todo to target language"""
-        db_todo = self.get_todo(todo_id)
-        if not db_todo:
-            return None
+    @write_operation
+    def add_generated_subtasks_batch(self, ai_subtasks: Dict[int, List[dict]]) -> Dict[int, List[Subtask]]:
+        """Save AI generated subtasks for many todos in one transaction"""
+        created: Dict[int, List[Subtask]] = {}
+        for todo_id, subtasks in ai_subtasks.items():
+            created[todo_id] = [
+                Subtask(
+                    todo_id=todo_id,
+                    title=subtask_data['title'],
+                    description=subtask_data['description'],
+                    order_index=i
+                )
+                for i, subtask_data in enumerate(subtasks)
+            ]
+            self.db.add_all(created[todo_id])
         
-        # Check if translation already exists
-        existing_translation = self.db.query(Translation).filter(
+        self.db.flush()
+        
+        return created
+    
+    def get_subtask_suggestions(self, limit: int) -> List[SubtaskSuggestion]:
+        """The newest `limit` stored suggestions, oldest first"""
+        newest = list(self.db.scalars(
+            select(SubtaskSuggestion).order_by(SubtaskSuggestion.id.desc()).limit(limit)
+        ))
+        return newest[::-1]
+    
+    @write_operation
+    def add_subtask_suggestions(self, model: str, entries: List[dict]) -> List[SubtaskSuggestion]:
+        """Store generated subtasks for reuse; keeps the newest SUBTASK_CACHE_MAX_ENTRIES"""
+        suggestions = [SubtaskSuggestion(model=model, hit_count=0, **entry) for entry in entries]
+        self.db.add_all(suggestions)
+        self.db.flush()
+        stale = (
+            select(SubtaskSuggestion.id)
+            .order_by(SubtaskSuggestion.id.desc())
+            .offset(settings.SUBTASK_CACHE_MAX_ENTRIES)
+        )
+        self.db.execute(
+            delete(SubtaskSuggestion).where(SubtaskSuggestion.id.in_(stale)),
+            execution_options={"synchronize_session": False}
+        )
+        return suggestions
+    
+    @write_operation
+    def record_subtask_suggestion_hit(self, suggestion_id: int) -> None:
+        """Count a reuse of stored subtasks"""
+        self.db.execute(
+            update(SubtaskSuggestion)
+            .where(SubtaskSuggestion.id == suggestion_id)
+            .values(hit_count=SubtaskSuggestion.hit_count + 1),
+            execution_options={"synchronize_session": False}
+        )
+    
+    @write_operation
+    def add_generated_subtask(self, todo_id: int, subtask_data: dict, order_index: int) -> Subtask:
+        """Save one AI generated subtask as soon as it arrives"""
+        subtask = Subtask(
+            todo_id=todo_id,
+            title=subtask_data['title'],
+            description=subtask_data['description'],
+            order_index=order_index
+        )
+        self.db.add(subtask)
+        self.db.flush()
+        return subtask
+    
+    def get_translation(self, todo_id: int, language: str) -> Optional[Translation]:
+        """Get the translation of a todo into a language, if any"""
+        return self.db.query(Translation).filter(
             Translation.todo_id == todo_id,
-            Translation.language == target_language
+            Translation.language == language
         ).first()
+    
+    @write_operation
+    def add_translation(
+        self,
+        todo_id: int,
+        language: str,
+        translated_title: str,
+        translated_description: Optional[str]
+    ) -> Translation:
+        """Save a translation of a todo"""
+        translation = Translation(
+            todo_id=todo_id,
+            language=language,
+            translated_title=translated_title,
+            translated_description=translated_description
+        )
         
-        if existing_translation:
-            return existing_translation
+        self.db.add(translation)
+        self.db.flush()
         
-        # Translate using AI
-        try:
-            translated_title = await translation_service.translate_text(
-                db_todo.title, target_language
-            )
-            
-            translated_description = None
-            if db_todo.description:
-                translated_description = await translation_service.translate_text(
-                    db_todo.description, target_language
-                )
-            
-            # Save translation
-            translation = Translation(
-                todo_id=todo_id,
-                language=target_language,
-                translated_title=translated_title,
-                translated_description=translated_description
+        return translation
+    
+    def get_translations(self, todo_id: int, languages: Iterable[str]) -> List[Translation]:
+        """Get the translations of a todo into any of the given languages"""
+        return self.db.query(Translation).filter(
+            Translation.todo_id == todo_id,
+            Translation.language.in_(list(languages))
+        ).all()
+    
+    @write_operation
+    def add_translations(
+        self,
+        todo_id: int,
+        translations: List[dict],
+        cache_entries: Iterable[Tuple[str, str, str]] = (),
+        source: Optional[Tuple[str, Optional[str]]] = None
+    ) -> List[Translation]:
+        """Save several translations of a todo and cache their texts in one commit
+        
+        Languages a concurrent request stored first are kept as they are and
+        returned with the rest. With `source`, the (title, description) the
+        rows were translated from, raises TodoTextChanged (saving nothing)
+        if the todo no longer has that text.
+        """
+        TranslationCache(self.db).put_many(cache_entries)
+        rows = [{"todo_id": todo_id, **translation} for translation in translations]
+        insert_ignoring_conflicts = _INSERT_IGNORING_CONFLICTS.get(self.db.get_bind().dialect.name)
+        if insert_ignoring_conflicts is None:
+            db_translations = [Translation(**row) for row in rows]
+            self.db.add_all(db_translations)
+            self.db.flush()
+        else:
+            self.db.execute(
+                insert_ignoring_conflicts(Translation).values(rows)
+                .on_conflict_do_nothing(index_elements=["todo_id", "language"])
             )
-            
-            self.db.add(translation)
-            self.db.commit()
-            self.db.refresh(translation)
-            
-            return translation
-            
-        except Exception as e:
-            logger.error(f"Translation failed: {str(e)}")
-            raise Exception(f"Translation failed: {str(e)}")
+            db_translations = None
+        
+        if source is not None:
+            # Checked after the insert: SQLite then holds the write lock and
+            # the row lock makes a Postgres edit wait, so an edit either shows
+            # here or commits later and its trigger deletes these rows
+            current = self.db.execute(
+                select(Todo.title, Todo.description).where(Todo.id == todo_id).with_for_update()
+            ).first()
+            if current is None or tuple(current) != tuple(source):
+                raise TodoTextChanged(f"Todo {todo_id} changed while it was being translated")
+        
+        if db_translations is not None:
+            return db_translations
+        return self.get_translations(todo_id, [row["language"] for row in rows])
+    
+    def get_cached_translations(self, texts: Iterable[str], languages: Iterable[str]) -> Dict[Tuple[str, str], str]:
+        """Look up every (text, language) pair in the shared translation cache"""
+        return TranslationCache(self.db).get_many(texts, languages)
+    
+    def get_cached_translation(self, text: str, language: str) -> Optional[str]:
+        """Look up the shared translation cache"""
+        return TranslationCache(self.db).get(text, language)
+    
+    @write_operation
+    def cache_translation(self, text: str, language: str, translated_text: str) -> None:
+        """Store a translation in the shared cache"""
+        TranslationCache(self.db).put(text, language, translated_text)
     
     def get_todo_translations(self, todo_id: int) -> List[Translation]:
         """Get all translations for a todo"""
         return self.db.query(Translation).filter(Translation.todo_id == todo_id).all()
     
+    @write_operation
     def update_subtask(self, subtask_id: int, subtask_update: SubtaskUpdate) -> Optional[Subtask]:
         """Update a subtask"""
-        from ..models.subtask import Subtask
+        update_data = subtask_update.model_dump(exclude_unset=True)
+        if not update_data:
+            return self.db.query(Subtask).filter(Subtask.id == subtask_id).first()
         
-        db_subtask = self.db.query(Subtask).filter(Subtask.id == subtask_id).first()
-        if not db_subtask:
+        stmt = update(Subtask).where(Subtask.id == subtask_id).values(**update_data)
+        if not self.db.get_bind().dialect.update_returning:
+            result = self.db.execute(stmt, execution_options={"synchronize_session": False})
+            if result.rowcount == 0:
+                return None
+            return self.db.query(Subtask).filter(Subtask.id == subtask_id).first()
+        
+        db_subtask = self.db.scalars(
+            stmt.returning(Subtask),
+            execution_options={"synchronize_session": False, "populate_existing": True}
+        ).first()
+        return db_subtask
+    
+    @write_operation
+    def bulk_update_subtasks(
+        self,
+        todo_id: int,
+        items: List[SubtaskBulkUpdateItem],
+        complete_all: bool = False
+    ) -> Optional[List[Subtask]]:
+        """Apply many subtask patches of one todo in one transaction
+        
+        Returns None if the todo does not exist and raises ValueError if a
+        patch targets a subtask of another todo.
+        """
+        if self.db.scalar(select(Todo.id).where(Todo.id == todo_id)) is None:
             return None
         
-        update_data = subtask_update.model_dump(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(db_subtask, field, value)
+        ids = {item.id for item in items}
+        if ids:
+            known_ids = set(self.db.scalars(
+                select(Subtask.id).where(Subtask.todo_id == todo_id, Subtask.id.in_(ids))
+            ))
+            if ids - known_ids:
+                missing = ", ".join(str(subtask_id) for subtask_id in sorted(ids - known_ids))
+                raise ValueError(f"Subtasks not found for this todo: {missing}")
+        
+        if complete_all:
+            self.db.execute(
+                update(Subtask).where(Subtask.todo_id == todo_id).values(completed=True),
+                execution_options={"synchronize_session": False}
+            )
+        
+        # Rows with the same set of changed columns run as one executemany
+        rows = [
+            {"id": item.id, **item.model_dump(exclude_unset=True, exclude={"id"})}
+            for item in items
+        ]
+        rows = [row for row in rows if len(row) > 1]
+        if rows:
+            self.db.execute(update(Subtask), rows)
+        
+        return self.db.scalars(
+            select(Subtask).where(Subtask.todo_id == todo_id).order_by(Subtask.order_index, Subtask.id),
+            execution_options={"populate_existing": True}
+        ).all()
+    
+    @write_operation
+    def create_job(self, kind: str, todo_id: Optional[int], params: dict) -> Job:
+        """Persist a queued background job"""
+        job = Job(id=uuid.uuid4().hex, kind=kind, todo_id=todo_id, status=JOB_QUEUED, params=params)
+        self.db.add(job)
+        self.db.flush()
+        return job
+    
+    def get_job(self, job_id: str) -> Optional[Job]:
+        """Get a background job by id"""
+        return self.db.query(Job).filter(Job.id == job_id).first()
+    
+    @write_operation
+    def start_job(self, job_id: str) -> Optional[Job]:
+        """Claim a queued job; None if it is gone or already claimed"""
+        result = self.db.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.status == JOB_QUEUED)
+            .values(status=JOB_RUNNING, started_at=func.now()),
+            execution_options={"synchronize_session": False}
+        )
+        if result.rowcount == 0:
+            return None
+        return self.db.query(Job).populate_existing().filter(Job.id == job_id).first()
+    
+    @write_operation
+    def finish_job(self, job_id: str, result) -> None:
+        """Record the result of a job"""
+        self.db.execute(
+            update(Job).where(Job.id == job_id).values(status=JOB_DONE, result=result, finished_at=func.now()),
+            execution_options={"synchronize_session": False}
+        )
+    
+    @write_operation
+    def fail_job(self, job_id: str, error: str) -> None:
+        """Record why a job failed"""
+        self.db.execute(
+            update(Job).where(Job.id == job_id).values(status=JOB_FAILED, error=error, finished_at=func.now()),
+            execution_options={"synchronize_session": False}
+        )
+    
+    @write_operation
+    def requeue_unfinished_jobs(self) -> List[str]:
+        """Put jobs interrupted by a shutdown back in the queue and list every queued id"""
+        self.db.execute(
+            update(Job).where(Job.status == JOB_RUNNING).values(status=JOB_QUEUED, started_at=None),
+            execution_options={"synchronize_session": False}
+        )
+        return list(self.db.scalars(
+            select(Job.id).where(Job.status == JOB_QUEUED).order_by(Job.created_at, Job.id)
+        ))
+
+def _todo_prompt(todo: dict, max_subtasks: int) -> dict:
+    """AI service arguments for a todo from a batch"""
+    return {"todo_title": todo["title"], "todo_description": todo["description"], "max_subtasks": max_subtasks}
+
+async def _iterate(items: Iterable[T]) -> AsyncIterator[T]:
+    for item in items:
+        yield item
+
+# In-flight AI work, shared by identical concurrent requests
+ai_calls = SingleFlight()
+
+class AsyncTodoService:
+    """Runs TodoService work from async endpoints without blocking the event loop
+    
+    With an AsyncSession the sync TodoService code runs through `run_sync` on
+    the async driver; with a plain Session it is moved to a worker thread.
+    """
+    
+    def __init__(self, db: Union[Session, AsyncSession], ai=None):
+        self.db = db
+        self._ai = ai
+        # Set once subtasks came from the local fallback instead of the model
+        self.degraded = False
+    
+    @property
+    def ai(self):
+        """Subtask generator: the one passed in, else the configured provider"""
+        return self._ai or get_ai_service()
+    
+    async def run(self, method: Callable[..., T], *args, **kwargs) -> T:
+        """Call a TodoService method with this service's session"""
+        if getattr(method, "is_write", False):
+            # A client disconnect cannot stop a write once it is handed off
+            with persisting():
+                return await self._run(method, *args, **kwargs)
+        return await self._run(method, *args, **kwargs)
+    
+    async def _run(self, method: Callable[..., T], *args, **kwargs) -> T:
+        if getattr(method, "is_write", False) and write_queue.running:
+            # Wait for the group commit without holding a thread or the loop
+            return await asyncio.wrap_future(write_queue.submit(
+                lambda session: method(TodoService(session), *args, **kwargs)
+            ))
+        if isinstance(self.db, AsyncSession):
+            return await self.db.run_sync(
+                lambda session: method(TodoService(session), *args, **kwargs)
+            )
+        return await asyncio.to_thread(method, TodoService(self.db), *args, **kwargs)
+    
+    async def generate_subtasks(self, todo_id: int, max_subtasks: int = 5) -> List[Subtask]:
+        """Generate AI subtasks for a todo
+        
+        Identical concurrent calls share one AI call and one insert. If the
+        model is unavailable the subtasks come from a local heuristic and
+        `degraded` is set.
+        """
+        subtasks, degraded = await ai_calls.do(
+            ("generate_subtasks", todo_id, max_subtasks),
+            lambda: self._generate_subtasks(todo_id, max_subtasks)
+        )
+        self.degraded = self.degraded or degraded
+        return subtasks
+    
+    async def _generate_subtasks(self, todo_id: int, max_subtasks: int) -> Tuple[List[Subtask], bool]:
+        db_todo = await self.run(TodoService.get_todo, todo_id, include=[])
+        if not db_todo:
+            raise ValueError("Todo not found")
+        
+        prompt = {
+            "todo_title": db_todo.title,
+            "todo_description": db_todo.description or "",
+            "max_subtasks": max_subtasks,
+        }
+        degraded = False
+        ai_subtasks = await self._similar_subtasks(prompt)
+        if ai_subtasks is None:
+            try:
+                # Generate subtasks using AI
+                ai_subtasks = await self.ai.generate_subtasks(**prompt)
+            except LLMError as e:
+                logger.warning(f"Subtask generation degraded to the local fallback: {str(e)}")
+                metrics.increment("subtasks_degraded")
+                ai_subtasks = heuristic_subtasks(**prompt)
+                degraded = True
+            else:
+                await self._remember_subtasks([prompt], [ai_subtasks])
+        
+        # Save subtasks to database
+        return await self.run(TodoService.add_generated_subtasks, todo_id, ai_subtasks), degraded
+    
+    async def generate_subtasks_batch(self, todo_ids: List[int], max_subtasks: int = 5) -> List[dict]:
+        """Generate AI subtasks for many todos, saving them in one transaction
         
-        self.db.commit()
-        self.db.refresh(db_subtask)
-        return db_subtask 
\ No newline at end of file
+        Todos are packed into as few prompts as fit the model's context and
+        the prompts run concurrently. A todo the batched answers missed is
+        generated on its own, and one the model cannot serve gets the local
+        fallback. Returns one result per requested id, in request order:
+        `status` is ok (with its subtasks), not_found or failed.
+        """
+        todo_ids = list(dict.fromkeys(todo_ids))
+        todos = {todo.id: todo for todo in await self.run(TodoService.get_todos_by_ids, todo_ids)}
+        prompts = [
+            {"id": todo_id, "title": todos[todo_id].title, "description": todos[todo_id].description or ""}
+            for todo_id in todo_ids if todo_id in todos
+        ]
+        
+        answered: Dict[int, List[dict]] = {}
+        for prompt in prompts:
+            similar = await self._similar_subtasks(_todo_prompt(prompt, max_subtasks))
+            if similar is not None:
+                answered[prompt["id"]] = similar
+        reused = set(answered)
+        
+        prompts = [prompt for prompt in prompts if prompt["id"] not in reused]
+        if prompts and hasattr(self.ai, "generate_subtasks_batch"):
+            answered.update(await self.ai.generate_subtasks_batch(prompts, max_subtasks))
+        
+        degraded = set()
+        errors: Dict[int, str] = {}
+        
+        async def generate_alone(prompt: dict) -> None:
+            todo_prompt = _todo_prompt(prompt, max_subtasks)
+            try:
+                answered[prompt["id"]] = await self.ai.generate_subtasks(**todo_prompt)
+            except LLMError as e:
+                logger.warning(f"Subtask generation for todo {prompt['id']} degraded to the local fallback: {str(e)}")
+                metrics.increment("subtasks_degraded")
+                answered[prompt["id"]] = heuristic_subtasks(**todo_prompt)
+                degraded.add(prompt["id"])
+            except Exception as e:
+                errors[prompt["id"]] = str(e)
+        
+        await asyncio.gather(*(generate_alone(prompt) for prompt in prompts if prompt["id"] not in answered))
+        generated = [prompt for prompt in prompts if prompt["id"] in answered and prompt["id"] not in degraded]
+        await self._remember_subtasks(
+            [_todo_prompt(prompt, max_subtasks) for prompt in generated],
+            [answered[prompt["id"]] for prompt in generated]
+        )
+        saved = await self.run(TodoService.add_generated_subtasks_batch, answered) if answered else {}
+        if degraded:
+            self.degraded = True
+        
+        results = []
+        for todo_id in todo_ids:
+            if todo_id not in todos:
+                results.append({"todo_id": todo_id, "status": "not_found", "error": "Todo not found"})
+            elif todo_id in errors:
+                results.append({"todo_id": todo_id, "status": "failed", "error": f"Failed to generate subtasks: {errors[todo_id]}"})
+            else:
+                results.append({
+                    "todo_id": todo_id,
+                    "status": "ok",
+                    "subtasks": saved[todo_id],
+                    "degraded": todo_id in degraded,
+                })
+        return results
+    
+    async def stream_subtasks(self, todo_id: int, max_subtasks: int = 5) -> AsyncIterator[Subtask]:
+        """Generate AI subtasks for a todo, saving and yielding each one as it arrives
+        
+        Uses the AI service's `stream_subtasks` when it has one; otherwise the
+        full answer is awaited and then saved one subtask at a time. If the
+        model fails, the rest come from the local fallback and `degraded` is set.
+        """
+        db_todo = await self.run(TodoService.get_todo, todo_id, include=[])
+        if not db_todo:
+            raise ValueError("Todo not found")
+        
+        prompt = {
+            "todo_title": db_todo.title,
+            "todo_description": db_todo.description or "",
+            "max_subtasks": max_subtasks,
+        }
+        order_index = 0
+        degraded = False
+        similar = await self._similar_subtasks(prompt)
+        if similar is not None:
+            for subtask_data in similar:
+                yield await self.run(TodoService.add_generated_subtask, todo_id, subtask_data, order_index)
+                order_index += 1
+            return
+        
+        generated = []
+        try:
+            if hasattr(self.ai, "stream_subtasks"):
+                ai_subtasks = self.ai.stream_subtasks(**prompt)
+            else:
+                ai_subtasks = _iterate(await self.ai.generate_subtasks(**prompt))
+            async for subtask_data in ai_subtasks:
+                generated.append(subtask_data)
+                yield await self.run(TodoService.add_generated_subtask, todo_id, subtask_data, order_index)
+                order_index += 1
+                if order_index >= max_subtasks:
+                    break
+            await self._remember_subtasks([prompt], [generated])
+        except LLMError as e:
+            logger.warning(f"Subtask stream degraded to the local fallback: {str(e)}")
+            metrics.increment("subtasks_degraded")
+            self.degraded = degraded = True
+        
+        if degraded:
+            for subtask_data in heuristic_subtasks(**prompt)[order_index:]:
+                yield await self.run(TodoService.add_generated_subtask, todo_id, subtask_data, order_index)
+                order_index += 1
+    
+    async def _similar_subtasks(self, prompt: dict) -> Optional[List[dict]]:
+        """Subtasks stored for a todo with similar text, instead of a new AI call"""
+        if not settings.SUBTASK_CACHE_ENABLED:
+            return None
+        if not subtask_index.loaded:
+            subtask_index.load(await self.run(TodoService.get_subtask_suggestions, subtask_index.max_entries))
+        match = subtask_index.lookup(
+            getattr(self.ai, "model", ""), prompt["todo_title"], prompt["todo_description"], prompt["max_subtasks"]
+        )
+        if match is None:
+            metrics.increment("subtask_cache_misses")
+            return None
+        metrics.increment("subtask_cache_hits")
+        metrics.increment("subtask_cache_llm_calls_avoided")
+        await self.run(TodoService.record_subtask_suggestion_hit, match.entry_id)
+        return match.subtasks
+    
+    async def _remember_subtasks(self, prompts: List[dict], generated: List[List[dict]]) -> None:
+        """Keep generated subtasks for reuse by similar todos"""
+        entries = [
+            {
+                "title": prompt["todo_title"][:255],
+                "description": prompt["todo_description"],
+                "max_subtasks": prompt["max_subtasks"],
+                "subtasks": subtasks,
+            }
+            for prompt, subtasks in zip(prompts, generated) if subtasks
+        ]
+        if not settings.SUBTASK_CACHE_ENABLED or not entries:
+            return
+        model = getattr(self.ai, "model", "")
+        for suggestion in await self.run(TodoService.add_subtask_suggestions, model, entries):
+            subtask_index.add(
+                suggestion.id, model, suggestion.title, suggestion.description or "",
+                suggestion.max_subtasks, suggestion.subtasks
+            )
+    
+    async def translate_text(self, text: str, target_language: str) -> str:
+        """Translate a text through the shared translation cache"""
+        return await ai_calls.do(
+            ("translate_text", text_hash(text), target_language.strip().casefold()),
+            lambda: self._translate_text(text, target_language)
+        )
+    
+    async def _translate_text(self, text: str, target_language: str) -> str:
+        translation_service = get_translation_service()
+        
+        cached = await self.run(TodoService.get_cached_translation, text, target_language)
+        if cached is not None:
+            return cached
+        
+        translated_text = await translation_service.translate_text(text, target_language)
+        await self.run(TodoService.cache_translation, text, target_language, translated_text)
+        return translated_text
+    
+    async def translate_todo(self, todo_id: int, target_language: str) -> Optional[Translation]:
+        """Translate a todo to target language"""
+        translations = await self.translate_todo_languages(todo_id, [target_language])
+        return translations[0] if translations else None
+    
+    async def translate_todo_languages(self, todo_id: int, target_languages: List[str]) -> Optional[List[Translation]]:
+        """Translate a todo into several languages at once
+        
+        Languages that are already stored are returned as they are. The
+        rest are translated concurrently (one call per text when the
+        translation service can answer for several languages at once) and
+        saved in a single commit. Identical concurrent calls share one run.
+        """
+        languages = list(dict.fromkeys(target_languages))
+        translations = await ai_calls.do(
+            ("translate_todo", todo_id, frozenset(languages)),
+            lambda: self._translate_todo_languages(todo_id, languages)
+        )
+        if translations is None:
+            return None
+        by_language = {translation.language: translation for translation in translations}
+        return [by_language[language] for language in languages if language in by_language]
+    
+    async def _translate_todo_languages(self, todo_id: int, languages: List[str]) -> Optional[List[Translation]]:
+        for attempt in range(TRANSLATION_ATTEMPTS):
+            try:
+                return await self._translate_todo_text(todo_id, languages)
+            except TodoTextChanged as e:
+                # Edited mid-translation: translate the new text instead
+                metrics.increment("translations_restarted_after_edit")
+                if attempt == TRANSLATION_ATTEMPTS - 1:
+                    logger.error(f"Translation failed: {str(e)}")
+                    raise Exception(f"Translation failed: {str(e)}")
+    
+    async def _translate_todo_text(self, todo_id: int, languages: List[str]) -> Optional[List[Translation]]:
+        db_todo = await self.run(TodoService.get_todo, todo_id, include=[])
+        if not db_todo:
+            return None
+        
+        translations = {
+            translation.language: translation
+            for translation in await self.run(TodoService.get_translations, todo_id, languages)
+        }
+        missing = [language for language in languages if language not in translations]
+        if missing:
+            try:
+                stored = await self._add_translations(db_todo, missing)
+            except TodoTextChanged:
+                # Retried on the new text by _translate_todo_languages
+                raise
+            except IntegrityError:
+                # A concurrent request stored some of these languages first
+                # (on dialects without INSERT ... ON CONFLICT); the batch was
+                # rolled back, so translate the languages still missing again
+                stored = await self.run(TodoService.get_translations, todo_id, missing)
+                found = {translation.language for translation in stored}
+                still_missing = [language for language in missing if language not in found]
+                if still_missing:
+                    stored += await self._add_translations(db_todo, still_missing)
+            except Exception as e:
+                logger.error(f"Translation failed: {str(e)}")
+                raise Exception(f"Translation failed: {str(e)}")
+            translations.update((translation.language, translation) for translation in stored)
+        
+        return [translations[language] for language in languages if language in translations]
+    
+    async def _add_translations(self, db_todo: Todo, languages: List[str]) -> List[Translation]:
+        """Translate a todo's texts into `languages` and store the results"""
+        translation_service = get_translation_service()
+        
+        texts = list(dict.fromkeys(text for text in (db_todo.title, db_todo.description) if text))
+        translated = await self.run(TodoService.get_cached_translations, texts, languages)
+        
+        semaphore = asyncio.Semaphore(settings.TRANSLATION_MAX_CONCURRENCY)
+        translate_multi = getattr(translation_service, "translate_text_multi", None)
+        new_entries: Dict[Tuple[str, str], str] = {}
+        
+        async def translate_one(text: str, language: str) -> None:
+            async with semaphore:
+                new_entries[(text, language)] = await translation_service.translate_text(text, language)
+        
+        async def translate_all(text: str, text_languages: List[str]) -> None:
+            async with semaphore:
+                results = await translate_multi(text, text_languages)
+            for language in text_languages:
+                if results.get(language):
+                    new_entries[(text, language)] = results[language]
+            # Fall back to single calls for anything the combined answer missed
+            await asyncio.gather(*(
+                translate_one(text, language)
+                for language in text_languages if (text, language) not in new_entries
+            ))
+        
+        calls = []
+        for text in texts:
+            uncached = [language for language in languages if (text, language) not in translated]
+            if translate_multi is not None and len(uncached) > 1:
+                calls.append(translate_all(text, uncached))
+            else:
+                calls.extend(translate_one(text, language) for language in uncached)
+        await asyncio.gather(*calls)
+        translated.update(new_entries)
+        
+        rows = [
+            {
+                "language": language,
+                "translated_title": translated[(db_todo.title, language)],
+                "translated_description": translated[(db_todo.description, language)] if db_todo.description else None,
+            }
+            for language in languages
+        ]
+        return await self.run(
+            TodoService.add_translations,
+            db_todo.id,
+            rows,
+            [(text, language, translated_text) for (text, language), translated_text in new_entries.items()],
+            (db_todo.title, db_todo.description)
+        )
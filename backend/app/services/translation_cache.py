@@ -0,0 +1,205 @@
+from sqlalchemy import bindparam, delete, insert, select, tuple_, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from datetime import datetime, timedelta, timezone
+from ..core.config import settings
+from ..core.metrics import metrics
+from ..models.translation_cache import TranslationCacheEntry
+from .providers import get_translation_model
+import hashlib
+import threading
+import unicodedata
+import weakref
+
+def normalize_text(text: str) -> str:
+    """Canonical form of a text for cache lookups: NFC, collapsed whitespace"""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+def text_hash(text: str) -> str:
+    """Content address of a text after normalization"""
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+class CacheUsage:
+    """Cache hits and expired entries not yet written back, per database
+    
+    Lookups only read. What they learn (which entries were used, which
+    have expired) is kept here and written by the next cache write, the
+    only time eviction needs it, so a hit costs no write transaction.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hits: "weakref.WeakKeyDictionary[Engine, Dict[int, int]]" = weakref.WeakKeyDictionary()
+        self._expired: "weakref.WeakKeyDictionary[Engine, Set[int]]" = weakref.WeakKeyDictionary()
+    
+    def record(self, bind: Engine, hits: Iterable[int] = (), expired: Iterable[int] = ()) -> None:
+        with self._lock:
+            counts = self._hits.setdefault(bind, {})
+            for entry_id in hits:
+                counts[entry_id] = counts.get(entry_id, 0) + 1
+            self._expired.setdefault(bind, set()).update(expired)
+    
+    def take(self, bind: Engine) -> Tuple[Dict[int, int], Set[int]]:
+        """Remove and return the pending hit counts and expired ids"""
+        with self._lock:
+            return self._hits.pop(bind, {}), self._expired.pop(bind, set())
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._hits.clear()
+            self._expired.clear()
+
+# Shared by every TranslationCache in the process
+cache_usage = CacheUsage()
+
+class TranslationCache:
+    """Translations shared by every todo and caller, keyed by content
+    
+    Entries are addressed by the hash of the normalized source text, the
+    target language and the model that produced them. Lookups are plain
+    reads: entries older than the TTL count as misses, and hits are
+    recorded in `cache_usage` and written back (with the expired entries
+    dropped) by the next `put`. Past `max_entries` the least recently used
+    entries are evicted.
+    """
+    
+    def __init__(
+        self,
+        db: Session,
+        model: Optional[str] = None,
+        ttl_seconds: Optional[int] = None,
+        max_entries: Optional[int] = None
+    ):
+        self.db = db
+        self.model = model or get_translation_model()
+        self.ttl = timedelta(seconds=ttl_seconds if ttl_seconds is not None else settings.TRANSLATION_CACHE_TTL_SECONDS)
+        self.max_entries = max_entries if max_entries is not None else settings.TRANSLATION_CACHE_MAX_ENTRIES
+    
+    def _key(self, text: str, language: str):
+        return (
+            TranslationCacheEntry.text_hash == text_hash(text),
+            TranslationCacheEntry.language == language.strip().casefold(),
+            TranslationCacheEntry.model == self.model,
+        )
+    
+    def get(self, text: str, language: str) -> Optional[str]:
+        """Return a cached translation, or None"""
+        return self.get_many([text], [language]).get((text, language))
+    
+    def get_many(self, texts: Iterable[str], languages: Iterable[str]) -> Dict[Tuple[str, str], str]:
+        """Look up every (text, language) pair with one read-only query
+        
+        Returns the translations found, keyed by the pairs as given.
+        """
+        pairs: Dict[Tuple[str, str], List[Tuple[str, str]]] = {}
+        for text in dict.fromkeys(texts):
+            for language in dict.fromkeys(languages):
+                pairs.setdefault((text_hash(text), language.strip().casefold()), []).append((text, language))
+        if not pairs:
+            return {}
+        
+        rows = self.db.execute(
+            select(
+                TranslationCacheEntry.id,
+                TranslationCacheEntry.text_hash,
+                TranslationCacheEntry.language,
+                TranslationCacheEntry.translated_text,
+                TranslationCacheEntry.created_at
+            ).where(
+                tuple_(TranslationCacheEntry.text_hash, TranslationCacheEntry.language).in_(list(pairs)),
+                TranslationCacheEntry.model == self.model
+            )
+        ).all()
+        
+        found: Dict[Tuple[str, str], str] = {}
+        hits, expired = [], []
+        for row in rows:
+            if self._expired(row.created_at):
+                expired.append(row.id)
+                continue
+            hits.append(row.id)
+            for pair in pairs[(row.text_hash, row.language)]:
+                found[pair] = row.translated_text
+        cache_usage.record(self.db.get_bind(), hits, expired)
+        
+        metrics.increment("translation_cache_hits", len(found))
+        metrics.increment("translation_cache_misses", sum(len(p) for p in pairs.values()) - len(found))
+        return found
+    
+    def put(self, text: str, language: str, translated_text: str) -> None:
+        """Store a translation, replacing an entry with the same key"""
+        self.put_many([(text, language, translated_text)])
+    
+    def put_many(self, entries: Iterable[Tuple[str, str, str]]) -> None:
+        """Store several (text, language, translated_text) entries"""
+        self.flush_usage()
+        for text, language, translated_text in entries:
+            self._store(text, language, translated_text)
+        self.evict()
+    
+    def flush_usage(self) -> None:
+        """Write back the hits and expired entries that lookups recorded"""
+        hits, expired = cache_usage.take(self.db.get_bind())
+        if expired:
+            result = self.db.execute(
+                delete(TranslationCacheEntry).where(
+                    TranslationCacheEntry.id.in_(expired),
+                    TranslationCacheEntry.created_at < datetime.now(timezone.utc) - self.ttl
+                ),
+                execution_options={"synchronize_session": False}
+            )
+            if result.rowcount:
+                metrics.increment("translation_cache_evictions", result.rowcount)
+        if hits:
+            table = TranslationCacheEntry.__table__
+            self.db.execute(
+                update(table)
+                .where(table.c.id == bindparam("entry_id"))
+                .values(hit_count=table.c.hit_count + bindparam("hits"), last_used_at=func.now()),
+                [{"entry_id": entry_id, "hits": count} for entry_id, count in hits.items()]
+            )
+    
+    def _store(self, text: str, language: str, translated_text: str) -> None:
+        values = {
+            "text_hash": text_hash(text),
+            "language": language.strip().casefold(),
+            "model": self.model,
+            "translated_text": translated_text,
+        }
+        try:
+            with self.db.begin_nested():
+                self.db.execute(insert(TranslationCacheEntry).values(**values))
+        except IntegrityError:
+            # Another request cached the same text first; keep the newest
+            self.db.execute(
+                update(TranslationCacheEntry)
+                .where(*self._key(text, language))
+                .values(translated_text=translated_text, created_at=func.now(), last_used_at=func.now()),
+                execution_options={"synchronize_session": False}
+            )
+    
+    def evict(self) -> int:
+        """Delete the least recently used entries beyond `max_entries`"""
+        stale = (
+            select(TranslationCacheEntry.id)
+            .order_by(TranslationCacheEntry.last_used_at.desc(), TranslationCacheEntry.id.desc())
+            .offset(self.max_entries)
+        )
+        result = self.db.execute(
+            delete(TranslationCacheEntry).where(TranslationCacheEntry.id.in_(stale)),
+            execution_options={"synchronize_session": False}
+        )
+        if result.rowcount:
+            metrics.increment("translation_cache_evictions", result.rowcount)
+        return result.rowcount
+    
+    def _expired(self, created_at: Optional[datetime]) -> bool:
+        if created_at is None:
+            return False
+        # SQLite hands back naive UTC timestamps
+        if created_at.tzinfo is None:
+            created_at = created_at.replace(tzinfo=timezone.utc)
+        return datetime.now(timezone.utc) - created_at > self.ttl
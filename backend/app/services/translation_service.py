@@ -0,0 +1,242 @@
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+from ..core.config import settings
+from ..core.metrics import metrics
+from .llm_client import LLMClient, estimate_tokens, get_llm_client
+import asyncio
+import json
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+TRANSLATE_SYSTEM_PROMPT = (
+    "Translate the user's text into {language}. "
+    "Reply with the translation only, keeping its formatting."
+)
+
+TRANSLATE_BATCH_SYSTEM_PROMPT = (
+    "Translate each string of the user's JSON array into {language}. "
+    "Reply with only a JSON array of the translations, in the same order "
+    "and keeping each string's formatting."
+)
+
+TRANSLATE_MULTI_SYSTEM_PROMPT = (
+    "Translate the user's text into each of these languages: {languages}. "
+    "Reply with only a JSON object mapping each language name to its translation."
+)
+
+@dataclass
+class _Batch:
+    language: str
+    items: List[Tuple[str, asyncio.Future]] = field(default_factory=list)
+    timer: Optional[asyncio.TimerHandle] = None
+
+class TranslationBatcher:
+    """Groups concurrent single-text translations into one call per language
+    
+    Calls for the same target language are collected for up to `window_ms`
+    or until `max_items` are waiting, then translated together by
+    `translate_many`, which returns one translation per text (None where it
+    has none). Texts the batch did not answer are translated one at a time
+    by `translate_one`. Each caller gets its own text's result or error.
+    """
+    
+    def __init__(
+        self,
+        translate_many: Callable[[List[str], str], Awaitable[List[Optional[str]]]],
+        translate_one: Callable[[str, str], Awaitable[str]],
+        window_ms: float = 10,
+        max_items: int = 16
+    ):
+        self.translate_many = translate_many
+        self.translate_one = translate_one
+        self.window = window_ms / 1000
+        self.max_items = max_items
+        self._pending: Dict[str, _Batch] = {}
+        self._running: Set[asyncio.Task] = set()
+    
+    async def translate(self, text: str, target_language: str) -> str:
+        """Translate a text as part of the next batch for its language"""
+        loop = asyncio.get_running_loop()
+        key = target_language.strip().casefold()
+        batch = self._pending.get(key)
+        if batch is None:
+            batch = self._pending[key] = _Batch(target_language)
+            batch.timer = loop.call_later(self.window, self._flush, key, batch)
+        future = loop.create_future()
+        batch.items.append((text, future))
+        if len(batch.items) >= self.max_items:
+            self._flush(key, batch)
+        return await future
+    
+    def _flush(self, key: str, batch: _Batch) -> None:
+        if self._pending.get(key) is not batch:
+            return
+        del self._pending[key]
+        batch.timer.cancel()
+        # The batch runs on its own, so a caller going away does not cancel it for the others
+        task = asyncio.ensure_future(self._run(batch))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+    
+    async def _run(self, batch: _Batch) -> None:
+        waiting: Dict[str, List[asyncio.Future]] = {}
+        for text, future in batch.items:
+            if not future.cancelled():
+                waiting.setdefault(text, []).append(future)
+        if not waiting:
+            return
+        try:
+            await self._translate_batch(batch.language, waiting)
+        finally:
+            # Nobody is left waiting, whatever happened
+            for futures in waiting.values():
+                for future in futures:
+                    future.cancel()
+    
+    async def _translate_batch(self, language: str, waiting: Dict[str, List[asyncio.Future]]) -> None:
+        texts = list(waiting)
+        
+        results: Dict[str, Optional[str]] = {}
+        if len(texts) > 1:
+            metrics.increment("translation_batches")
+            metrics.increment("translation_batched_texts", len(texts))
+            try:
+                results = dict(zip(texts, await self.translate_many(texts, language)))
+            except Exception as e:
+                _settle(waiting, texts, error=e)
+                return
+        
+        missing = [text for text in texts if not results.get(text)]
+        if len(texts) > 1 and missing:
+            logger.warning(f"Batched translation answered {len(texts) - len(missing)} of {len(texts)} texts")
+            metrics.increment("translation_batch_fallbacks", len(missing))
+        
+        async def single(text: str) -> None:
+            try:
+                results[text] = await self.translate_one(text, language)
+            except Exception as e:
+                _settle(waiting, [text], error=e)
+        
+        await asyncio.gather(*(single(text) for text in missing))
+        _settle(waiting, [text for text in texts if results.get(text) is not None], results=results)
+
+def _settle(
+    waiting: Dict[str, List[asyncio.Future]],
+    texts: List[str],
+    results: Optional[Dict[str, str]] = None,
+    error: Optional[BaseException] = None
+) -> None:
+    for text in texts:
+        for future in waiting[text]:
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(results[text])
+
+class TranslationService:
+    """Translates texts through the shared LLM client
+    
+    With a positive `batch_window_ms`, concurrent `translate_text` calls for
+    the same language share one structured prompt (see TranslationBatcher).
+    """
+    
+    def __init__(
+        self,
+        client: Optional[LLMClient] = None,
+        batch_window_ms: float = 0,
+        batch_max_items: int = 16
+    ):
+        self._client = client
+        self.batcher = TranslationBatcher(
+            self.translate_texts, self._translate_one, batch_window_ms, batch_max_items
+        ) if batch_window_ms > 0 else None
+    
+    @property
+    def client(self) -> LLMClient:
+        return self._client or get_llm_client()
+    
+    @property
+    def model(self) -> str:
+        return self.client.model
+    
+    async def translate_text(self, text: str, target_language: str) -> str:
+        """Translate a text into one language"""
+        if self.batcher is not None:
+            return await self.batcher.translate(text, target_language)
+        return await self._translate_one(text, target_language)
+    
+    async def _translate_one(self, text: str, target_language: str) -> str:
+        completion = await self.client.complete(
+            [
+                {"role": "system", "content": TRANSLATE_SYSTEM_PROMPT.format(language=target_language)},
+                {"role": "user", "content": text},
+            ],
+            max_tokens=2 * estimate_tokens(text) + 32,
+            temperature=0
+        )
+        return completion.text.strip()
+    
+    async def translate_texts(self, texts: List[str], target_language: str) -> List[Optional[str]]:
+        """Translate several texts into one language with one prompt
+        
+        Returns one entry per text, None where the model's answer has no
+        usable translation (all None if the answer cannot be read).
+        """
+        completion = await self.client.complete(
+            [
+                {"role": "system", "content": TRANSLATE_BATCH_SYSTEM_PROMPT.format(language=target_language)},
+                {"role": "user", "content": json.dumps(texts, ensure_ascii=False)},
+            ],
+            max_tokens=sum(2 * estimate_tokens(text) + 16 for text in texts),
+            temperature=0
+        )
+        match = re.search(r"\[.*\]", completion.text, re.DOTALL)
+        try:
+            answer = json.loads(match.group(0)) if match else []
+        except ValueError:
+            answer = []
+        if not isinstance(answer, list) or len(answer) != len(texts):
+            return [None] * len(texts)
+        return [
+            item.strip() if isinstance(item, str) and item.strip() else None
+            for item in answer
+        ]
+    
+    async def translate_text_multi(self, text: str, target_languages: List[str]) -> Dict[str, str]:
+        """Translate a text into several languages with one prompt
+        
+        Languages missing from the model's answer are left out of the result
+        so callers can translate them one by one.
+        """
+        completion = await self.client.complete(
+            [
+                {
+                    "role": "system",
+                    "content": TRANSLATE_MULTI_SYSTEM_PROMPT.format(languages=", ".join(target_languages)),
+                },
+                {"role": "user", "content": text},
+            ],
+            max_tokens=len(target_languages) * (2 * estimate_tokens(text) + 16),
+            temperature=0
+        )
+        match = re.search(r"\{.*\}", completion.text, re.DOTALL)
+        try:
+            answer = json.loads(match.group(0)) if match else {}
+        except ValueError:
+            answer = {}
+        if not isinstance(answer, dict):
+            return {}
+        return {
+            language: str(answer[language]).strip()
+            for language in target_languages
+            if isinstance(answer.get(language), str) and answer[language].strip()
+        }
+
+translation_service = TranslationService(
+    batch_window_ms=settings.TRANSLATION_BATCH_WINDOW_MS,
+    batch_max_items=settings.TRANSLATION_BATCH_MAX_ITEMS
+)
@@ -0,0 +1,145 @@
+from contextlib import asynccontextmanager
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from typing import Callable, List, Optional, Set, Union
+from ..core.admission import admission_controllers
+from ..core.config import settings
+from ..core.database import AsyncSessionLocal, SessionLocal
+from ..core.metrics import metrics
+from .llm_client import CircuitBreaker, get_llm_client
+from .todo_service import AsyncTodoService
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+def ai_budget_busy(max_load: Optional[float] = None) -> bool:
+    """Whether user requests need the AI capacity the warmer would take
+
+    True while an AI endpoint group has requests queued or more than
+    `max_load` of its slots in use, while more than that share of the LLM
+    request or token quota is spent, or while the circuit is open.
+    """
+    max_load = settings.TRANSLATION_WARMER_MAX_AI_LOAD if max_load is None else max_load
+    for controller in admission_controllers.values():
+        if controller.queued or controller.active > controller.concurrency * max_load:
+            return True
+
+    client = get_llm_client()
+    if client.breaker is not None and client.breaker.state == CircuitBreaker.OPEN:
+        return True
+    return any(
+        bucket.available() < bucket.capacity * (1 - max_load)
+        for bucket in (client.requests, client.tokens)
+    )
+
+class TranslationWarmer:
+    """Translates new and edited todos into the configured languages in the background
+
+    Todos are queued after their title or description is written and
+    translated one at a time by a single worker, so translations are
+    usually stored before anyone asks for them. The worker is the lowest
+    priority AI user: before each todo it waits while `busy()` says user
+    requests need the capacity. Queued ids are deduplicated; once
+    `max_queued` are waiting new ones are dropped and translated on demand.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Union[Session, AsyncSession]],
+        languages: Optional[List[str]] = None,
+        max_queued: int = 1000,
+        backoff_seconds: float = 1.0,
+        busy: Callable[[], bool] = ai_budget_busy
+    ):
+        self.session_factory = session_factory
+        self._languages = languages
+        self.max_queued = max_queued
+        self.backoff_seconds = backoff_seconds
+        self.busy = busy
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._pending: Set[int] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def languages(self) -> List[str]:
+        return settings.TRANSLATION_WARMER_LANGUAGES if self._languages is None else self._languages
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    async def start(self) -> None:
+        """Start the worker"""
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self._pending = set()
+        self._task = asyncio.create_task(self._work(), name="translation-warmer")
+
+    async def stop(self) -> None:
+        """Stop the worker and forget the todos still queued"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        self._queue = None
+
+    def enqueue(self, todo_id: int) -> None:
+        """Queue a todo for translation; safe to call from endpoint threads"""
+        if not self.running or not self.languages:
+            return
+        self._loop.call_soon_threadsafe(self._put, todo_id)
+
+    async def join(self) -> None:
+        """Wait until every queued todo has been processed"""
+        await self._queue.join()
+
+    def _put(self, todo_id: int) -> None:
+        if self._queue is None or todo_id in self._pending:
+            return
+        if self._queue.qsize() >= self.max_queued:
+            metrics.increment("translation_warmer_dropped")
+            return
+        self._pending.add(todo_id)
+        self._queue.put_nowait(todo_id)
+
+    @asynccontextmanager
+    async def _session(self):
+        db = self.session_factory()
+        try:
+            yield db
+        finally:
+            if isinstance(db, AsyncSession):
+                await db.close()
+            else:
+                db.close()
+
+    async def _work(self) -> None:
+        while True:
+            todo_id = await self._queue.get()
+            try:
+                while self.busy():
+                    metrics.increment("translation_warmer_backoffs")
+                    await asyncio.sleep(self.backoff_seconds)
+                # An edit from here on queues the todo again
+                self._pending.discard(todo_id)
+                async with self._session() as db:
+                    translations = await AsyncTodoService(db).translate_todo_languages(todo_id, self.languages)
+                if translations is not None:
+                    metrics.increment("translation_warmer_todos")
+            except Exception as e:
+                logger.warning(f"Pre-translating todo {todo_id} failed: {str(e)}")
+                metrics.increment("translation_warmer_failed")
+            finally:
+                self._pending.discard(todo_id)
+                self._queue.task_done()
+
+# Shared warmer, started and stopped with the application
+translation_warmer = TranslationWarmer(
+    AsyncSessionLocal or SessionLocal,
+    max_queued=settings.TRANSLATION_WARMER_MAX_QUEUED,
+    backoff_seconds=settings.TRANSLATION_WARMER_BACKOFF_SECONDS
+)
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Benchmark the LLM client against the local fake provider
+
+Usage: python bench_llm_client.py [--calls 60] [--concurrency 20] [--latency-ms 200] [--rpm 600] [--failure-rate 0.1]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+async def run(client, calls, concurrency):
+    """Issue `calls` completions, `concurrency` at a time; return seconds taken"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def call(i):
+        async with semaphore:
+            await client.complete([{"role": "user", "content": f"Todo {i}"}], max_tokens=64)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(call(i) for i in range(calls)))
+    return time.perf_counter() - started
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=60)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=200)
+    parser.add_argument("--rpm", type=float, default=600, help="requests per minute quota")
+    parser.add_argument("--tpm", type=float, default=0, help="tokens per minute quota (0 = unlimited)")
+    parser.add_argument("--failure-rate", type=float, default=0.1, help="share of calls answered with 429")
+    args = parser.parse_args()
+
+    from app.core.metrics import metrics
+    from app.services.llm_client import FakeProvider, LLMClient
+
+    random.seed(0)
+    failures = [429 if random.random() < args.failure_rate else 0 for _ in range(args.calls)]
+    provider = FakeProvider(latency_ms=args.latency_ms, failures=[status for status in failures if status])
+    client = LLMClient(
+        provider,
+        requests_per_minute=args.rpm,
+        tokens_per_minute=args.tpm,
+        backoff_base_ms=100,
+        backoff_max_ms=2000
+    )
+
+    print(f"🧪 {args.calls} calls, {args.concurrency} at a time, {args.latency_ms:.0f} ms latency, "
+          f"{args.rpm:.0f} rpm, {provider.failures.count(429)} injected 429s")
+    elapsed = asyncio.run(run(client, args.calls, args.concurrency))
+    counters = metrics.snapshot()
+    print(f"   Elapsed:        {elapsed:8.2f} s ({args.calls / elapsed:.1f} calls/sec)")
+    print(f"   Provider calls: {provider.calls:8d} ({counters.get('llm_retries', 0):.0f} retries)")
+    print(f"   Quota waits:    {counters.get('llm_rate_limit_wait_seconds', 0):8.2f} s")
+
+if __name__ == "__main__":
+    main()
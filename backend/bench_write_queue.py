@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Benchmark concurrent todo writes with and without the group-commit write queue
+
+Usage: python bench_write_queue.py [--threads 16] [--writes 200] [--synchronous FULL]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+def run(session_factory, threads, writes_per_thread):
+    """Create todos from concurrent threads and return writes per second"""
+    from app.schemas.todo import TodoCreate
+    from app.services.todo_service import TodoService
+
+    def worker(worker_id):
+        with session_factory() as db:
+            service = TodoService(db)
+            for i in range(writes_per_thread):
+                service.create_todo(TodoCreate(title=f"Bench {worker_id}-{i}"))
+
+    pool = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    started = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    return threads * writes_per_thread / (time.perf_counter() - started)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--writes", type=int, default=200, help="writes per thread")
+    parser.add_argument("--synchronous", default="FULL", help="SQLite synchronous level")
+    args = parser.parse_args()
+
+    # Configure a throwaway database before the app reads its settings
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    os.environ["SQLITE_SYNCHRONOUS"] = args.synchronous
+    os.environ["DB_POOL_SIZE"] = str(args.threads)
+
+    from app.core.database import Base, SessionLocal, engine
+    from app.core.write_queue import write_queue
+    from app.models import todo, subtask  # noqa: F401 - register models
+
+    Base.metadata.create_all(bind=engine)
+
+    print(f"🧪 {args.threads} threads x {args.writes} writes, synchronous={args.synchronous}")
+    baseline = run(SessionLocal, args.threads, args.writes)
+    print(f"   Per-request commits: {baseline:8.0f} writes/sec")
+
+    write_queue.start()
+    try:
+        queued = run(SessionLocal, args.threads, args.writes)
+    finally:
+        write_queue.stop()
+    print(f"   Group commit:        {queued:8.0f} writes/sec "
+          f"({write_queue.writes / max(write_queue.batches, 1):.1f} writes/commit)")
+    print(f"   Speedup:             {queued / baseline:8.2f}x")
+
+if __name__ == "__main__":
+    main()
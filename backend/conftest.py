@@ -0,0 +1,104 @@
+"""
+Shared pytest fixtures for the backend tests
+"""
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Keep the app's import-time setup away from the real database
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test_app.db')}"
+)
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+
+@pytest.fixture(autouse=True)
+def fresh_subtask_index():
+    """Start each test without subtasks remembered from another test's database"""
+    from app.services.subtask_cache import subtask_index
+
+    subtask_index.clear()
+    yield
+    subtask_index.clear()
+
+
+@pytest.fixture(autouse=True)
+def fresh_llm_client():
+    """Build the shared LLM client per test, for the LLM_PROVIDER the test sets"""
+    from app.services import llm_client
+
+    llm_client._client = None
+    yield
+    llm_client._client = None
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    """Send AI calls through the shared LLM client to the offline FakeProvider, which is returned"""
+    from app.core.config import settings
+    from app.services.llm_client import get_llm_client
+
+    monkeypatch.setattr(settings, "LLM_PROVIDER", "fake")
+    return get_llm_client().provider
+
+
+@pytest.fixture
+def engine():
+    """In-memory SQLite engine with all tables created"""
+    from app.core.database import Base
+    from app.models import todo, subtask, search, translation_cache, job, idempotency, subtask_suggestion, table_version  # noqa: F401 - register models
+
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db_session(engine):
+    """Session bound to the in-memory engine"""
+    session = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def client(engine, monkeypatch):
+    """TestClient whose requests, background work and idempotency keys use the in-memory engine"""
+    from fastapi.testclient import TestClient
+    from app.core.database import get_async_db, get_db
+    from app.main import app
+    from app.core.idempotency import idempotency_store
+    from app.services.job_queue import job_queue
+    from app.services.translation_warmer import translation_warmer
+
+    TestSession = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+    monkeypatch.setattr(job_queue, "session_factory", TestSession)
+    monkeypatch.setattr(idempotency_store, "session_factory", TestSession)
+    monkeypatch.setattr(translation_warmer, "session_factory", TestSession)
+
+    def override_get_db():
+        db = TestSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_db
+    with TestClient(app) as test_client:
+        yield test_client
+    app.dependency_overrides.clear()
@@ -0,0 +1,173 @@
+"""
+Tests for admission control on the AI endpoints
+"""
+
+import asyncio
+import re
+import time
+
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from app.core.admission import AdmissionController, AdmissionMiddleware, Overloaded
+
+
+def test_full_queue_is_rejected_with_retry_after():
+    """Test that requests beyond the slots and the queue are shed at once"""
+    controller = AdmissionController("test", concurrency=1, max_queued=1, per_client=10)
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def hold(client):
+            async with controller.admit(client):
+                await release.wait()
+
+        running = [asyncio.create_task(hold("a")), asyncio.create_task(hold("b"))]
+        await asyncio.sleep(0)
+        with pytest.raises(Overloaded) as rejected:
+            async with controller.admit("c"):
+                pass
+        release.set()
+        await asyncio.gather(*running)
+        return rejected.value
+
+    rejected = asyncio.run(scenario())
+
+    assert rejected.retry_after >= 1
+    assert (controller.active, controller.queued) == (0, 0)
+
+
+def test_client_share_is_enforced():
+    """Test that one client cannot hold more than its share"""
+    controller = AdmissionController("test", concurrency=4, max_queued=4, per_client=2)
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def hold():
+            async with controller.admit("greedy"):
+                await release.wait()
+
+        running = [asyncio.create_task(hold()) for _ in range(2)]
+        await asyncio.sleep(0)
+        with pytest.raises(Overloaded):
+            async with controller.admit("greedy"):
+                pass
+        async with controller.admit("other"):
+            pass
+        release.set()
+        await asyncio.gather(*running)
+
+    asyncio.run(scenario())
+
+
+def test_waiting_clients_are_served_in_turn():
+    """Test that a client queued behind a busy one is not starved"""
+    controller = AdmissionController("test", concurrency=1, max_queued=10, per_client=10)
+    order = []
+
+    async def scenario():
+        async def work(client, n):
+            async with controller.admit(client):
+                order.append(f"{client}{n}")
+                await asyncio.sleep(0.01)
+
+        tasks = [asyncio.create_task(work("a", n)) for n in range(3)]
+        await asyncio.sleep(0)
+        tasks.append(asyncio.create_task(work("b", 0)))
+        await asyncio.gather(*tasks)
+
+    asyncio.run(scenario())
+
+    assert order == ["a0", "a1", "b0", "a2"]
+
+
+def test_queue_timeout_frees_the_place():
+    """Test that a request waiting too long is rejected and leaves the queue"""
+    controller = AdmissionController("test", concurrency=1, max_queued=1, per_client=10, queue_timeout=0.02)
+
+    async def scenario():
+        async def hold():
+            async with controller.admit("a"):
+                await asyncio.sleep(0.1)
+
+        running = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        with pytest.raises(Overloaded):
+            async with controller.admit("b"):
+                pass
+        assert controller.queued == 0
+        await running
+
+    asyncio.run(scenario())
+    assert (controller.active, controller.queued) == (0, 0)
+
+
+def test_crud_stays_fast_while_ai_endpoint_is_saturated():
+    """Test that shed AI requests get 503 and other routes are not queued"""
+    controller = AdmissionController("generate", concurrency=2, max_queued=2, per_client=10)
+
+    async def generate(request):
+        await asyncio.sleep(0.2)
+        return JSONResponse({"ok": True})
+
+    async def list_todos(request):
+        return JSONResponse([])
+
+    app = Starlette(routes=[
+        Route("/generate", generate, methods=["POST"]),
+        Route("/todos", list_todos, methods=["GET"]),
+    ])
+    app = AdmissionMiddleware(app, routes=[(re.compile("^/generate$"), controller)])
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            ai = [asyncio.create_task(http.post("/generate")) for _ in range(6)]
+            await asyncio.sleep(0.02)
+            started = time.perf_counter()
+            crud = await http.get("/todos")
+            crud_seconds = time.perf_counter() - started
+            return await asyncio.gather(*ai), crud, crud_seconds
+
+    ai, crud, crud_seconds = asyncio.run(scenario())
+
+    statuses = sorted(response.status_code for response in ai)
+    assert statuses == [200, 200, 200, 200, 503, 503]
+    assert all("retry-after" in r.headers for r in ai if r.status_code == 503)
+    assert crud.status_code == 200
+    assert crud_seconds < 0.1
+
+
+def test_waiter_cancelled_while_a_slot_is_freed():
+    """Test that a slot is not handed to a waiter cancelled in the same step"""
+    controller = AdmissionController("test", concurrency=1, max_queued=1, per_client=10)
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def hold():
+            async with controller.admit("a"):
+                await release.wait()
+
+        async def wait():
+            async with controller.admit("b"):
+                pass
+
+        holder = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(wait())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        release.set()
+        return await asyncio.gather(holder, waiter, return_exceptions=True)
+
+    holder_result, waiter_result = asyncio.run(scenario())
+
+    assert holder_result is None
+    assert isinstance(waiter_result, asyncio.CancelledError)
+    assert (controller.active, controller.queued, controller._clients) == (0, 0, {})
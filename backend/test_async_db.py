@@ -0,0 +1,54 @@
+"""
+Tests for running TodoService work through AsyncTodoService
+"""
+
+import asyncio
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app.core.database import Base, get_async_database_url
+from app.models.todo import Todo
+from app.schemas.todo import TodoCreate
+from app.services.todo_service import AsyncTodoService, TodoService
+
+
+def test_async_database_url_mapping():
+    """Test that sync URLs map onto their async drivers"""
+    assert get_async_database_url("sqlite:///./todo_app.db") == "sqlite+aiosqlite:///./todo_app.db"
+    assert get_async_database_url("postgresql://u:p@db/app") == "postgresql+asyncpg://u:p@db/app"
+    assert get_async_database_url("postgres://u:p@db/app") == "postgresql+asyncpg://u:p@db/app"
+
+
+def test_run_with_async_session():
+    """Test that TodoService methods run on an AsyncSession"""
+    async def scenario():
+        engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+        async with async_sessionmaker(engine, expire_on_commit=False)() as db:
+            service = AsyncTodoService(db)
+            todo = await service.run(TodoService.create_todo, TodoCreate(title="Async todo"))
+            translation = await service.run(
+                TodoService.add_translation, todo.id, "French", "Tâche", None
+            )
+            fetched = await service.run(TodoService.get_translation, todo.id, "French")
+
+        await engine.dispose()
+        return todo, translation, fetched
+
+    todo, translation, fetched = asyncio.run(scenario())
+
+    assert isinstance(todo, Todo)
+    assert fetched.id == translation.id
+
+
+def test_run_with_sync_session(db_session):
+    """Test that TodoService methods run in a thread with a plain Session"""
+    service = AsyncTodoService(db_session)
+
+    todo = asyncio.run(service.run(TodoService.create_todo, TodoCreate(title="Sync todo")))
+
+    assert asyncio.run(service.run(TodoService.get_todo, todo.id)).title == "Sync todo"
+
@@ -0,0 +1,122 @@
+"""
+Tests for the LLM circuit breaker and the local subtask fallback
+"""
+
+import asyncio
+
+import pytest
+
+from app.models.subtask import Subtask
+from app.services.ai_service import AIService
+from app.services.fallback_subtasks import heuristic_subtasks
+from app.services.llm_client import CircuitBreaker, CircuitOpenError, FakeProvider, LLMClient
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_breaker_opens_fails_fast_and_recovers():
+    """Test closed -> open -> half-open -> closed"""
+    clock = Clock()
+    breaker = CircuitBreaker(failure_rate=0.5, min_calls=4, window=10, open_seconds=30, clock=clock)
+    provider = FakeProvider(failures=[503] * 4)
+    client = LLMClient(provider, requests_per_minute=0, tokens_per_minute=0, max_retries=0, breaker=breaker)
+    messages = [{"role": "user", "content": "hi"}]
+
+    async def scenario():
+        for _ in range(4):
+            with pytest.raises(Exception):
+                await client.complete(messages)
+        assert breaker.state == CircuitBreaker.OPEN
+
+        calls = provider.calls
+        with pytest.raises(CircuitOpenError):
+            await client.complete(messages)
+        assert provider.calls == calls
+
+        clock.now = 31
+        await client.complete(messages)
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    asyncio.run(scenario())
+
+
+def test_failed_probe_reopens():
+    """Test that a failing half-open probe opens the circuit again"""
+    clock = Clock()
+    breaker = CircuitBreaker(failure_rate=0.5, min_calls=1, open_seconds=10, clock=clock)
+    breaker.before_call()
+    breaker.record(success=False)
+    assert breaker.state == CircuitBreaker.OPEN
+
+    clock.now = 11
+    breaker.before_call()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()  # only one probe at a time
+    breaker.record(success=False)
+
+    assert breaker.state == CircuitBreaker.OPEN
+    clock.now = 15
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_client_errors_do_not_open_the_circuit():
+    """Test that 4xx answers count as the provider being up"""
+    breaker = CircuitBreaker(failure_rate=0.5, min_calls=2)
+    client = LLMClient(FakeProvider(failures=[400, 400]), requests_per_minute=0, tokens_per_minute=0, breaker=breaker)
+
+    async def scenario():
+        for _ in range(2):
+            with pytest.raises(Exception):
+                await client.complete([{"role": "user", "content": "hi"}])
+
+    asyncio.run(scenario())
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_heuristic_subtasks_use_the_description():
+    """Test that list items and sentences become subtasks"""
+    subtasks = heuristic_subtasks("Plan party", "- Book a venue\n- Send invites. Order cake!", 5)
+
+    assert [subtask["title"] for subtask in subtasks] == ["Book a venue", "Send invites", "Order cake!"]
+    assert len(heuristic_subtasks("Plan party", "", 3)) == 3
+
+
+@pytest.fixture
+def open_circuit(monkeypatch):
+    """AI service whose LLM circuit is open"""
+    breaker = CircuitBreaker(min_calls=1)
+    breaker.record(success=False)
+    client = LLMClient(FakeProvider(), breaker=breaker)
+    monkeypatch.setattr("app.services.todo_service.get_ai_service", lambda: AIService(client))
+    return client
+
+
+def test_generate_is_degraded_while_circuit_is_open(client, db_session, open_circuit):
+    """Test that the endpoint answers from the fallback and says so"""
+    todo = client.post("/api/v1/todos/", json={"title": "Plan party", "description": "Book a venue. Send invites."}).json()
+
+    response = client.post(f"/api/v1/todos/{todo['id']}/generate", json={"todo_id": todo["id"], "max_subtasks": 5})
+
+    assert response.status_code == 200
+    assert response.headers["x-degraded"] == "true"
+    assert [subtask["title"] for subtask in response.json()] == ["Book a venue", "Send invites"]
+    assert open_circuit.provider.calls == 0
+    assert db_session.query(Subtask).count() == 2
+
+
+def test_stream_is_degraded_while_circuit_is_open(client, open_circuit):
+    """Test that the stream falls back and flags its done event"""
+    todo = client.post("/api/v1/todos/", json={"title": "Plan party"}).json()
+
+    response = client.post(f"/api/v1/todos/{todo['id']}/generate/stream", json={"todo_id": todo["id"], "max_subtasks": 3})
+
+    assert response.text.count("event: subtask") == 3
+    assert '"degraded": true' in response.text
@@ -0,0 +1,27 @@
+"""
+Tests for the engine configuration in core/database.py
+"""
+
+from sqlalchemy import create_engine
+
+from app.core.database import apply_sqlite_pragmas, get_pool_options, get_sqlite_pragmas
+
+
+def test_pragmas_applied_to_every_connection(tmp_path):
+    """Test that each new SQLite connection gets the configured pragmas"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'pragmas.db'}", **get_pool_options("sqlite:///x.db"))
+    apply_sqlite_pragmas(engine)
+
+    with engine.connect() as first, engine.connect() as second:
+        for connection in (first, second):
+            assert connection.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+            assert connection.exec_driver_sql("PRAGMA busy_timeout").scalar() == get_sqlite_pragmas()["busy_timeout"]
+            assert connection.exec_driver_sql("PRAGMA synchronous").scalar() == 1  # NORMAL
+    engine.dispose()
+
+
+def test_memory_database_skips_pool_sizing():
+    """Test that in-memory SQLite gets no pool sizing arguments"""
+    assert get_pool_options("sqlite://") == {}
+    assert get_pool_options("sqlite:///:memory:") == {}
+    assert "pool_size" in get_pool_options("sqlite:///./todo_app.db")
@@ -0,0 +1,115 @@
+"""
+Tests for cancelling AI work when the client disconnects
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from app.core.metrics import metrics
+from app.models.subtask import Subtask
+
+
+@pytest.fixture
+def slow_ai(fake_llm, monkeypatch):
+    """Use the fake provider with model latency long enough to disconnect during"""
+    monkeypatch.setattr(fake_llm, "latency", 0.3)
+    return fake_llm
+
+
+def post_then_disconnect(path, payload, disconnect_after=0.05, headers=()):
+    """Call the app directly, dropping the connection shortly after sending the body"""
+    from app.main import app
+
+    async def scenario():
+        body = json.dumps(payload).encode()
+        messages = [{"type": "http.request", "body": body, "more_body": False}]
+        sent = []
+
+        async def receive():
+            if messages:
+                return messages.pop(0)
+            await asyncio.sleep(disconnect_after)
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+            "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"",
+            "root_path": "", "headers": [(b"content-type", b"application/json"), *headers],
+            "client": ("test", 1), "server": ("test", 80),
+        }
+        await app(scope, receive, send)
+        return sent[0]["status"]
+
+    return asyncio.run(scenario())
+
+
+def test_generate_is_cancelled_on_disconnect(client, db_session, slow_ai):
+    """Test that a dropped generate request stores nothing"""
+    todo = client.post("/api/v1/todos/", json={"title": "Plan party"}).json()
+    metrics.reset()
+
+    status = post_then_disconnect(f"/api/v1/todos/{todo['id']}/generate", {"todo_id": todo["id"]})
+
+    assert status == 499
+    assert metrics.get("ai_requests_disconnected") == 1
+    assert db_session.query(Subtask).count() == 0
+
+
+def test_orphaned_result_is_kept_when_configured(client, db_session, slow_ai, monkeypatch):
+    """Test that the work finishes and is saved with AI_KEEP_ORPHANED_RESULTS"""
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "AI_KEEP_ORPHANED_RESULTS", True)
+    todo = client.post("/api/v1/todos/", json={"title": "Plan party"}).json()
+
+    post_then_disconnect(f"/api/v1/todos/{todo['id']}/generate", {"todo_id": todo["id"], "max_subtasks": 3})
+
+    assert db_session.query(Subtask).count() == 3
+
+
+def test_disconnect_during_save_keeps_result_for_retries(client, db_session, slow_ai, monkeypatch):
+    """Test that a disconnect while subtasks are being saved stores the response for the key"""
+    import time
+
+    from app.services.todo_service import TodoService
+
+    add_generated_subtasks = TodoService.add_generated_subtasks
+
+    def slow_add(self, *args, **kwargs):
+        time.sleep(0.2)
+        return add_generated_subtasks(self, *args, **kwargs)
+
+    slow_add.is_write = True
+    monkeypatch.setattr(TodoService, "add_generated_subtasks", slow_add)
+    monkeypatch.setattr(slow_ai, "latency", 0)
+    todo = client.post("/api/v1/todos/", json={"title": "Plan party"}).json()
+    path = f"/api/v1/todos/{todo['id']}/generate"
+    payload = {"todo_id": todo["id"], "max_subtasks": 3}
+    metrics.reset()
+
+    status = post_then_disconnect(path, payload, headers=[(b"idempotency-key", b"save-once")])
+    # Same bytes as the dropped request, so the key's body hash matches
+    retry = client.post(path, content=json.dumps(payload), headers={
+        "Idempotency-Key": "save-once", "Content-Type": "application/json"
+    })
+
+    assert status == 200
+    assert metrics.get("ai_requests_disconnected_while_persisting") == 1
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert db_session.query(Subtask).count() == 3
+
+
+def test_connected_client_gets_result(client, slow_ai, monkeypatch):
+    """Test that the disconnect watcher does not disturb normal requests"""
+    monkeypatch.setattr(slow_ai, "latency", 0)
+    todo = client.post("/api/v1/todos/", json={"title": "Plan party"}).json()
+
+    response = client.post(f"/api/v1/todos/{todo['id']}/translate", json={"target_language": "French"})
+
+    assert response.status_code == 200
+    assert response.json()["translated_title"] == "[French] Plan party"
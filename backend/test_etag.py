@@ -0,0 +1,83 @@
+"""
+Tests for ETags and conditional GETs on the todo read endpoints
+"""
+
+from app.models.subtask import Subtask
+from app.models.table_version import TableVersion
+from app.services.todo_service import TodoService
+from test_query_count import count_queries
+
+BASE_URL = "/api/v1/todos"
+
+
+def test_unchanged_list_is_not_modified(client, engine):
+    """Test that a current ETag gets 304 after a single version lookup"""
+    client.post(f"{BASE_URL}/", json={"title": "Buy milk"})
+    first = client.get(f"{BASE_URL}/")
+    etag = first.headers["etag"]
+
+    with count_queries(engine) as statements:
+        second = client.get(f"{BASE_URL}/", headers={"If-None-Match": etag})
+
+    assert first.headers["cache-control"] == "no-cache"
+    assert etag.startswith('"') and not etag.startswith("W/")
+    assert second.status_code == 304
+    assert second.content == b""
+    assert second.headers["etag"] == etag
+    assert len(statements) == 1
+    assert "table_versions" in statements[0]
+
+
+def test_any_write_changes_the_etag(client, db_session):
+    """Test that updates, subtask inserts and deletes all change the list ETag"""
+    todo_id = client.post(f"{BASE_URL}/", json={"title": "Buy milk"}).json()["id"]
+    etags = [client.get(f"{BASE_URL}/").headers["etag"]]
+
+    client.put(f"{BASE_URL}/{todo_id}", json={"completed": True})
+    etags.append(client.get(f"{BASE_URL}/").headers["etag"])
+    db_session.add(Subtask(todo_id=todo_id, title="Go to the shop"))
+    db_session.commit()
+    etags.append(client.get(f"{BASE_URL}/").headers["etag"])
+    client.delete(f"{BASE_URL}/{todo_id}")
+    etags.append(client.get(f"{BASE_URL}/").headers["etag"])
+
+    assert len(set(etags)) == 4
+    assert client.get(f"{BASE_URL}/", headers={"If-None-Match": etags[0]}).status_code == 200
+
+
+def test_etag_depends_on_the_query(client):
+    """Test that different query strings and todos get different ETags"""
+    first = client.post(f"{BASE_URL}/", json={"title": "Buy milk"}).json()["id"]
+    second = client.post(f"{BASE_URL}/", json={"title": "Buy bread"}).json()["id"]
+
+    full = client.get(f"{BASE_URL}/")
+    sparse = client.get(f"{BASE_URL}/", params={"fields": "title", "include": ""})
+    detail = client.get(f"{BASE_URL}/{first}")
+
+    assert sparse.headers["etag"] != full.headers["etag"]
+    assert client.get(f"{BASE_URL}/", params={"fields": "title", "include": ""},
+                      headers={"If-None-Match": sparse.headers["etag"]}).status_code == 304
+    assert client.get(f"{BASE_URL}/{second}", headers={"If-None-Match": detail.headers["etag"]}).status_code == 200
+    assert client.get(f"{BASE_URL}/{first}", headers={"If-None-Match": detail.headers["etag"]}).status_code == 304
+
+
+def test_if_none_match_lists_and_weak_tags(client):
+    """Test that a listed or weak form of the current ETag matches"""
+    client.post(f"{BASE_URL}/", json={"title": "Buy milk"})
+    etag = client.get(f"{BASE_URL}/").headers["etag"]
+
+    assert client.get(f"{BASE_URL}/", headers={"If-None-Match": f'"stale", W/{etag}'}).status_code == 304
+    assert client.get(f"{BASE_URL}/", headers={"If-None-Match": '"stale"'}).status_code == 200
+
+
+def test_version_shards_are_summed(client, db_session):
+    """Test that a bump on another counter shard of a table changes the ETag"""
+    client.post(f"{BASE_URL}/", json={"title": "Buy milk"})
+    etag = client.get(f"{BASE_URL}/").headers["etag"]
+    before = TodoService(db_session).get_table_versions()
+
+    db_session.add(TableVersion(name="todos:3", version=1))
+    db_session.commit()
+
+    assert TodoService(db_session).get_table_versions() == {**before, "todos": before["todos"] + 1}
+    assert client.get(f"{BASE_URL}/", headers={"If-None-Match": etag}).status_code == 200
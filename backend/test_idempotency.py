@@ -0,0 +1,204 @@
+"""
+Tests for Idempotency-Key handling on the create, generate and translate endpoints
+"""
+
+import asyncio
+import re
+import time
+from datetime import timedelta
+
+import httpx
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from app.core.idempotency import IdempotencyMiddleware, IdempotencyStore
+from app.models.idempotency import IdempotencyKey
+from app.models.subtask import Subtask
+from app.models.todo import Todo
+
+
+def test_create_is_replayed(client, db_session):
+    """Test that a retried create returns the first todo instead of a second one"""
+    headers = {"Idempotency-Key": "create-1"}
+
+    first = client.post("/api/v1/todos/", json={"title": "Buy milk"}, headers=headers)
+    second = client.post("/api/v1/todos/", json={"title": "Buy milk"}, headers=headers)
+
+    assert second.status_code == first.status_code
+    assert second.json() == first.json()
+    assert second.headers["idempotent-replayed"] == "true"
+    assert "idempotent-replayed" not in first.headers
+    assert db_session.query(Todo).count() == 1
+
+
+def test_requests_without_key_are_not_deduplicated(client, db_session):
+    """Test that the header is opt-in"""
+    client.post("/api/v1/todos/", json={"title": "Buy milk"})
+    client.post("/api/v1/todos/", json={"title": "Buy milk"})
+
+    assert db_session.query(Todo).count() == 2
+
+
+def test_key_reused_with_other_body_is_rejected(client, db_session):
+    """Test that one key cannot stand for two different requests"""
+    headers = {"Idempotency-Key": "create-2"}
+    client.post("/api/v1/todos/", json={"title": "Buy milk"}, headers=headers)
+
+    response = client.post("/api/v1/todos/", json={"title": "Buy bread"}, headers=headers)
+
+    assert response.status_code == 422
+    assert db_session.query(Todo).count() == 1
+
+
+def test_generate_is_replayed_without_a_second_llm_call(client, db_session, fake_llm):
+    """Test that a retried generate neither calls the AI again nor adds subtasks"""
+    todo = client.post("/api/v1/todos/", json={"title": "Plan party"}).json()
+    headers = {"Idempotency-Key": "generate-1"}
+    request = {"todo_id": todo["id"], "max_subtasks": 3}
+
+    first = client.post(f"/api/v1/todos/{todo['id']}/generate", json=request, headers=headers)
+    second = client.post(f"/api/v1/todos/{todo['id']}/generate", json=request, headers=headers)
+
+    assert first.status_code == 200
+    assert second.json() == first.json()
+    assert fake_llm.calls == 1
+    assert db_session.query(Subtask).count() == 3
+
+
+def test_client_errors_are_replayed(client, db_session):
+    """Test that a 4xx response is stored like any other"""
+    headers = {"Idempotency-Key": "generate-2"}
+    request = {"todo_id": 999, "max_subtasks": 3}
+
+    first = client.post("/api/v1/todos/999/generate", json=request, headers=headers)
+    second = client.post("/api/v1/todos/999/generate", json=request, headers=headers)
+
+    assert first.status_code == second.status_code == 404
+    assert second.headers["idempotent-replayed"] == "true"
+    assert db_session.query(IdempotencyKey).filter_by(key="generate-2").one().status_code == 404
+
+
+@pytest.fixture
+def file_store(tmp_path):
+    """Store on a file database, so concurrent requests get their own connections"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'idempotency.db'}", connect_args={"check_same_thread": False})
+    IdempotencyKey.__table__.create(bind=engine)
+    yield IdempotencyStore(sessionmaker(bind=engine, expire_on_commit=False), ttl_seconds=60)
+    engine.dispose()
+
+
+def _app(store, handler, **options):
+    app = Starlette(routes=[Route("/work", handler, methods=["POST"])])
+    return IdempotencyMiddleware(app, store=store, routes=[re.compile("^/work$")], **options)
+
+
+def test_retry_waits_for_request_in_progress(file_store):
+    """Test that a duplicate arriving mid-request gets the original's response"""
+    calls = []
+
+    async def handler(request):
+        calls.append(await request.json())
+        await asyncio.sleep(0.1)
+        return JSONResponse({"run": len(calls)}, status_code=201)
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=_app(file_store, handler))
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            first = asyncio.create_task(http.post("/work", json={"n": 1}, headers={"Idempotency-Key": "k"}))
+            await asyncio.sleep(0.02)
+            second = await http.post("/work", json={"n": 1}, headers={"Idempotency-Key": "k"})
+            return await first, second
+
+    first, second = asyncio.run(scenario())
+
+    assert len(calls) == 1
+    assert first.status_code == second.status_code == 201
+    assert second.json() == first.json() == {"run": 1}
+    assert second.headers["idempotent-replayed"] == "true"
+
+
+def test_retry_gives_up_after_wait(file_store):
+    """Test that a duplicate outlasted by the original gets 409"""
+    async def handler(request):
+        await asyncio.sleep(0.2)
+        return JSONResponse({})
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=_app(file_store, handler, wait_seconds=0.05))
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            first = asyncio.create_task(http.post("/work", headers={"Idempotency-Key": "k"}))
+            await asyncio.sleep(0.02)
+            second = await http.post("/work", headers={"Idempotency-Key": "k"})
+            await first
+            return second
+
+    response = asyncio.run(scenario())
+
+    assert response.status_code == 409
+    assert response.headers["retry-after"] == "1"
+
+
+def test_failed_request_releases_key(file_store):
+    """Test that a 5xx response is not replayed"""
+    calls = []
+
+    async def handler(request):
+        calls.append(1)
+        return JSONResponse({}, status_code=500 if len(calls) == 1 else 200)
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=_app(file_store, handler))
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            first = await http.post("/work", headers={"Idempotency-Key": "k"})
+            second = await http.post("/work", headers={"Idempotency-Key": "k"})
+            return first, second
+
+    first, second = asyncio.run(scenario())
+
+    assert (first.status_code, second.status_code) == (500, 200)
+    assert len(calls) == 2
+
+
+def test_key_left_by_a_crashed_request_is_taken_over(file_store):
+    """Test that an in-progress key is only held for its lease, a completed one for the TTL"""
+    file_store.lease = timedelta(seconds=0.05)
+    assert file_store.claim("k", "POST", "/work", "hash")[0]
+    assert not file_store.claim("k", "POST", "/work", "hash")[0]
+
+    # The process died without completing or releasing the key
+    time.sleep(0.1)
+    claimed, record = file_store.claim("k", "POST", "/work", "hash")
+    assert claimed
+
+    file_store.complete(record.id, 201, [], b"{}")
+    time.sleep(0.1)
+    assert file_store.purge_expired() == 0
+    assert not file_store.claim("k", "POST", "/work", "hash")[0]
+
+
+def test_running_request_keeps_its_key(file_store):
+    """Test that a request outlasting the lease renews it instead of running twice"""
+    file_store.lease = timedelta(seconds=0.06)
+    calls = []
+
+    async def handler(request):
+        calls.append(1)
+        await asyncio.sleep(0.3)
+        return JSONResponse({"run": len(calls)})
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=_app(file_store, handler))
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            first = asyncio.create_task(http.post("/work", headers={"Idempotency-Key": "k"}))
+            await asyncio.sleep(0.15)
+            second = await http.post("/work", headers={"Idempotency-Key": "k"})
+            return await first, second
+
+    first, second = asyncio.run(scenario())
+
+    assert len(calls) == 1
+    assert second.json() == first.json() == {"run": 1}
@@ -0,0 +1,91 @@
+"""
+Tests for background AI subtask generation jobs
+"""
+
+import asyncio
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.models.job import Job, JOB_DONE, JOB_RUNNING
+from app.models.todo import Todo
+from app.services.ai_service import ai_service
+from app.services.job_queue import JobQueue, generate_subtasks_job, job_queue
+
+
+# Answer every AI call with the offline fake
+pytestmark = pytest.mark.usefixtures("fake_llm")
+
+
+def wait_for_job(client, job_id):
+    """Wait for the queue to drain and return the job's final state"""
+    # The test engine shares one connection, so wait on the app's loop
+    # instead of polling alongside the worker
+    client.portal.call(job_queue.join)
+    return client.get(f"/api/v1/jobs/{job_id}").json()
+
+
+def test_generate_job_runs_in_background(client):
+    """Test that the endpoint answers 202 and the job stores its subtasks"""
+    todo = client.post("/api/v1/todos/", json={"title": "Plan party"}).json()
+
+    response = client.post(f"/api/v1/todos/{todo['id']}/generate/jobs", json={
+        "todo_id": todo["id"], "max_subtasks": 3
+    })
+
+    assert response.status_code == 202
+    job = response.json()
+    assert job["status"] == "queued"
+    assert response.headers["location"] == f"/api/v1/jobs/{job['id']}"
+
+    job = wait_for_job(client, job["id"])
+    assert job["status"] == "done"
+    assert [subtask["title"] for subtask in job["result"]] == [
+        subtask["title"] for subtask in client.get(f"/api/v1/todos/{todo['id']}/subtasks").json()
+    ]
+    assert len(job["result"]) == 3
+    assert job["started_at"] is not None and job["finished_at"] is not None
+
+
+def test_failed_job_reports_error(client, monkeypatch):
+    """Test that an AI error marks the job failed with its message"""
+    async def broken(*args, **kwargs):
+        raise RuntimeError("model unavailable")
+
+    monkeypatch.setattr(ai_service, "generate_subtasks", broken)
+    todo = client.post("/api/v1/todos/", json={"title": "Plan party"}).json()
+
+    job_id = client.post(f"/api/v1/todos/{todo['id']}/generate/jobs", json={"todo_id": todo["id"]}).json()["id"]
+
+    job = wait_for_job(client, job_id)
+    assert job["status"] == "failed"
+    assert job["error"] == "model unavailable"
+
+
+def test_unknown_todo_and_job_return_404(client):
+    """Test 404s for a missing todo and a missing job"""
+    assert client.post("/api/v1/todos/999/generate/jobs", json={"todo_id": 999}).status_code == 404
+    assert client.get("/api/v1/jobs/missing").status_code == 404
+
+
+def test_interrupted_jobs_resume_on_start(engine):
+    """Test that jobs left running or queued by a restart are run again"""
+    Session = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+    with Session() as db:
+        db.add(Todo(id=1, title="Plan party"))
+        db.add(Job(id="interrupted", kind="generate_subtasks", todo_id=1, status=JOB_RUNNING, params={"max_subtasks": 2}))
+        db.commit()
+
+    async def scenario():
+        queue = JobQueue(Session, workers=1)
+        queue.register("generate_subtasks", generate_subtasks_job)
+        await queue.start()
+        await queue.join()
+        await queue.stop()
+
+    asyncio.run(scenario())
+
+    with Session() as db:
+        job = db.get(Job, "interrupted")
+        assert job.status == JOB_DONE
+        assert len(job.result) == 2
@@ -0,0 +1,226 @@
+"""
+Tests for the LLM client layer behind ai_service and translation_service
+"""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.services.ai_service import AIService, parse_subtasks
+from app.services.llm_client import (
+    FakeProvider, LLMClient, LLMError, OpenAICompatibleProvider, TokenBucket
+)
+from app.services.translation_service import TranslationService
+
+
+def chat_response(content, prompt_tokens=10, completion_tokens=5, status_code=200, headers=None):
+    return httpx.Response(status_code, headers=headers, json={
+        "choices": [{"message": {"role": "assistant", "content": content}}],
+        "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens},
+    })
+
+
+def make_client(handler, **options):
+    """LLMClient over an OpenAI-compatible provider served by `handler`"""
+    provider = OpenAICompatibleProvider(
+        "https://llm.test/v1", "key", "test-model", transport=httpx.MockTransport(handler)
+    )
+    options.setdefault("backoff_base_ms", 1)
+    return LLMClient(provider, **options)
+
+
+def test_token_bucket_waits_for_refill():
+    """Test that a drained bucket delays the next caller"""
+    async def scenario():
+        bucket = TokenBucket(rate_per_minute=600, capacity=1)
+        first = await bucket.acquire()
+        second = await bucket.acquire()
+        return first, second
+
+    first, second = asyncio.run(scenario())
+
+    assert first == 0
+    assert second == pytest.approx(0.1, abs=0.02)
+
+
+def test_token_bucket_refund_and_disabled_limit():
+    """Test refunds top the bucket up and a zero rate never waits"""
+    async def scenario():
+        bucket = TokenBucket(rate_per_minute=60, capacity=10)
+        await bucket.acquire(10)
+        bucket.refund(4)
+        refunded = await bucket.acquire(4)
+        unlimited = await TokenBucket(rate_per_minute=0).acquire(1000)
+        return refunded, unlimited
+
+    assert asyncio.run(scenario()) == (0, 0)
+
+
+def test_retries_rate_limits_and_server_errors():
+    """Test that 429/5xx are retried, honouring Retry-After, then succeed"""
+    responses = [
+        httpx.Response(429, headers={"retry-after": "0"}),
+        httpx.Response(503),
+        chat_response("Bonjour"),
+    ]
+    requests = []
+
+    def handler(request):
+        requests.append(json.loads(request.content))
+        return responses.pop(0)
+
+    async def scenario():
+        client = make_client(handler)
+        completion = await client.complete([{"role": "user", "content": "Hello"}], max_tokens=20)
+        await client.aclose()
+        return completion
+
+    completion = asyncio.run(scenario())
+
+    assert completion.text == "Bonjour"
+    assert len(requests) == 3
+    assert requests[0]["model"] == "test-model"
+    assert requests[0]["max_tokens"] == 20
+
+
+def test_client_errors_are_not_retried():
+    """Test that a 400 fails at once with its status"""
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(400, json={"error": "bad request"})
+
+    async def scenario():
+        client = make_client(handler)
+        try:
+            await client.complete([{"role": "user", "content": "Hello"}])
+        finally:
+            await client.aclose()
+
+    with pytest.raises(LLMError) as error:
+        asyncio.run(scenario())
+    assert error.value.status_code == 400
+    assert len(calls) == 1
+
+
+def test_timeouts_are_retried_until_exhausted():
+    """Test that per-call timeouts count as retryable failures"""
+    calls = []
+
+    def handler(request):
+        calls.append(request.extensions["timeout"])
+        raise httpx.ReadTimeout("slow", request=request)
+
+    async def scenario():
+        client = make_client(handler, max_retries=2, timeout=1.5)
+        try:
+            await client.complete([{"role": "user", "content": "Hello"}])
+        finally:
+            await client.aclose()
+
+    with pytest.raises(LLMError, match="timed out"):
+        asyncio.run(scenario())
+    assert len(calls) == 3
+    assert calls[0]["read"] == 1.5
+
+
+def test_malformed_answers_are_retried_as_llm_errors():
+    """Test that unreadable JSON or a missing choices list becomes a retryable LLMError"""
+    responses = [
+        httpx.Response(200, content=b"<html>bad gateway</html>"),
+        httpx.Response(200, json={"error": "overloaded"}),
+        chat_response("Bonjour"),
+    ]
+
+    async def scenario():
+        client = make_client(lambda request: responses.pop(0))
+        completion = await client.complete([{"role": "user", "content": "Hello"}])
+        await client.aclose()
+        return completion
+
+    assert asyncio.run(scenario()).text == "Bonjour"
+    assert responses == []
+
+    async def exhausted():
+        client = make_client(lambda request: httpx.Response(200, json={"choices": []}), max_retries=0)
+        try:
+            await client.complete([{"role": "user", "content": "Hello"}])
+        finally:
+            await client.aclose()
+
+    with pytest.raises(LLMError, match="could not be read"):
+        asyncio.run(exhausted())
+
+
+def test_ai_service_parses_subtasks_from_fake_provider():
+    """Test subtask generation end to end over the fake provider"""
+    answer = '```json\n[{"title": "Buy balloons", "description": "Ten of them"}, {"title": "Send invites"}]\n```'
+    provider = FakeProvider(responder=lambda messages: answer, failures=[503])
+    service = AIService(LLMClient(provider, backoff_base_ms=1))
+
+    subtasks = asyncio.run(service.generate_subtasks("Plan party", max_subtasks=5))
+
+    assert subtasks == [
+        {"title": "Buy balloons", "description": "Ten of them"},
+        {"title": "Send invites", "description": ""},
+    ]
+    assert provider.calls == 2
+
+
+def test_fake_mode_goes_through_the_llm_client(fake_llm):
+    """Test that LLM_PROVIDER=fake answers the app's prompts via LLMClient and its quotas"""
+    from app.core.metrics import metrics
+    from app.services.providers import get_ai_service, get_translation_service
+
+    metrics.reset()
+
+    async def scenario():
+        subtasks = await get_ai_service().generate_subtasks("Plan party", max_subtasks=2)
+        translations = await get_translation_service().translate_text_multi("Plan party", ["French", "German"])
+        return subtasks, translations
+
+    subtasks, translations = asyncio.run(scenario())
+
+    assert [subtask["title"] for subtask in subtasks] == ["Define the goal: Plan party", "Gather what is needed: Plan party"]
+    assert translations == {"French": "[French] Plan party", "German": "[German] Plan party"}
+    assert fake_llm.calls == metrics.get("llm_requests") == 2
+
+
+def test_parse_subtasks_from_plain_list():
+    """Test the line-based fallback for answers that are not JSON"""
+    assert parse_subtasks("1. Buy balloons\n2) Send invites\n- Bake cake", 2) == [
+        {"title": "Buy balloons", "description": ""},
+        {"title": "Send invites", "description": ""},
+    ]
+
+
+def test_translate_text_multi_keeps_only_answered_languages():
+    """Test that the multi-language prompt result drops missing languages"""
+    answer = 'Sure: {"French": "Acheter du lait", "German": ""}'
+    service = TranslationService(LLMClient(FakeProvider(responder=lambda messages: answer)))
+
+    result = asyncio.run(service.translate_text_multi("Buy milk", ["French", "German", "Dutch"]))
+
+    assert result == {"French": "Acheter du lait"}
+
+
+def test_cancelled_call_counts_saved_tokens():
+    """Test that cancelling an in-flight call records it and the tokens it did not spend"""
+    from app.core.metrics import metrics
+
+    async def scenario():
+        client = LLMClient(FakeProvider(latency_ms=1000), requests_per_minute=0, tokens_per_minute=0)
+        call = asyncio.create_task(client.complete([{"role": "user", "content": "hello"}], max_tokens=300))
+        await asyncio.sleep(0.01)
+        call.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await call
+
+    metrics.reset()
+    asyncio.run(scenario())
+
+    assert metrics.get("llm_cancelled") == 1
+    assert metrics.get("llm_cancelled_tokens_saved") == 300
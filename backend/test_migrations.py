@@ -0,0 +1,123 @@
+"""
+Tests for the Alembic migrations
+"""
+
+import os
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from sqlalchemy import create_engine, inspect, text
+
+from app.core.database import Base
+from app.models.search import is_search_object
+
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.abspath(__file__)), "alembic.ini")
+
+
+def alembic_config():
+    """The project's Alembic config"""
+    config = Config(ALEMBIC_INI)
+    config.set_main_option("script_location", os.path.join(os.path.dirname(ALEMBIC_INI), "alembic"))
+    return config
+
+
+def upgrade(engine, revision="head"):
+    """Run the migrations on `engine` up to `revision`"""
+    config = alembic_config()
+    with engine.begin() as connection:
+        config.attributes["connection"] = connection
+        command.upgrade(config, revision)
+
+
+@pytest.fixture
+def file_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'migrate.db'}")
+    yield engine
+    engine.dispose()
+
+
+def test_fresh_database_gets_query_indexes(file_engine):
+    """Test that upgrading an empty database creates the indexes"""
+    upgrade(file_engine)
+
+    inspector = inspect(file_engine)
+    assert "ix_subtasks_todo_id_order_index" in {i["name"] for i in inspector.get_indexes("subtasks")}
+    assert {"ix_todos_created_at_id", "ix_todos_completed_created_at"} <= {
+        i["name"] for i in inspector.get_indexes("todos")
+    }
+    assert "uq_translations_todo_id_language" in {
+        c["name"] for c in inspector.get_unique_constraints("translations")
+    }
+
+
+def test_migrations_match_models(file_engine):
+    """Test that the migrated schema has no drift from the models"""
+    from alembic.autogenerate import compare_metadata
+    from alembic.migration import MigrationContext
+    from app.models import todo, subtask, translation_cache, job, idempotency, subtask_suggestion, table_version  # noqa: F401 - register models
+
+    upgrade(file_engine)
+
+    with file_engine.connect() as connection:
+        context = MigrationContext.configure(connection, opts={
+            "include_name": lambda name, type_, parent_names: not is_search_object(name)
+        })
+        diff = compare_metadata(context, Base.metadata)
+    assert diff == []
+
+
+def test_existing_database_is_upgraded_and_deduplicated(file_engine):
+    """Test upgrading a pre-migration database with duplicate translations"""
+    upgrade(file_engine, "0001")
+    with file_engine.begin() as connection:
+        connection.execute(text("INSERT INTO todos (id, title, completed) VALUES (1, 'Buy milk', 0)"))
+        connection.execute(text(
+            "INSERT INTO translations (todo_id, language, translated_title) "
+            "VALUES (1, 'French', 'Acheter du lait'), (1, 'French', 'Acheter lait')"
+        ))
+
+    upgrade(file_engine)
+
+    with file_engine.connect() as connection:
+        titles = connection.execute(text("SELECT translated_title FROM translations")).scalars().all()
+        matches = connection.execute(text("SELECT rowid FROM todo_search WHERE todo_search MATCH 'milk'")).scalars().all()
+    assert titles == ["Acheter du lait"]
+    assert matches == [1]
+
+    with file_engine.begin() as connection:
+        connection.execute(text("UPDATE todos SET title = 'Buy oat milk' WHERE id = 1"))
+        remaining = connection.execute(text("SELECT count(*) FROM translations")).scalar()
+    assert remaining == 0
+
+
+def test_create_all_database_can_be_upgraded(file_engine, tmp_path):
+    """Test that a database built by create_all upgrades without stamping"""
+    from app.models import todo, subtask, translation_cache, job, idempotency, subtask_suggestion, table_version  # noqa: F401 - register models
+
+    # An older create_all database: the base tables, already holding todos
+    for name in ("todos", "subtasks", "translations"):
+        Base.metadata.tables[name].create(bind=file_engine)
+    with file_engine.begin() as connection:
+        connection.execute(text("INSERT INTO todos (id, title, completed) VALUES (1, 'Buy milk', 0), (2, 'Walk dog', 0)"))
+        connection.execute(text("INSERT INTO subtasks (todo_id, title, completed, order_index) VALUES (2, 'Find the leash', 0, 0)"))
+    Base.metadata.create_all(bind=file_engine)
+
+    upgrade(file_engine)
+
+    fresh_engine = create_engine(f"sqlite:///{tmp_path / 'fresh.db'}")
+    upgrade(fresh_engine)
+    with fresh_engine.connect() as connection:
+        migrated_objects = set(connection.execute(text("SELECT type, name FROM sqlite_master")).all())
+    fresh_engine.dispose()
+    with file_engine.connect() as connection:
+        version = connection.execute(text("SELECT version_num FROM alembic_version")).scalar_one()
+        objects = set(connection.execute(text("SELECT type, name FROM sqlite_master")).all())
+        matches = connection.execute(text(
+            "SELECT rowid FROM todo_search WHERE todo_search MATCH 'milk OR leash' ORDER BY rowid"
+        )).scalars().all()
+    assert version == ScriptDirectory.from_config(alembic_config()).get_current_head()
+    assert {("trigger", "todos_version_insert"), ("index", "ix_todos_created_at_id")} <= migrated_objects
+    assert migrated_objects <= objects
+    assert matches == [1, 2]
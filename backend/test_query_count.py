@@ -0,0 +1,97 @@
+"""
+Tests asserting how many SQL statements each todo write request issues
+"""
+
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+BASE_URL = "/api/v1/todos"
+
+
+@contextmanager
+def count_queries(engine):
+    """Collect the SQL statements executed on `engine`"""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def test_create_is_a_single_insert(client, engine):
+    """Test that creating a todo issues only its INSERT ... RETURNING"""
+    with count_queries(engine) as statements:
+        response = client.post(f"{BASE_URL}/", json={"title": "Write report"})
+
+    assert response.status_code == 201
+    assert response.json()["subtasks"] == []
+    assert len(statements) == 1
+    assert statements[0].startswith("INSERT INTO todos")
+
+
+def test_toggle_without_relations_is_a_single_update(client, engine):
+    """Test that toggling with include= issues one UPDATE ... RETURNING"""
+    todo_id = client.post(f"{BASE_URL}/", json={"title": "Write report"}).json()["id"]
+
+    with count_queries(engine) as statements:
+        response = client.patch(f"{BASE_URL}/{todo_id}/toggle", params={"include": ""})
+
+    assert response.status_code == 200
+    assert response.json()["completed"] is True
+    assert len(statements) == 1
+    assert statements[0].startswith("UPDATE todos")
+
+
+def test_toggle_with_relations_uses_batched_loads(client, engine):
+    """Test that the default toggle response adds one query per relation"""
+    todo_id = client.post(f"{BASE_URL}/", json={"title": "Write report"}).json()["id"]
+
+    with count_queries(engine) as statements:
+        response = client.patch(f"{BASE_URL}/{todo_id}/toggle")
+
+    assert response.status_code == 200
+    assert response.json()["subtasks"] == []
+    assert len(statements) == 3
+    assert statements[0].startswith("UPDATE todos")
+
+
+def test_update_returns_new_values(client, engine):
+    """Test that an update returns the changed row without re-querying it"""
+    todo_id = client.post(f"{BASE_URL}/", json={"title": "Write report"}).json()["id"]
+
+    with count_queries(engine) as statements:
+        response = client.put(
+            f"{BASE_URL}/{todo_id}",
+            params={"include": ""},
+            json={"title": "Write final report"},
+        )
+
+    assert response.status_code == 200
+    assert response.json()["title"] == "Write final report"
+    assert response.json()["updated_at"] is not None
+    assert len(statements) == 1
+
+
+def test_delete_does_not_load_relations(client, engine):
+    """Test that deleting a todo issues only set-based DELETEs"""
+    todo_id = client.post(f"{BASE_URL}/", json={"title": "Write report"}).json()["id"]
+
+    with count_queries(engine) as statements:
+        response = client.delete(f"{BASE_URL}/{todo_id}")
+
+    assert response.status_code == 204
+    assert all(statement.startswith("DELETE") for statement in statements)
+    assert client.get(f"{BASE_URL}/{todo_id}").status_code == 404
+
+
+def test_missing_todo_returns_404(client):
+    """Test that writes to an unknown todo still return 404"""
+    assert client.patch(f"{BASE_URL}/999/toggle").status_code == 404
+    assert client.put(f"{BASE_URL}/999", json={"title": "x"}).status_code == 404
+    assert client.delete(f"{BASE_URL}/999").status_code == 404
@@ -0,0 +1,121 @@
+"""
+Tests for coalescing identical concurrent AI calls
+"""
+
+import asyncio
+
+import pytest
+
+from app.core.metrics import metrics
+from app.core.singleflight import SingleFlight
+from app.models.subtask import Subtask
+from app.models.todo import Todo
+from app.services.ai_service import AIService
+from app.services.fake_answers import fake_answer
+from app.services.llm_client import FakeProvider, LLMClient
+from app.services.todo_service import AsyncTodoService
+
+
+def test_concurrent_calls_share_one_run():
+    """Test that callers with the same key get one execution's result"""
+    runs = []
+
+    async def work(value):
+        runs.append(value)
+        await asyncio.sleep(0.01)
+        return value
+
+    async def scenario():
+        flight = SingleFlight()
+        results = await asyncio.gather(
+            flight.do("a", lambda: work(1)),
+            flight.do("a", lambda: work(2)),
+            flight.do("b", lambda: work(3)),
+        )
+        return results, flight.in_flight("a")
+
+    metrics.reset()
+    results, still_running = asyncio.run(scenario())
+
+    assert results == [1, 1, 3]
+    assert runs == [1, 3]
+    assert not still_running
+    assert metrics.get("singleflight_coalesced") == 1
+
+
+def test_errors_reach_every_caller():
+    """Test that a failure is shared, and the next call runs again"""
+    runs = []
+
+    async def failing():
+        runs.append(1)
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    async def scenario():
+        flight = SingleFlight()
+        results = await asyncio.gather(
+            flight.do("a", failing), flight.do("a", failing), return_exceptions=True
+        )
+        with pytest.raises(RuntimeError):
+            await flight.do("a", failing)
+        return results
+
+    results = asyncio.run(scenario())
+
+    assert [str(result) for result in results] == ["boom", "boom"]
+    assert len(runs) == 2
+
+
+def test_follower_takes_over_when_leader_is_cancelled():
+    """Test that cancelling the caller running the work does not fail the others"""
+    runs = []
+
+    async def work():
+        runs.append(1)
+        await asyncio.sleep(0.02)
+        return "done"
+
+    async def scenario():
+        flight = SingleFlight()
+        leader = asyncio.ensure_future(flight.do("a", work))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flight.do("a", work))
+        await asyncio.sleep(0.005)
+        leader.cancel()
+        return await follower, leader.cancelled()
+
+    assert asyncio.run(scenario()) == ("done", True)
+    assert len(runs) == 2
+
+
+def test_double_generate_inserts_subtasks_once(db_session):
+    """Test that two identical generate calls make one AI call and one insert"""
+    db_session.add(Todo(id=1, title="Plan party"))
+    db_session.commit()
+    provider = FakeProvider(fake_answer, latency_ms=20)
+
+    async def scenario():
+        service = AsyncTodoService(db_session, ai=AIService(LLMClient(provider)))
+        return await asyncio.gather(service.generate_subtasks(1, 3), service.generate_subtasks(1, 3))
+
+    first, second = asyncio.run(scenario())
+
+    assert provider.calls == 1
+    assert [subtask.id for subtask in first] == [subtask.id for subtask in second]
+    assert db_session.query(Subtask).count() == 3
+
+
+def test_double_translate_stores_one_translation(db_session, fake_llm):
+    """Test that identical concurrent translations share the work"""
+    db_session.add(Todo(id=1, title="Plan party", description="Saturday"))
+    db_session.commit()
+
+    async def scenario():
+        service = AsyncTodoService(db_session)
+        return await asyncio.gather(service.translate_todo(1, "French"), service.translate_todo(1, "French"))
+
+    first, second = asyncio.run(scenario())
+
+    assert first.id == second.id
+    assert fake_llm.calls == 1  # title and description share one batched prompt
@@ -0,0 +1,82 @@
+"""
+Tests for generating subtasks for many todos with packed prompts
+"""
+
+import asyncio
+import json
+
+from app.models.subtask import Subtask
+from app.models.todo import Todo
+from app.services.ai_service import AIService, pack_todos
+from app.services.llm_client import FakeProvider, LLMClient
+
+
+def batch_responder(skip=()):
+    """Answer batched prompts with two subtasks per todo, single prompts with a list"""
+    def respond(messages):
+        if "JSON array of todos" not in messages[0]["content"]:
+            return '[{"title": "Alone", "description": ""}]'
+        todos = json.loads(messages[-1]["content"])
+        return json.dumps({
+            str(todo["id"]): [{"title": f"{todo['title']} step {n}", "description": ""} for n in (1, 2)]
+            for todo in todos if todo["id"] not in skip
+        })
+    return respond
+
+
+def make_ai(responder):
+    provider = FakeProvider(responder)
+    return AIService(LLMClient(provider, requests_per_minute=0, tokens_per_minute=0)), provider
+
+
+def todos(count):
+    return [{"id": i, "title": f"Todo {i}", "description": "Some details about it"} for i in range(1, count + 1)]
+
+
+def test_fifty_todos_take_a_handful_of_calls():
+    """Test that todos are packed into a few prompts and every one is answered"""
+    ai, provider = make_ai(batch_responder())
+
+    result = asyncio.run(ai.generate_subtasks_batch(todos(50), max_subtasks=5))
+
+    assert sorted(result) == list(range(1, 51))
+    assert result[7] == [{"title": "Todo 7 step 1", "description": ""}, {"title": "Todo 7 step 2", "description": ""}]
+    assert 1 < provider.calls <= 5
+
+
+def test_packing_respects_the_context():
+    """Test that each prompt's input and expected output fit the context"""
+    chunks = pack_todos(todos(50), max_subtasks=5, context_tokens=2000)
+
+    assert sum(len(chunk) for chunk in chunks) == 50
+    assert all(len(chunk) * 5 * 80 < 2000 for chunk in chunks)
+    assert pack_todos(todos(3), max_subtasks=5, context_tokens=100) == [[todo] for todo in todos(3)]
+
+
+def test_endpoint_saves_all_and_reports_each_todo(client, db_session, monkeypatch):
+    """Test per-todo results and one transaction for the found todos"""
+    ai, provider = make_ai(batch_responder(skip={2}))
+    monkeypatch.setattr("app.services.todo_service.get_ai_service", lambda: ai)
+    db_session.add_all([Todo(id=1, title="Plan party"), Todo(id=2, title="Book venue"), Todo(id=3, title="Invite")])
+    db_session.commit()
+
+    response = client.post("/api/v1/todos/generate/batch", json={"todo_ids": [3, 99, 1, 2], "max_subtasks": 3})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [(result["todo_id"], result["status"]) for result in body] == [(3, "ok"), (99, "not_found"), (1, "ok"), (2, "ok")]
+    assert [subtask["title"] for subtask in body[0]["subtasks"]] == ["Invite step 1", "Invite step 2"]
+    # Todo 2 was missing from the batched answer and generated on its own
+    assert [subtask["title"] for subtask in body[3]["subtasks"]] == ["Alone"]
+    assert provider.calls == 2
+    assert db_session.query(Subtask).count() == 5
+
+
+def test_fake_provider_answers_in_one_call(client, fake_llm):
+    """Test the endpoint against the offline provider"""
+    ids = [client.post("/api/v1/todos/", json={"title": f"Todo {i}"}).json()["id"] for i in range(4)]
+
+    response = client.post("/api/v1/todos/generate/batch", json={"todo_ids": ids, "max_subtasks": 2})
+
+    assert all(result["status"] == "ok" and len(result["subtasks"]) == 2 for result in response.json())
+    assert fake_llm.calls == 1
@@ -0,0 +1,85 @@
+"""
+Tests for reusing generated subtasks across todos with similar text
+"""
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.models.subtask_suggestion import SubtaskSuggestion
+from app.services.subtask_cache import SimilarityIndex, normalize_todo_text, subtask_index
+
+SUBTASKS = [{"title": f"Step {n}", "description": ""} for n in range(1, 4)]
+
+
+def test_normalization_ignores_wording_noise():
+    """Test that case, hyphens and stopwords do not change the text"""
+    assert normalize_todo_text("Plan team offsite") == normalize_todo_text("Plan the team off-site")
+    assert normalize_todo_text("Café Opening", "") == "cafe opening"
+
+
+def test_similar_text_matches_and_different_text_does_not():
+    """Test the threshold, the model key and the number of subtasks"""
+    index = SimilarityIndex(threshold=0.8)
+    index.add(1, "model-a", "Plan team offsite", "", 3, SUBTASKS)
+
+    match = index.lookup("model-a", "Plan the team off-site", "", 3)
+    assert (match.entry_id, match.similarity, match.subtasks) == (1, 1.0, SUBTASKS)
+    assert index.lookup("model-a", "File quarterly taxes", "", 3) is None
+    assert index.lookup("model-b", "Plan team offsite", "", 3) is None
+    # More subtasks asked for than were generated
+    assert index.lookup("model-a", "Plan team offsite", "", 5) is None
+    assert index.lookup("model-a", "Plan team offsite", "", 2).subtasks == SUBTASKS[:2]
+
+
+def test_oldest_entries_are_dropped():
+    """Test that the index keeps at most max_entries"""
+    index = SimilarityIndex(max_entries=2)
+    for entry_id, title in enumerate(["Plan team offsite", "Renew passport", "Paint the fence"]):
+        index.add(entry_id, "m", title, "", 3, SUBTASKS)
+
+    assert len(index) == 2
+    assert index.lookup("m", "Plan team offsite", "", 3) is None
+
+
+def test_endpoint_reuses_subtasks_for_similar_todo(client, db_session, fake_llm):
+    """Test that a reworded todo gets stored subtasks without an AI call"""
+    metrics.reset()
+    first = client.post("/api/v1/todos/", json={"title": "Plan team offsite"}).json()["id"]
+    second = client.post("/api/v1/todos/", json={"title": "Plan the team off-site"}).json()["id"]
+
+    generated = client.post(f"/api/v1/todos/{first}/generate", json={"todo_id": first, "max_subtasks": 3})
+    reused = client.post(f"/api/v1/todos/{second}/generate", json={"todo_id": second, "max_subtasks": 3})
+
+    assert generated.status_code == reused.status_code == 200
+    assert [s["title"] for s in reused.json()] == [s["title"] for s in generated.json()]
+    assert {s["todo_id"] for s in reused.json()} == {second}
+    assert fake_llm.calls == 1
+    assert metrics.get("subtask_cache_hits") == 1
+    assert metrics.get("subtask_cache_llm_calls_avoided") == 1
+    assert db_session.query(SubtaskSuggestion.hit_count).scalar() == 1
+
+
+def test_index_is_loaded_from_the_table(client, db_session, fake_llm):
+    """Test that suggestions stored by an earlier process are reused"""
+    db_session.add(SubtaskSuggestion(
+        model="fake", title="Renew passport", description="", max_subtasks=3, subtasks=SUBTASKS, hit_count=0
+    ))
+    db_session.commit()
+    todo_id = client.post("/api/v1/todos/", json={"title": "renew my passport"}).json()["id"]
+
+    response = client.post(f"/api/v1/todos/{todo_id}/generate", json={"todo_id": todo_id, "max_subtasks": 3})
+
+    assert [s["title"] for s in response.json()] == ["Step 1", "Step 2", "Step 3"]
+    assert fake_llm.calls == 0
+    assert subtask_index.loaded
+
+
+def test_disabled_cache_always_calls_the_model(client, monkeypatch, fake_llm):
+    """Test that SUBTASK_CACHE_ENABLED=False skips lookups and storage"""
+    monkeypatch.setattr(settings, "SUBTASK_CACHE_ENABLED", False)
+    todo_id = client.post("/api/v1/todos/", json={"title": "Plan team offsite"}).json()["id"]
+
+    for _ in range(2):
+        client.post(f"/api/v1/todos/{todo_id}/generate", json={"todo_id": todo_id, "max_subtasks": 3})
+
+    assert fake_llm.calls == 2
+    assert len(subtask_index) == 0
@@ -0,0 +1,77 @@
+"""
+Tests for streaming subtask generation over Server-Sent Events
+"""
+
+import json
+
+import pytest
+
+from app.services.ai_service import ai_service
+
+
+# Answer every AI call with the offline fake
+pytestmark = pytest.mark.usefixtures("fake_llm")
+
+
+def read_events(response):
+    """Parse an SSE body into (event, data) pairs"""
+    events = []
+    for block in response.text.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_stream_emits_each_subtask_then_summary(client):
+    """Test that subtasks arrive as events, are saved, and a summary closes the stream"""
+    todo = client.post("/api/v1/todos/", json={"title": "Plan party"}).json()
+
+    response = client.post(f"/api/v1/todos/{todo['id']}/generate/stream", json={
+        "todo_id": todo["id"], "max_subtasks": 3
+    })
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = read_events(response)
+    assert [event for event, _ in events] == ["subtask", "subtask", "subtask", "done"]
+    assert [data["order_index"] for _, data in events[:3]] == [0, 1, 2]
+    assert events[-1][1]["count"] == 3
+    assert events[-1][1]["first_subtask_ms"] <= events[-1][1]["total_ms"]
+    saved = client.get(f"/api/v1/todos/{todo['id']}/subtasks").json()
+    assert [subtask["id"] for subtask in saved] == [data["id"] for _, data in events[:3]]
+
+
+def test_stream_falls_back_without_streaming_support(client):
+    """Test that a service without stream_subtasks still streams its answer"""
+    assert not hasattr(ai_service, "stream_subtasks")
+    todo = client.post("/api/v1/todos/", json={"title": "Plan party"}).json()
+
+    response = client.post(f"/api/v1/todos/{todo['id']}/generate/stream", json={
+        "todo_id": todo["id"], "max_subtasks": 2
+    })
+
+    assert [event for event, _ in read_events(response)] == ["subtask", "subtask", "done"]
+
+
+def test_stream_reports_errors_after_partial_output(client, monkeypatch):
+    """Test that a failure mid-stream keeps saved subtasks and ends with an error event"""
+    async def flaky(todo_title, todo_description, max_subtasks):
+        yield {"title": "First step", "description": ""}
+        raise RuntimeError("connection reset")
+
+    monkeypatch.setattr(ai_service, "stream_subtasks", flaky, raising=False)
+    todo = client.post("/api/v1/todos/", json={"title": "Plan party"}).json()
+
+    response = client.post(f"/api/v1/todos/{todo['id']}/generate/stream", json={"todo_id": todo["id"]})
+
+    events = read_events(response)
+    assert [event for event, _ in events] == ["subtask", "error"]
+    assert "connection reset" in events[1][1]["detail"]
+    assert len(client.get(f"/api/v1/todos/{todo['id']}/subtasks").json()) == 1
+
+
+def test_stream_unknown_todo_returns_404(client):
+    """Test that a missing todo fails before the stream starts"""
+    response = client.post("/api/v1/todos/999/generate/stream", json={"todo_id": 999})
+
+    assert response.status_code == 404
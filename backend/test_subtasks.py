@@ -0,0 +1,55 @@
+"""
+Tests for the subtask endpoints
+"""
+
+from app.models.subtask import Subtask
+
+
+def create_todo_with_subtasks(client, db_session, count):
+    """Create a todo with `count` subtasks and return (todo_id, subtask_ids)"""
+    todo_id = client.post("/api/v1/todos/", json={"title": "Plan offsite"}).json()["id"]
+    subtasks = [Subtask(todo_id=todo_id, title=f"Step {i}", order_index=i) for i in range(count)]
+    db_session.add_all(subtasks)
+    db_session.commit()
+    return todo_id, [subtask.id for subtask in subtasks]
+
+
+def test_bulk_reorder_and_complete(client, db_session):
+    """Test that patches apply together and come back in the new order"""
+    todo_id, ids = create_todo_with_subtasks(client, db_session, 3)
+
+    response = client.patch(f"/api/v1/todos/{todo_id}/subtasks", json={"items": [
+        {"id": ids[0], "order_index": 2},
+        {"id": ids[2], "order_index": 0, "completed": True},
+    ]})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [subtask["id"] for subtask in body] == [ids[2], ids[1], ids[0]]
+    assert [subtask["completed"] for subtask in body] == [True, False, False]
+
+
+def test_bulk_complete_all(client, db_session):
+    """Test that complete_all marks every subtask of the todo completed"""
+    todo_id, _ = create_todo_with_subtasks(client, db_session, 3)
+
+    response = client.patch(f"/api/v1/todos/{todo_id}/subtasks", json={"complete_all": True})
+
+    assert response.status_code == 200
+    assert all(subtask["completed"] for subtask in response.json())
+
+
+def test_bulk_rejects_foreign_subtasks(client, db_session):
+    """Test that patching another todo's subtask fails without applying anything"""
+    todo_id, ids = create_todo_with_subtasks(client, db_session, 2)
+    other_todo_id, other_ids = create_todo_with_subtasks(client, db_session, 1)
+
+    response = client.patch(f"/api/v1/todos/{todo_id}/subtasks", json={"items": [
+        {"id": ids[0], "completed": True},
+        {"id": other_ids[0], "completed": True},
+    ]})
+
+    assert response.status_code == 400
+    subtasks = client.get(f"/api/v1/todos/{todo_id}/subtasks").json()
+    assert not any(subtask["completed"] for subtask in subtasks)
+    assert client.patch("/api/v1/todos/999/subtasks", json={"complete_all": True}).status_code == 404
@@ -0,0 +1,247 @@
+"""
+Tests for the todo list and detail endpoints
+"""
+
+from sqlalchemy import text
+
+BASE_URL = "/api/v1/todos"
+
+
+def create_todos(client, count):
+    """Create `count` todos and return their ids"""
+    return [
+        client.post(f"{BASE_URL}/", json={"title": f"Todo {i}"}).json()["id"]
+        for i in range(count)
+    ]
+
+
+def test_offset_pagination_still_returns_list(client):
+    """Test that skip/limit keep returning a plain list"""
+    ids = create_todos(client, 5)
+
+    response = client.get(f"{BASE_URL}/", params={"skip": 1, "limit": 2})
+
+    assert response.status_code == 200
+    assert [todo["id"] for todo in response.json()] == ids[1:3]
+
+
+def test_cursor_pagination_walks_all_pages(client, engine):
+    """Test that following next_cursor visits every todo exactly once"""
+    ids = create_todos(client, 7)
+    # Give several rows the same created_at to exercise the id tie-breaker
+    with engine.begin() as conn:
+        conn.execute(text("UPDATE todos SET created_at = '2024-01-01 10:00:00' WHERE id <= 4"))
+
+    seen, cursor = [], ""
+    while cursor is not None:
+        response = client.get(f"{BASE_URL}/", params={"cursor": cursor, "limit": 3})
+        assert response.status_code == 200
+        page = response.json()
+        assert len(page["items"]) <= 3
+        seen.extend(todo["id"] for todo in page["items"])
+        cursor = page["next_cursor"]
+
+    assert seen == ids
+
+
+def test_invalid_cursor_is_rejected(client):
+    """Test that a malformed cursor returns 400"""
+    response = client.get(f"{BASE_URL}/", params={"cursor": "not-a-cursor"})
+
+    assert response.status_code == 400
+
+
+def test_sparse_fields_and_include(client):
+    """Test that include/fields restrict relations and columns"""
+    todo_id = create_todos(client, 1)[0]
+
+    response = client.get(f"{BASE_URL}/", params={"fields": "title,completed", "include": ""})
+
+    assert response.status_code == 200
+    assert response.json() == [{"id": todo_id, "title": "Todo 0", "completed": False}]
+
+
+def test_include_single_relation_on_detail(client):
+    """Test that a detail request can load just one relation"""
+    todo_id = create_todos(client, 1)[0]
+
+    response = client.get(f"{BASE_URL}/{todo_id}", params={"include": "subtasks"})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["subtasks"] == []
+    assert "translations" not in body
+    assert body["title"] == "Todo 0"
+
+
+def test_unknown_field_is_rejected(client):
+    """Test that unknown fields return 400"""
+    response = client.get(f"{BASE_URL}/", params={"fields": "title,secret"})
+
+    assert response.status_code == 400
+
+
+def test_bulk_create_update_toggle_delete(client):
+    """Test the bulk endpoints end to end with per-item statuses"""
+    response = client.post(f"{BASE_URL}/bulk", json={"items": [{"title": f"Bulk {i}"} for i in range(3)]})
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [result["status"] for result in results] == ["created"] * 3
+    ids = [result["id"] for result in results]
+    assert [result["todo"]["title"] for result in results] == ["Bulk 0", "Bulk 1", "Bulk 2"]
+
+    response = client.patch(f"{BASE_URL}/bulk", json={"items": [
+        {"id": ids[0], "title": "Renamed"},
+        {"id": ids[1], "completed": True},
+        {"id": 999, "title": "Missing"},
+    ]})
+    results = response.json()["results"]
+    assert [result["status"] for result in results] == ["updated", "updated", "not_found"]
+    assert results[0]["todo"]["title"] == "Renamed"
+    assert results[1]["todo"]["completed"] is True
+
+    response = client.patch(f"{BASE_URL}/bulk/toggle", json={"ids": [ids[1], ids[2]]})
+    assert [result["todo"]["completed"] for result in response.json()["results"]] == [False, True]
+
+    response = client.post(f"{BASE_URL}/bulk/delete", json={"ids": [ids[0], 999]})
+    assert [result["status"] for result in response.json()["results"]] == ["deleted", "not_found"]
+    assert [todo["id"] for todo in client.get(f"{BASE_URL}/").json()] == ids[1:]
+
+
+def test_bulk_create_returns_request_order(client, engine):
+    """Test that a bulk create is one INSERT and answers in request order"""
+    from test_query_count import count_queries
+
+    with count_queries(engine) as statements:
+        response = client.post(f"{BASE_URL}/bulk", json={"items": [{"title": f"Bulk {i}"} for i in range(50)]})
+
+    assert [result["todo"]["title"] for result in response.json()["results"]] == [f"Bulk {i}" for i in range(50)]
+    assert len(statements) == 1
+    assert statements[0].startswith("INSERT INTO todos")
+
+
+def test_filter_by_completed_and_created_range(client, engine):
+    """Test that completed and date range filters narrow the list"""
+    ids = create_todos(client, 4)
+    client.patch(f"{BASE_URL}/{ids[0]}/toggle")
+    with engine.begin() as conn:
+        conn.execute(text("UPDATE todos SET created_at = '2024-01-01 10:00:00' WHERE id IN (1, 2)"))
+        conn.execute(text("UPDATE todos SET created_at = '2024-03-01 10:00:00' WHERE id IN (3, 4)"))
+
+    completed = client.get(f"{BASE_URL}/", params={"completed": "true"}).json()
+    january = client.get(f"{BASE_URL}/", params={
+        "created_after": "2024-01-01T10:00:00", "created_before": "2024-02-01T00:00:00Z"
+    }).json()
+    open_in_january = client.get(f"{BASE_URL}/", params={
+        "completed": "false", "created_before": "2024-02-01T00:00:00"
+    }).json()
+
+    assert [todo["id"] for todo in completed] == [ids[0]]
+    assert [todo["id"] for todo in january] == ids[:2]
+    assert [todo["id"] for todo in open_in_january] == [ids[1]]
+
+
+def test_sort_by_title_descending(client):
+    """Test that sort orders the list and breaks ties by id"""
+    for title in ["banana", "apple", "cherry", "apple"]:
+        client.post(f"{BASE_URL}/", json={"title": title})
+
+    response = client.get(f"{BASE_URL}/", params={"sort": "-title"})
+
+    assert [todo["title"] for todo in response.json()] == ["cherry", "banana", "apple", "apple"]
+    assert [todo["id"] for todo in response.json()][2:] == [4, 2]
+
+
+def test_cursor_pagination_newest_first(client, engine):
+    """Test keyset pagination with sort=-created_at"""
+    ids = create_todos(client, 5)
+    with engine.begin() as conn:
+        conn.execute(text("UPDATE todos SET created_at = '2024-01-01 10:00:00' WHERE id <= 3"))
+
+    seen, cursor = [], ""
+    while cursor is not None:
+        page = client.get(f"{BASE_URL}/", params={"cursor": cursor, "limit": 2, "sort": "-created_at"}).json()
+        seen.extend(todo["id"] for todo in page["items"])
+        cursor = page["next_cursor"]
+
+    assert seen == [ids[4], ids[3], ids[2], ids[1], ids[0]]
+
+
+def test_cursor_pagination_rejects_other_sorts(client):
+    """Test that cursor mode only accepts created_at ordering"""
+    response = client.get(f"{BASE_URL}/", params={"cursor": "", "sort": "title"})
+
+    assert response.status_code == 400
+
+
+def test_search_matches_prefixes_and_subtasks(client, engine):
+    """Test that q matches title/description prefixes and subtask titles"""
+    groceries = client.post(f"{BASE_URL}/", json={"title": "Groceries", "description": "Buy milk and eggs"}).json()
+    trip = client.post(f"{BASE_URL}/", json={"title": "Plan trip"}).json()
+    with engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO subtasks (todo_id, title, completed, order_index) VALUES (:id, 'Book flights', 0, 0)"
+        ), {"id": trip["id"]})
+
+    def search(q):
+        return [todo["id"] for todo in client.get(f"{BASE_URL}/", params={"q": q}).json()]
+
+    assert search("gro") == [groceries["id"]]
+    assert search("milk eggs") == [groceries["id"]]
+    assert search("milk trip") == []
+    assert search("flight") == [trip["id"]]
+    assert search('"*') == [groceries["id"], trip["id"]]
+
+
+def test_search_follows_updates_and_deletes(client, engine):
+    """Test that the search index tracks edits to todos and subtasks"""
+    todo = client.post(f"{BASE_URL}/", json={"title": "Old name"}).json()
+    with engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO subtasks (todo_id, title, completed, order_index) VALUES (:id, 'Call plumber', 0, 0)"
+        ), {"id": todo["id"]})
+
+    client.put(f"{BASE_URL}/{todo['id']}", json={"title": "New name"})
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM subtasks"))
+
+    assert client.get(f"{BASE_URL}/", params={"q": "old"}).json() == []
+    assert client.get(f"{BASE_URL}/", params={"q": "plumber"}).json() == []
+    assert [t["id"] for t in client.get(f"{BASE_URL}/", params={"q": "new"}).json()] == [todo["id"]]
+
+    client.delete(f"{BASE_URL}/{todo['id']}")
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT count(*) FROM todo_search")).scalar() == 0
+
+
+def test_search_indexes_todos_from_before_the_search_table(tmp_path):
+    """Test that create_all on an existing database indexes the todos already there"""
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+    from app.core.database import Base
+    from app.models import todo, subtask, search, translation_cache, job, idempotency, subtask_suggestion, table_version  # noqa: F401 - register models
+    from app.schemas.todo import TodoFilters, TodoUpdate
+    from app.services.todo_service import TodoService
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'existing.db'}")
+    # A database from before search existed: the tables without the search setup
+    for name in ("todos", "subtasks"):
+        Base.metadata.tables[name].create(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO todos (id, title, completed) VALUES (1, 'Buy groceries', 0), (2, 'Old name', 0)"))
+        conn.execute(text("INSERT INTO subtasks (todo_id, title, completed, order_index) VALUES (1, 'Book flights', 0, 0)"))
+
+    Base.metadata.create_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    with Session(engine) as db:
+        service = TodoService(db)
+        service.update_todo(2, TodoUpdate(title="New name"))
+
+        def search(q):
+            return [t.id for t in service.get_todos(filters=TodoFilters(q=q))]
+
+        assert (search("groceries"), search("flights"), search("new"), search("old")) == ([1], [1], [2], [])
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT count(*) FROM todo_search")).scalar() == 2
+    engine.dispose()
@@ -0,0 +1,120 @@
+"""
+Tests for translating a todo into several languages in one request
+"""
+
+import asyncio
+import sys
+import types
+
+import pytest
+
+
+@pytest.fixture
+def translator(monkeypatch):
+    """Install a fake translation service that tracks concurrent calls"""
+    state = types.SimpleNamespace(calls=[], in_flight=0, max_in_flight=0, on_call=None)
+
+    async def translate_text(text, target_language):
+        state.calls.append((text, target_language))
+        if state.on_call is not None:
+            state.on_call(text, target_language)
+        state.in_flight += 1
+        state.max_in_flight = max(state.max_in_flight, state.in_flight)
+        await asyncio.sleep(0.01)
+        state.in_flight -= 1
+        return f"{text} ({target_language})"
+
+    state.service = types.SimpleNamespace(translate_text=translate_text)
+    module = types.ModuleType("app.services.translation_service")
+    module.translation_service = state.service
+    monkeypatch.setitem(sys.modules, "app.services.translation_service", module)
+    return state
+
+
+def test_languages_are_translated_concurrently(client, translator):
+    """Test that every language comes back and calls overlap"""
+    todo = client.post("/api/v1/todos/", json={"title": "Buy milk", "description": "Semi-skimmed"}).json()
+
+    response = client.post(f"/api/v1/todos/{todo['id']}/translate/batch", json={
+        "target_languages": ["French", "German", "Spanish", "French"]
+    })
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [translation["language"] for translation in body] == ["French", "German", "Spanish"]
+    assert body[1]["translated_description"] == "Semi-skimmed (German)"
+    assert len(translator.calls) == 6
+    assert translator.max_in_flight > 1
+    stored = client.get(f"/api/v1/todos/{todo['id']}/translations").json()
+    assert len(stored) == 3
+
+
+def test_stored_languages_are_not_translated_again(client, translator):
+    """Test that only missing languages reach the translation service"""
+    todo = client.post("/api/v1/todos/", json={"title": "Buy milk"}).json()
+    client.post(f"/api/v1/todos/{todo['id']}/translate", json={"target_language": "French"})
+    translator.calls.clear()
+
+    response = client.post(f"/api/v1/todos/{todo['id']}/translate/batch", json={
+        "target_languages": ["French", "Italian"]
+    })
+
+    assert [translation["language"] for translation in response.json()] == ["French", "Italian"]
+    assert translator.calls == [("Buy milk", "Italian")]
+
+
+def test_languages_stored_concurrently_do_not_drop_the_rest(client, db_session, translator):
+    """Test that a language another request stored mid-translation keeps the others"""
+    from app.models.subtask import Translation
+
+    todo = client.post("/api/v1/todos/", json={"title": "Buy milk"}).json()
+
+    def store_german_first(text, target_language):
+        if target_language == "German" and not db_session.query(Translation).count():
+            db_session.add(Translation(todo_id=todo["id"], language="German", translated_title="Milch kaufen"))
+            db_session.commit()
+
+    translator.on_call = store_german_first
+
+    response = client.post(f"/api/v1/todos/{todo['id']}/translate/batch", json={
+        "target_languages": ["French", "German", "Spanish"]
+    })
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [translation["language"] for translation in body] == ["French", "German", "Spanish"]
+    assert body[1]["translated_title"] == "Milch kaufen"
+    assert db_session.query(Translation).count() == 3
+
+
+def test_multi_language_prompt_is_used_when_available(client, translator):
+    """Test one call per text when the service returns several languages"""
+    multi_calls = []
+
+    async def translate_text_multi(text, target_languages):
+        multi_calls.append((text, tuple(target_languages)))
+        # Leave one language out to exercise the single-call fallback
+        return {language: f"{text} [{language}]" for language in target_languages[:-1]}
+
+    translator.service.translate_text_multi = translate_text_multi
+    todo = client.post("/api/v1/todos/", json={"title": "Buy milk", "description": "Today"}).json()
+
+    response = client.post(f"/api/v1/todos/{todo['id']}/translate/batch", json={
+        "target_languages": ["French", "German", "Dutch"]
+    })
+
+    body = response.json()
+    assert multi_calls == [
+        ("Buy milk", ("French", "German", "Dutch")),
+        ("Today", ("French", "German", "Dutch")),
+    ]
+    assert body[0]["translated_title"] == "Buy milk [French]"
+    assert body[2]["translated_title"] == "Buy milk (Dutch)"
+    assert sorted(translator.calls) == [("Buy milk", "Dutch"), ("Today", "Dutch")]
+
+
+def test_missing_todo_returns_404(client, translator):
+    """Test the batch endpoint on an unknown todo"""
+    response = client.post("/api/v1/todos/999/translate/batch", json={"target_languages": ["French"]})
+
+    assert response.status_code == 404
@@ -0,0 +1,108 @@
+"""
+Tests for micro-batching concurrent translations
+"""
+
+import asyncio
+import json
+
+from app.services.llm_client import FakeProvider, LLMClient
+from app.services.translation_service import TranslationService
+
+
+def tagging_responder(broken=False):
+    """Translate by tagging with the language named in the system prompt"""
+    def respond(messages):
+        system, user = messages[0]["content"], messages[-1]["content"]
+        language = system.split(" into ")[1].split(".")[0]
+        if "JSON array" in system:
+            if broken:
+                return "Sorry, I can only translate one text at a time."
+            return json.dumps([f"[{language}] {text}" for text in json.loads(user)])
+        return f"[{language}] {user}"
+    return respond
+
+
+def make_service(responder, **options):
+    provider = FakeProvider(responder)
+    client = LLMClient(provider, requests_per_minute=0, tokens_per_minute=0)
+    options.setdefault("batch_window_ms", 20)
+    return TranslationService(client, **options), provider
+
+
+def test_concurrent_calls_share_one_prompt():
+    """Test that same-language calls are batched and each caller gets its own text"""
+    service, provider = make_service(tagging_responder())
+
+    async def scenario():
+        return await asyncio.gather(
+            service.translate_text("Buy milk", "French"),
+            service.translate_text("Call mum", "French"),
+            service.translate_text("Buy milk", "French"),
+            service.translate_text("Buy milk", "German"),
+        )
+
+    results = asyncio.run(scenario())
+
+    assert results == ["[French] Buy milk", "[French] Call mum", "[French] Buy milk", "[German] Buy milk"]
+    assert provider.calls == 2  # one French batch, one German single call
+
+
+def test_unparseable_batch_falls_back_to_single_calls():
+    """Test that a batch answer that cannot be read is retried text by text"""
+    service, provider = make_service(tagging_responder(broken=True))
+
+    async def scenario():
+        return await asyncio.gather(
+            service.translate_text("Buy milk", "French"),
+            service.translate_text("Call mum", "French"),
+        )
+
+    assert asyncio.run(scenario()) == ["[French] Buy milk", "[French] Call mum"]
+    assert provider.calls == 3
+
+
+def test_full_batch_is_sent_without_waiting():
+    """Test that reaching max_items flushes before the window ends"""
+    service, provider = make_service(tagging_responder(), batch_window_ms=10000, batch_max_items=2)
+
+    async def scenario():
+        return await asyncio.wait_for(asyncio.gather(
+            service.translate_text("Buy milk", "French"),
+            service.translate_text("Call mum", "French"),
+        ), timeout=1)
+
+    assert len(asyncio.run(scenario())) == 2
+    assert provider.calls == 1
+
+
+def test_batch_errors_reach_every_caller():
+    """Test that a failed batch call fails each waiting caller"""
+    provider = FakeProvider(tagging_responder(), failures=[400])
+    service = TranslationService(LLMClient(provider, requests_per_minute=0, tokens_per_minute=0), batch_window_ms=20)
+
+    async def scenario():
+        return await asyncio.gather(
+            service.translate_text("Buy milk", "French"),
+            service.translate_text("Call mum", "French"),
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(scenario())
+
+    assert all(isinstance(result, Exception) for result in results)
+
+
+def test_batching_can_be_disabled():
+    """Test that a zero window sends every call on its own"""
+    service, provider = make_service(tagging_responder(), batch_window_ms=0)
+
+    async def scenario():
+        return await asyncio.gather(
+            service.translate_text("Buy milk", "French"),
+            service.translate_text("Call mum", "French"),
+        )
+
+    asyncio.run(scenario())
+
+    assert service.batcher is None
+    assert provider.calls == 2
@@ -0,0 +1,105 @@
+"""
+Tests for the shared translation cache
+"""
+
+import sys
+import types
+
+import pytest
+from sqlalchemy import text
+
+from app.core.metrics import metrics
+from app.models.translation_cache import TranslationCacheEntry
+from app.services.translation_cache import TranslationCache
+
+
+@pytest.fixture
+def llm_calls(monkeypatch):
+    """Replace the translation service with one that records its calls"""
+    calls = []
+
+    async def translate_text(text, target_language):
+        calls.append((text, target_language))
+        return f"{text} ({target_language})"
+
+    module = types.ModuleType("app.services.translation_service")
+    module.translation_service = types.SimpleNamespace(translate_text=translate_text)
+    monkeypatch.setitem(sys.modules, "app.services.translation_service", module)
+    metrics.reset()
+    return calls
+
+
+def test_lookup_normalizes_text_and_language(db_session):
+    """Test that whitespace and language case do not split cache entries"""
+    cache = TranslationCache(db_session, model="test-model")
+    cache.put("Buy  groceries", "French", "Faire les courses")
+
+    assert cache.get(" Buy groceries\n", "french") == "Faire les courses"
+    assert cache.get("Buy groceries", "Spanish") is None
+    assert TranslationCache(db_session, model="other-model").get("Buy groceries", "French") is None
+    assert db_session.query(TranslationCacheEntry).one().hit_count == 0
+
+    cache.flush_usage()
+    assert db_session.query(TranslationCacheEntry).one().hit_count == 1
+
+
+def test_least_recently_used_entries_are_evicted(db_session):
+    """Test that entries beyond max_entries go in last-used order"""
+    cache = TranslationCache(db_session, model="test-model", max_entries=2)
+    cache.put("one", "French", "un")
+    cache.put("two", "French", "deux")
+    db_session.execute(text("UPDATE translation_cache SET last_used_at = '2024-01-01 00:00:00'"))
+    cache.get("one", "French")
+
+    cache.put("three", "French", "trois")
+
+    assert cache.get("two", "French") is None
+    assert cache.get("one", "French") == "un"
+    assert cache.get("three", "French") == "trois"
+
+
+def test_expired_entries_are_dropped(db_session):
+    """Test that entries older than the TTL count as misses"""
+    cache = TranslationCache(db_session, model="test-model", ttl_seconds=60)
+    cache.put("Buy groceries", "French", "Faire les courses")
+    db_session.execute(text("UPDATE translation_cache SET created_at = '2024-01-01 00:00:00'"))
+
+    assert cache.get("Buy groceries", "French") is None
+    cache.flush_usage()
+    assert db_session.query(TranslationCacheEntry).count() == 0
+
+
+def test_lookups_are_one_read_only_query(db_session, engine):
+    """Test that looking up many pairs is a single SELECT and hits are written with the next put"""
+    from test_query_count import count_queries
+
+    cache = TranslationCache(db_session, model="test-model")
+    cache.put_many([("one", "French", "un"), ("two", "French", "deux"), ("one", "Spanish", "uno")])
+    db_session.commit()
+
+    with count_queries(engine) as statements:
+        found = cache.get_many(["one", "two", "three"], ["French", "Spanish"])
+    assert found == {("one", "French"): "un", ("two", "French"): "deux", ("one", "Spanish"): "uno"}
+    assert len(statements) == 1 and statements[0].startswith("SELECT")
+
+    cache.put("three", "French", "trois")
+    hits = dict(db_session.query(TranslationCacheEntry.translated_text, TranslationCacheEntry.hit_count))
+    assert hits == {"un": 1, "deux": 1, "uno": 1, "trois": 0}
+
+
+def test_identical_titles_are_translated_once(client, llm_calls):
+    """Test that todos and free text share cached translations"""
+    first = client.post("/api/v1/todos/", json={"title": "Buy groceries"}).json()
+    second = client.post("/api/v1/todos/", json={"title": "Buy  groceries"}).json()
+
+    for todo in (first, second):
+        response = client.post(f"/api/v1/todos/{todo['id']}/translate", json={"target_language": "French"})
+        assert response.status_code == 200
+        assert response.json()["translated_title"] == "Buy groceries (French)"
+    response = client.post("/api/v1/todos/translate", json={"text": "Buy groceries", "target_language": "French"})
+
+    assert response.json()["translated_text"] == "Buy groceries (French)"
+    assert llm_calls == [("Buy groceries", "French")]
+    counters = client.get("/metrics").json()
+    assert counters["translation_cache_hits"] == 2
+    assert counters["translation_cache_misses"] == 1
@@ -0,0 +1,142 @@
+"""
+Tests for background pre-translation and stale translation invalidation
+"""
+
+import asyncio
+import time
+
+from sqlalchemy.orm import sessionmaker
+
+from app.core.admission import admission_controllers
+from app.core.config import settings
+from app.models.subtask import Translation
+from app.models.todo import Todo
+from app.schemas.todo import TodoBulkUpdateItem, TodoUpdate
+from app.services.todo_service import TodoService
+from app.services.translation_warmer import TranslationWarmer, ai_budget_busy
+
+
+def add_translated_todo(db_session, todo_id=1):
+    db_session.add(Todo(id=todo_id, title="Buy milk", description="Two litres"))
+    db_session.add(Translation(todo_id=todo_id, language="es", translated_title="Comprar leche"))
+    db_session.commit()
+
+
+def translation_count(db_session, todo_id=1):
+    db_session.expire_all()
+    return db_session.query(Translation).filter(Translation.todo_id == todo_id).count()
+
+
+def test_text_change_invalidates_translations(db_session):
+    """Test that editing the title or description drops the todo's translations"""
+    add_translated_todo(db_session)
+    service = TodoService(db_session)
+
+    service.update_todo(1, TodoUpdate(completed=True))
+    service.update_todo(1, TodoUpdate(title="Buy milk"))
+    assert translation_count(db_session) == 1
+
+    service.update_todo(1, TodoUpdate(description="One litre"))
+    assert translation_count(db_session) == 0
+
+
+def test_bulk_text_change_invalidates_translations(db_session):
+    """Test that set-based bulk updates invalidate translations too"""
+    add_translated_todo(db_session, 1)
+    add_translated_todo(db_session, 2)
+
+    TodoService(db_session).bulk_update_todos([
+        TodoBulkUpdateItem(id=1, title="Buy oat milk"),
+        TodoBulkUpdateItem(id=2, completed=True),
+    ])
+
+    assert (translation_count(db_session, 1), translation_count(db_session, 2)) == (0, 1)
+
+
+def test_warmer_waits_while_the_ai_budget_is_busy(engine, fake_llm):
+    """Test that queued todos are translated only once user requests leave room"""
+    TestSession = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+    with TestSession() as db:
+        db.add(Todo(id=1, title="Buy milk"))
+        db.commit()
+    state = {"busy": True}
+    warmer = TranslationWarmer(TestSession, languages=["es", "fr"], backoff_seconds=0.01, busy=lambda: state["busy"])
+
+    async def scenario():
+        await warmer.start()
+        warmer.enqueue(1)
+        warmer.enqueue(1)
+        await asyncio.sleep(0.05)
+        calls_while_busy = fake_llm.calls
+        state["busy"] = False
+        await warmer.join()
+        await warmer.stop()
+        return calls_while_busy
+
+    assert asyncio.run(scenario()) == 0
+    with TestSession() as db:
+        languages = {t.language: t.translated_title for t in db.query(Translation).filter(Translation.todo_id == 1)}
+    assert languages == {"es": "[es] Buy milk", "fr": "[fr] Buy milk"}
+
+
+def test_edit_during_translation_is_not_stored_stale(engine, monkeypatch, fake_llm):
+    """Test that a todo edited while being translated gets translations of the new text"""
+    TestSession = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+    with TestSession() as db:
+        db.add(Todo(id=1, title="Buy milk"))
+        db.commit()
+    answer = fake_llm.responder
+
+    def edit_then_answer(messages):
+        if messages[-1]["content"] == "Buy milk":
+            # The user fixes the title while the old one is being translated
+            with TestSession() as db:
+                TodoService(db).update_todo(1, TodoUpdate(title="Buy oat milk"))
+        return answer(messages)
+
+    monkeypatch.setattr(fake_llm, "responder", edit_then_answer)
+    warmer = TranslationWarmer(TestSession, languages=["es"], busy=lambda: False)
+
+    async def scenario():
+        await warmer.start()
+        warmer.enqueue(1)
+        # Let the enqueued id reach the queue before waiting on it
+        await asyncio.sleep(0)
+        await warmer.join()
+        await warmer.stop()
+
+    asyncio.run(scenario())
+    with TestSession() as db:
+        titles = [t.translated_title for t in db.query(Translation).filter(Translation.todo_id == 1)]
+    assert titles == ["[es] Buy oat milk"]
+
+
+def test_ai_budget_is_busy_when_endpoints_are_loaded(monkeypatch):
+    """Test the admission-based part of the busy check"""
+    controller = admission_controllers["translate"]
+    monkeypatch.setattr(controller, "active", 0)
+    assert not ai_budget_busy(max_load=0.5)
+
+    monkeypatch.setattr(controller, "active", controller.concurrency)
+    assert ai_budget_busy(max_load=0.5)
+
+
+def test_created_and_edited_todos_are_translated(client, db_session, monkeypatch, fake_llm):
+    """Test the endpoints queue new and edited todos and stale rows are rebuilt"""
+    monkeypatch.setattr(settings, "TRANSLATION_WARMER_LANGUAGES", ["es"])
+
+    def wait_for_translation(todo_id, title):
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            db_session.expire_all()
+            translation = db_session.query(Translation).filter(Translation.todo_id == todo_id).first()
+            if translation is not None and translation.translated_title == title:
+                return True
+            time.sleep(0.01)
+        return False
+
+    todo_id = client.post("/api/v1/todos/", json={"title": "Buy milk"}).json()["id"]
+    assert wait_for_translation(todo_id, "[es] Buy milk")
+
+    client.put(f"/api/v1/todos/{todo_id}", json={"title": "Buy bread"})
+    assert wait_for_translation(todo_id, "[es] Buy bread")
@@ -0,0 +1,98 @@
+"""
+Tests for the group-commit write queue
+"""
+
+import threading
+
+import pytest
+from sqlalchemy import create_engine, event, func
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base, apply_sqlite_pragmas
+from app.core.write_queue import WriteQueue, write_queue
+from app.models.todo import Todo
+from app.schemas.todo import TodoCreate
+from app.services.todo_service import TodoService
+
+
+@pytest.fixture
+def file_session_factory(tmp_path):
+    """Session factory for a WAL-mode SQLite file database"""
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'writes.db'}", connect_args={"check_same_thread": False}
+    )
+    apply_sqlite_pragmas(engine)
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+    engine.dispose()
+
+
+def test_concurrent_writes_share_commits(file_session_factory):
+    """Test that concurrent operations are committed in fewer transactions"""
+    commits = []
+    engine = file_session_factory.kw["bind"]
+    event.listen(engine, "commit", lambda conn: commits.append(1))
+    queue = WriteQueue(file_session_factory, max_batch_size=16, max_delay_ms=20)
+    queue.start()
+
+    def create(i):
+        def operation(session):
+            todo = Todo(title=f"Todo {i}")
+            session.add(todo)
+            session.flush()
+            return todo.id
+        return queue.run(operation)
+
+    threads = [threading.Thread(target=create, args=(i,)) for i in range(32)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    queue.stop()
+
+    with file_session_factory() as session:
+        assert session.query(func.count(Todo.id)).scalar() == 32
+    assert queue.writes == 32
+    assert len(commits) == queue.batches < 32
+
+
+def test_failing_operation_only_fails_its_caller(file_session_factory):
+    """Test that an error rolls back only its own savepoint"""
+    queue = WriteQueue(file_session_factory, max_delay_ms=50)
+    queue.start()
+
+    def add(title):
+        def operation(session):
+            session.add(Todo(title=title))
+            session.flush()
+            return title
+        return operation
+
+    def fail(session):
+        add("doomed")(session)
+        raise ValueError("boom")
+
+    futures = [queue.submit(add("first")), queue.submit(fail), queue.submit(add("second"))]
+    queue.stop()
+
+    assert futures[0].result() == "first"
+    with pytest.raises(ValueError):
+        futures[1].result()
+    assert futures[2].result() == "second"
+    with file_session_factory() as session:
+        assert sorted(title for (title,) in session.query(Todo.title)) == ["first", "second"]
+
+
+def test_todo_service_routes_writes_through_queue(file_session_factory, db_session, monkeypatch):
+    """Test that TodoService writes go through the shared queue when it runs"""
+    monkeypatch.setattr(write_queue, "session_factory", file_session_factory)
+    write_queue.start()
+    try:
+        todo = TodoService(db_session).create_todo(TodoCreate(title="Queued"))
+    finally:
+        write_queue.stop()
+
+    with file_session_factory() as session:
+        assert session.get(Todo, todo.id).title == "Queued"
+    # The request's own session was not used for the write
+    assert db_session.get(Todo, todo.id) is None
@@ -17,12 +17,89 @@ export const subtaskApi = {
     return response.data;
   },
 
+  // Generate AI subtasks for many todos at once; one result per todo
+  // (status ok, not_found or failed)
+  generateSubtasksBatch: async (todoIds, maxSubtasks = 5) => {
+    const response = await httpClient.post(
+      API_ENDPOINTS.GENERATE_SUBTASKS_BATCH,
+      { todo_ids: todoIds, max_subtasks: maxSubtasks }
+    );
+    return response.data;
+  },
+
+  // Queue AI subtask generation; returns the job to poll with getJob
+  generateSubtasksJob: async (todoId, maxSubtasks = 5) => {
+    const response = await httpClient.post(
+      API_ENDPOINTS.GENERATE_SUBTASKS_JOB(todoId),
+      { todo_id: todoId, max_subtasks: maxSubtasks }
+    );
+    return response.data;
+  },
+
+  // Generate AI subtasks as a stream; onSubtask runs for each saved subtask
+  // and the promise resolves with the closing summary. Uses fetch because
+  // axios cannot read a response body while it is still arriving.
+  streamSubtasks: async (todoId, maxSubtasks = 5, onSubtask = () => {}) => {
+    const response = await fetch(
+      `${httpClient.defaults.baseURL}${API_ENDPOINTS.GENERATE_SUBTASKS_STREAM(todoId)}`,
+      {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ todo_id: todoId, max_subtasks: maxSubtasks }),
+      }
+    );
+    if (!response.ok) {
+      throw new Error(`Failed to generate subtasks (${response.status})`);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    for (;;) {
+      const { value, done } = await reader.read();
+      if (done) {
+        throw new Error('Subtask stream ended unexpectedly');
+      }
+      buffer += decoder.decode(value, { stream: true });
+
+      let boundary;
+      while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+        const block = buffer.slice(0, boundary);
+        buffer = buffer.slice(boundary + 2);
+        const event = block.match(/^event: (.*)$/m)?.[1];
+        const data = JSON.parse(block.match(/^data: (.*)$/m)?.[1] || 'null');
+        if (event === 'subtask') {
+          onSubtask(data);
+        } else if (event === 'done') {
+          return data;
+        } else if (event === 'error') {
+          throw new Error(data.detail);
+        }
+      }
+    }
+  },
+
+  // Get a background job (status, result or error)
+  getJob: async (jobId) => {
+    const response = await httpClient.get(API_ENDPOINTS.JOB(jobId));
+    return response.data;
+  },
+
   // Update subtask
   updateSubtask: async (subtaskId, updateData) => {
     const response = await httpClient.put(API_ENDPOINTS.UPDATE_SUBTASK(subtaskId), updateData);
     return response.data;
   },
 
+  // Apply many subtask changes (reorder, complete, edit) in one request
+  bulkUpdateSubtasks: async (todoId, items, completeAll = false) => {
+    const response = await httpClient.patch(API_ENDPOINTS.SUBTASKS(todoId), {
+      items,
+      complete_all: completeAll,
+    });
+    return response.data;
+  },
+
   // Delete subtask
   deleteSubtask: async (subtaskId) => {
     await httpClient.delete(API_ENDPOINTS.DELETE_SUBTASK(subtaskId));
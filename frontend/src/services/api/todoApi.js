@@ -40,4 +40,28 @@ export const todoApi = {
     const response = await httpClient.patch(API_ENDPOINTS.TOGGLE_TODO(todoId));
     return response.data;
   },
+
+  // Create many todos in one request
+  bulkCreateTodos: async (items) => {
+    const response = await httpClient.post(API_ENDPOINTS.TODOS_BULK, { items });
+    return response.data.results;
+  },
+
+  // Update many todos in one request (items are { id, ...changes })
+  bulkUpdateTodos: async (items) => {
+    const response = await httpClient.patch(API_ENDPOINTS.TODOS_BULK, { items });
+    return response.data.results;
+  },
+
+  // Toggle many todos in one request
+  bulkToggleTodos: async (ids) => {
+    const response = await httpClient.patch(`${API_ENDPOINTS.TODOS_BULK}/toggle`, { ids });
+    return response.data.results;
+  },
+
+  // Delete many todos in one request
+  bulkDeleteTodos: async (ids) => {
+    const response = await httpClient.post(`${API_ENDPOINTS.TODOS_BULK}/delete`, { ids });
+    return response.data.results;
+  },
 }; 
\ No newline at end of file
@@ -11,6 +11,15 @@ export const translationApi = {
     return response.data;
   },
 
+  // Translate todo into several languages in one request
+  translateTodoBatch: async (todoId, targetLanguages) => {
+    const response = await httpClient.post(
+      API_ENDPOINTS.TRANSLATE_TODO_BATCH(todoId),
+      { target_languages: targetLanguages }
+    );
+    return response.data;
+  },
+
   // Translate any text
   translateText: async (text, targetLanguage) => {
     const response = await httpClient.post(
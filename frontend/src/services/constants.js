@@ -1,8 +1,14 @@
 export const API_ENDPOINTS = {
   TODOS: '/api/v1/todos',
+  TODOS_BULK: '/api/v1/todos/bulk',
   SUBTASKS: (todoId) => `/api/v1/todos/${todoId}/subtasks`,
   GENERATE_SUBTASKS: (todoId) => `/api/v1/todos/${todoId}/generate`,
+  GENERATE_SUBTASKS_JOB: (todoId) => `/api/v1/todos/${todoId}/generate/jobs`,
+  GENERATE_SUBTASKS_STREAM: (todoId) => `/api/v1/todos/${todoId}/generate/stream`,
+  GENERATE_SUBTASKS_BATCH: '/api/v1/todos/generate/batch',
+  JOB: (jobId) => `/api/v1/jobs/${jobId}`,
   TRANSLATE_TODO: (todoId) => `/api/v1/todos/${todoId}/translate`,
+  TRANSLATE_TODO_BATCH: (todoId) => `/api/v1/todos/${todoId}/translate/batch`,
   TRANSLATE_TEXT: '/api/v1/todos/translate',
   TOGGLE_TODO: (todoId) => `/api/v1/todos/${todoId}/toggle`,
   UPDATE_SUBTASK: (subtaskId) => `/api/v1/subtasks/${subtaskId}`,
@@ -13,6 +19,7 @@ export const API_ENDPOINTS = {
 export const HTTP_STATUS = {
   OK: 200,
   CREATED: 201,
+  ACCEPTED: 202,
   NO_CONTENT: 204,
   BAD_REQUEST: 400,
   NOT_FOUND: 404,
@@ -10,10 +10,43 @@ const httpClient = axios.create({
   },
 });
 
+const newIdempotencyKey = () =>
+  window.crypto?.randomUUID?.() || `${Date.now()}-${Math.random().toString(36).slice(2)}`;
+
+// Idempotency keys of POSTs still waiting for an answer, by operation (URL
+// and body). Repeating an operation, such as clicking "generate" again after
+// a timeout, reuses its key so the backend replays the first result instead
+// of running it twice; a key is dropped once a response settles it.
+const pendingIdempotencyKeys = new Map();
+
+const idempotencyOperation = (config) => `${config.url} ${JSON.stringify(config.data ?? null)}`;
+
+const settleIdempotencyKey = (config, response) => {
+  const operation = config?.idempotencyOperation;
+  // No response (timeout, network) or 409 (still running): a retry must
+  // send the same key
+  if (!operation || !response || response.status === 409) {
+    return;
+  }
+  if (pendingIdempotencyKeys.get(operation) === config.headers['Idempotency-Key']) {
+    pendingIdempotencyKeys.delete(operation);
+  }
+};
+
 // Request interceptor
 httpClient.interceptors.request.use(
   (config) => {
     // Add any auth headers here if needed
+
+    // Give each POST the key of its operation
+    if (config.method === 'post' && !config.headers['Idempotency-Key']) {
+      const operation = idempotencyOperation(config);
+      if (!pendingIdempotencyKeys.has(operation)) {
+        pendingIdempotencyKeys.set(operation, newIdempotencyKey());
+      }
+      config.idempotencyOperation = operation;
+      config.headers['Idempotency-Key'] = pendingIdempotencyKeys.get(operation);
+    }
     console.log(`Making ${config.method?.toUpperCase()} request to ${config.url}`);
     console.log('Full request config:', {
       baseURL: config.baseURL,
@@ -33,6 +66,7 @@ httpClient.interceptors.request.use(
 // Response interceptor
 httpClient.interceptors.response.use(
   (response) => {
+    settleIdempotencyKey(response.config, response);
     console.log('API Response:', {
       url: response.config?.url,
       method: response.config?.method,
@@ -42,6 +76,7 @@ httpClient.interceptors.response.use(
     return response;
   },
   (error) => {
+    settleIdempotencyKey(error.config, error.response);
     const message = error.response?.data?.detail || error.message || 'An error occurred';
     
     // Show error toast